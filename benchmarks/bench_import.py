@@ -0,0 +1,83 @@
+import argparse
+import subprocess
+import sys
+from typing import Dict, List
+
+# best cumulative import time allowed for each entry point, in seconds
+targets = {
+    "dst_scoring_model.model": 0.15,
+    "dst_scoring_model.pipeline": 1.0,
+    "dst_scoring_model.snapshots": 1.0,
+}
+
+# modules the scoring path must not pull in
+heavy_modules = ["scipy", "requests", "bs4", "dst_scoring_model.fetch"]
+
+
+def import_time(module: str) -> float:
+    """Imports a module in a fresh interpreter with -X importtime and returns
+    its cumulative import time in seconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+    raise ValueError(f"no importtime line for {module}")
+
+
+def loaded_modules(module: str) -> List[str]:
+    """Returns the heavy modules loaded by importing a module."""
+    code = (
+        f"import sys, {module}; "
+        f"print(' '.join(m for m in {heavy_modules!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.split()
+
+
+def bench(repeat: int = 5) -> Dict[str, dict]:
+    """Times every entry point in targets, keeping the best of repeat runs.
+
+    Args:
+        repeat (int): number of fresh interpreters per module
+    Returns:
+        results (dict): module to its time, target and loaded heavy modules
+    """
+    return {
+        module: {
+            "seconds": min(import_time(module) for _ in range(repeat)),
+            "target": target,
+            "heavy": loaded_modules(module),
+        }
+        for module, target in targets.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the import of the scoring entry points."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    failed = False
+    for module, result in bench(args.repeat).items():
+        ok = result["seconds"] <= result["target"] and not result["heavy"]
+        failed |= not ok
+        print(
+            f"{module:<30} {result['seconds'] * 1000:7.1f}ms "
+            f"(target {result['target'] * 1000:.0f}ms) "
+            f"heavy: {', '.join(result['heavy']) or 'none'} "
+            f"{'ok' if ok else 'FAIL'}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import timeit
+
+import numpy as np
+import pandas as pd
+
+import dst_scoring_model.clean_data as clean_data
+
+
+def make_int_fusion(rows: int) -> pd.DataFrame:
+    """Builds a merged tr and qb df with roughly a tenth of QBs missing."""
+    rng = np.random.default_rng(0)
+    qb = rng.uniform(0.3, 1.5, rows)
+    qb[rng.random(rows) < 0.1] = np.nan
+    return pd.DataFrame(
+        data={
+            "team_name": np.arange(rows).astype(str),
+            "interceptions_thrown": rng.uniform(0.3, 1.5, rows),
+            "name": "QB",
+            "interception_%": rng.uniform(0.01, 0.04, rows),
+            "passing_attempts": rng.uniform(25, 40, rows),
+            "interceptions_per_game_qb": qb,
+        }
+    )
+
+
+def eager_log_merge(row: pd.Series) -> float:
+    """interceptions_merge as it was, formatting the row for every call even
+    with logging off."""
+    "checking ints for row: " + str(row)
+    return clean_data.interceptions_merge(row)
+
+
+def bench(rows: int, repeat: int = 3) -> dict:
+    """Times the row wise apply, with the old eager row formatting and with
+    lazy logging, against interceptions_merge_columns.
+
+    Args:
+        rows (int): number of team rows, 32 per week of a season
+        repeat (int): number of timing runs, the best one is kept
+    Returns:
+        result (dict): timings in seconds and the speedup
+    """
+    df = make_int_fusion(rows)
+    number = max(1, 3200 // rows)
+    eager = min(
+        timeit.repeat(
+            lambda: df.apply(eager_log_merge, axis=1), number=1, repeat=repeat
+        )
+    )
+    old = min(
+        timeit.repeat(
+            lambda: df.apply(clean_data.interceptions_merge, axis=1),
+            number=number,
+            repeat=repeat,
+        )
+    )
+    new = min(
+        timeit.repeat(
+            lambda: clean_data.interceptions_merge_columns(df),
+            number=number,
+            repeat=repeat,
+        )
+    )
+    return {
+        "rows": rows,
+        "eager_apply": eager,
+        "apply": old / number,
+        "columnar": new / number,
+        "speedup": eager / (new / number),
+    }
+
+
+def main():
+    # one week of the league, then 17 weeks of 10 seasons
+    for rows in (32, 32 * 17 * 10):
+        result = bench(rows)
+        print(
+            f"{result['rows']:>6} rows: eager log apply {result['eager_apply']:.5f}s, "
+            f"apply {result['apply']:.5f}s, "
+            f"columnar {result['columnar']:.6f}s, "
+            f"speedup {result['speedup']:.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import argparse
+import glob
+import os
+import timeit
+from typing import List
+
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup
+
+import dst_scoring_model.get_qb_data as get_qb_data
+import dst_scoring_model.get_tr_data as get_tr_data
+import dst_scoring_model.maps as maps
+import dst_scoring_model.team_registry as team_registry
+
+
+def soup_parse_tr_stats(text: str, stat_name: str) -> pd.DataFrame:
+    """parse_tr_stats as it was, building the whole BeautifulSoup tree."""
+    queried_stat_html = BeautifulSoup(text, "html.parser")
+    table = queried_stat_html.find("table", class_="tr-table datatable scrollable")
+    queried_stat_list = []
+    for tr in table.find_all("tr")[1:]:
+        tds = tr.find_all("td")
+        try:
+            queried_stat_list.append(
+                {
+                    "team_name": tds[1].text,
+                    stat_name + "_season": float(tds[2].text),
+                    stat_name + "_last_3": float(tds[3].text),
+                }
+            )
+        except ValueError:
+            queried_stat_list.append(
+                {
+                    "team_name": tds[1].text,
+                    stat_name + "_season": np.nan,
+                    stat_name + "_last_3": np.nan,
+                }
+            )
+    return get_tr_data.construct_tr_df(queried_stat_list)
+
+
+def soup_rows(text: str) -> List[List[str]]:
+    table = BeautifulSoup(text, "html.parser").find(
+        "table", class_="sortable stats_table"
+    )
+    return [[td.text for td in tr.find_all("td")] for tr in table.find_all("tr")[1:]]
+
+
+def soup_parse_footballdb_data(
+    interception_text: str, attempts_text: str
+) -> pd.DataFrame:
+    """parse_footballdb_data as it was, building the whole BeautifulSoup tree."""
+    interception_percentage_df = pd.DataFrame(
+        data=[
+            {"name": tds[0], "interception_%": float(tds[1].strip("%")) / 100}
+            for tds in soup_rows(interception_text)
+        ]
+    )
+    passing_attempts_df = pd.DataFrame(
+        data=[
+            {"name": tds[0], "passing_attempts": float(tds[1])}
+            for tds in soup_rows(attempts_text)
+        ]
+    )
+    merged_df = pd.merge(
+        interception_percentage_df, passing_attempts_df, on="name", how="left"
+    )
+    merged_df["interceptions_per_game_qb"] = (
+        merged_df["interception_%"] * merged_df["passing_attempts"]
+    )
+    merged_df["team_name"] = team_registry.teams_categorical(
+        merged_df["name"].map(maps.qb_to_team)
+    )
+    return merged_df
+
+
+def synthetic_tr_page(seed: int, low: float = 0.0, high: float = 4.0) -> str:
+    """A teamrankings sized page, the stat table wrapped in a lot of other
+    markup like the navigation and sidebars of the real site, with per game
+    values drawn between low and high."""
+    rng = np.random.default_rng(seed)
+    filler = "".join(
+        f'<div class="nav"><ul><li><a href="/nfl/stat/{i}">Stat {i}</a></li></ul></div>'
+        for i in range(1500)
+    )
+    rows = "".join(
+        f'<tr><td class="rank">{i + 1}</td>'
+        f'<td class="text-left nowrap"><a href="#">{town}</a></td>'
+        + "".join(
+            f'<td class="text-right">{value:.1f}</td>'
+            for value in rng.uniform(low, high, 6)
+        )
+        + "</tr>"
+        for i, town in enumerate(maps.town_to_team)
+    )
+    return (
+        f"<html><head><title>Stat</title></head><body>{filler}"
+        '<table class="tr-table datatable scrollable"><thead><tr><th>Rank</th>'
+        f"</tr></thead><tbody>{rows}</tbody></table>{filler}</body></html>"
+    )
+
+
+def synthetic_pfr_page(seed: int, percent: bool) -> str:
+    """A pro-football-reference sized leaders page, of interception
+    percentages when percent is set, otherwise of pass attempts per game,
+    both in the ranges starting QBs fall in."""
+    rng = np.random.default_rng(seed)
+    low, high = (0.8, 3.5) if percent else (25.0, 42.0)
+    filler = "".join(f"<p>Footnote {i} <span>text</span></p>" for i in range(2000))
+    rows = "".join(
+        f'<tr><th>{i + 1}.</th><td><a href="#">{qb}</a></td>'
+        f"<td>{value:.1f}{'%' if percent else ''}</td></tr>"
+        for i, (qb, value) in enumerate(
+            zip(maps.qb_to_team, rng.uniform(low, high, 32))
+        )
+    )
+    return (
+        f"<html><body>{filler}"
+        '<table class="sortable stats_table"><tr><th>Rk</th><th>Player</th></tr>'
+        f"{rows}</table>{filler}</body></html>"
+    )
+
+
+def load_corpus(directory: str) -> dict:
+    """Loads saved pages, e.g. a backtest snapshot directory, sorting them into
+    teamrankings pages and pairs of pro-football-reference pages."""
+    corpus = {"tr": [], "pfr": []}
+    for path in sorted(
+        glob.glob(os.path.join(directory, "**", "*.html"), recursive=True)
+    ):
+        with open(path) as page_file:
+            text = page_file.read()
+        if os.path.basename(path) == "pfr_interceptions.html":
+            attempts_path = os.path.join(os.path.dirname(path), "pfr_attempts.html")
+            with open(attempts_path) as attempts_file:
+                corpus["pfr"].append((text, attempts_file.read()))
+        elif not os.path.basename(path).startswith("pfr_"):
+            corpus["tr"].append(text)
+    return corpus
+
+
+def bench(corpus: dict, repeat: int = 3) -> dict:
+    """Checks the fast parsers give identical output to the BeautifulSoup
+    ones on every page, then times both over the whole corpus."""
+    for text in corpus["tr"]:
+        pd.testing.assert_frame_equal(
+            get_tr_data.parse_tr_stats(text, "stat"), soup_parse_tr_stats(text, "stat")
+        )
+    for texts in corpus["pfr"]:
+        pd.testing.assert_frame_equal(
+            get_qb_data.parse_footballdb_data(*texts),
+            soup_parse_footballdb_data(*texts),
+        )
+
+    def run(parse_tr, parse_pfr):
+        for text in corpus["tr"]:
+            parse_tr(text, "stat")
+        for texts in corpus["pfr"]:
+            parse_pfr(*texts)
+
+    old = min(
+        timeit.repeat(
+            lambda: run(soup_parse_tr_stats, soup_parse_footballdb_data),
+            number=1,
+            repeat=repeat,
+        )
+    )
+    new = min(
+        timeit.repeat(
+            lambda: run(get_tr_data.parse_tr_stats, get_qb_data.parse_footballdb_data),
+            number=1,
+            repeat=repeat,
+        )
+    )
+    return {
+        "pages": len(corpus["tr"]) + 2 * len(corpus["pfr"]),
+        "soup": old,
+        "fast": new,
+        "speedup": old / new,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the table parsers.")
+    parser.add_argument("--pages", help="directory of saved pages to parse")
+    args = parser.parse_args()
+    if args.pages:
+        corpus = load_corpus(args.pages)
+    else:
+        corpus = {
+            "tr": [synthetic_tr_page(seed) for seed in range(14)],
+            "pfr": [(synthetic_pfr_page(0, True), synthetic_pfr_page(1, False))],
+        }
+    result = bench(corpus)
+    print(
+        f"{result['pages']} pages: soup {result['soup']:.3f}s, "
+        f"fast {result['fast']:.3f}s, speedup {result['speedup']:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import argparse
+import contextlib
+import glob
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import tempfile
+import timeit
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import benchmarks.bench_parse as bench_parse
+import dst_scoring_model.backtest as backtest
+import dst_scoring_model.cache as cache
+import dst_scoring_model.maps as maps
+import dst_scoring_model.pipeline as pipeline
+import dst_scoring_model.simulate as simulate
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ENTRY_POINT = os.path.join(os.path.dirname(BENCHMARKS_DIR), "dst_scoring_model.py")
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baselines", "pipeline.json")
+# committed pages of one past week, in the backtest snapshot layout
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, "fixtures")
+
+# a benchmark regresses when it is this many times slower than its baseline,
+# both measured in multiples of the reference workload of their own run
+TOLERANCE = 1.25
+
+# runs of the reference paired with every timing run, their median is taken
+REFERENCE_RUNS = 5
+
+# range of every teamrankings stat per game across the league, so synthetic
+# pages project like a real week
+TR_RANGES = {
+    "sacks_defense_list": (1.2, 3.6),
+    "sacks_offense_list": (1.2, 3.6),
+    "interceptions_thrown": (0.3, 1.4),
+    "interceptions_created": (0.3, 1.4),
+    "fumbles_thrown": (0.6, 2.0),
+    "fumbles_created": (0.6, 2.0),
+    "defensive_touchdowns": (0.0, 0.4),
+}
+
+# size of the scaled up variants
+SCALES = {
+    "small": {"seasons": 1, "sims": 100_000},
+    "large": {"seasons": 6, "sims": 2_000_000},
+}
+
+
+def synthetic_lines(season: int, week: int, seed: int) -> str:
+    """A rundown events payload for a week, every game priced by two books."""
+    rng = np.random.default_rng(seed)
+    teams = list(maps.town_to_team.values())
+    events = []
+    for game in range(len(teams) // 2):
+        spread = np.round(rng.uniform(-10, 10) * 2) / 2
+        total = np.round(rng.uniform(38, 56), 1)
+        events.append(
+            {
+                "event_id": f"{season}-{week}-{game}",
+                "schedule": {"week": week, "season_year": season},
+                "teams": [{"name": teams[2 * game + 1]}, {"name": teams[2 * game]}],
+                "lines": {
+                    book: {
+                        "spread": {"point_spread_home": spread + shift},
+                        "total": {"total_under": total + shift},
+                    }
+                    for book, shift in (("3", 0.0), ("4", 0.5))
+                },
+            }
+        )
+    return json.dumps({"events": events})
+
+
+def synthetic_week_pages(season: int, week: int, seed: int = 0) -> Dict[str, str]:
+    """Every page backtest.page_files expects for a week, real sized and
+    seeded so the same week always gets the same pages."""
+    pages = {}
+    for i, (url, file_name) in enumerate(backtest.page_files(season, week).items()):
+        if url == maps.rundown_events_url:
+            pages[url] = synthetic_lines(season, week, seed)
+        elif file_name.startswith("pfr_"):
+            percent = url == maps.pfr_interception_url
+            pages[url] = bench_parse.synthetic_pfr_page(seed + i, percent)
+        else:
+            key = file_name.replace("_as_of.html", "").replace("_season.html", "")
+            pages[url] = bench_parse.synthetic_tr_page(seed + i, *TR_RANGES[key])
+    return pages
+
+
+def write_fixtures(directory: str, weeks: List[Tuple[int, int]], seed: int = 0):
+    """Saves synthetic pages for every (season, week) pair in the backtest
+    snapshot layout."""
+    for season, week in weeks:
+        pages = synthetic_week_pages(season, week, seed + 100 * week)
+        backtest.save_week_pages(pages, directory, season, week)
+
+
+def record_fixtures(directory: str, season: int, week: int):
+    """Fetches the live pages of a week and saves them as fixtures.
+
+    The teamrankings pages are dated to the week, but the rundown events and
+    PFR leaders pages only ever serve the current week, so a week can only be
+    recorded while it is current. The pages are parsed before they are saved
+    and nothing is saved when the lines do not have the week.
+
+    Raises:
+        LookupError: if the fetched pages can not be parsed as the week
+    """
+    import dst_scoring_model.fetch as fetch
+
+    pages = fetch.fetch_all(backtest.page_files(season, week))
+    as_of, season_as_of = pipeline.week_dates(season, week)
+    with fresh_cache():
+        pipeline.load_inputs(pages, week, season, as_of, season_as_of)
+    backtest.save_week_pages(pages, directory, season, week)
+
+
+def fixture_weeks(directory: str) -> List[Tuple[int, int]]:
+    """Finds the (season, week) pairs with saved pages in a snapshot dir."""
+    weeks = []
+    for path in sorted(glob.glob(os.path.join(directory, "*", "week_*"))):
+        season, week = path.split(os.sep)[-2:]
+        weeks.append((int(season), int(week[len("week_") :])))
+    return weeks
+
+
+@contextlib.contextmanager
+def fresh_cache(pages: Optional[Dict[str, str]] = None) -> Iterator[str]:
+    """Points cache.default_cache at an empty temporary cache, so parsed pages
+    are parsed again instead of read back, optionally holding pages and
+    serving them offline. Yields the temporary directory."""
+    previous = cache.default_cache
+    with tempfile.TemporaryDirectory() as directory:
+        cache.default_cache = cache.ResponseCache(
+            os.path.join(directory, "cache"), offline=pages is not None
+        )
+        for url, text in (pages or {}).items():
+            cache.default_cache.put_body(url, text)
+        try:
+            yield directory
+        finally:
+            cache.default_cache = previous
+
+
+def load_entry_point():
+    """Imports dst_scoring_model.py, which the package shadows by name."""
+    spec = importlib.util.spec_from_file_location("dst_entry_point", ENTRY_POINT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_main(entry_point, pages: Dict[str, str], season: int, week: int):
+    """Runs main() end to end for a week, fetching from an offline cache
+    holding its pages and writing its output and snapshot into a temporary
+    directory."""
+    cwd = os.getcwd()
+    with fresh_cache(pages) as directory:
+        os.chdir(directory)
+        try:
+            entry_point.run(season=season, week=week)
+        finally:
+            os.chdir(cwd)
+
+
+def time_best(function: Callable, repeat: int, number: int = 1) -> float:
+    """Returns the best wall time of repeat runs of number calls, in seconds
+    per call."""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def reference():
+    """A fixed mix of numpy, pandas and pure python work like the pipeline's,
+    timed in every run so the benchmarks can be measured in multiples of it
+    instead of in seconds, which differ between machines and loads."""
+    rng = np.random.default_rng(0)
+    values = rng.random(200_000)
+    np.sort(values)
+    pd.Series(values).groupby((values * 32).astype(int)).mean()
+    json.dumps([{"value": float(value)} for value in values[:20_000]])
+
+
+def bench(
+    snapshot_dir: str, scale: str = "small", repeat: int = 5
+) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Times main() end to end and every stage of the pipeline on the first
+    week of the fixtures, then the scaled up backtest and simulation.
+
+    Args:
+        snapshot_dir (string): fixtures in the backtest snapshot layout
+        scale (string): key of SCALES, size of the scaled up variants
+        repeat (int): number of paired timing runs of each benchmark
+    Returns:
+        results (dict): benchmark name to seconds, with the best time of the
+            reference workload under "reference"
+        ratios (dict): benchmark name to its median time in multiples of the
+            reference run just before it
+    """
+    results, ratios = {}, {}
+
+    def timed(name: str, function: Callable, repeat: int, number: int = 1):
+        # every timing run is paired with a run of the reference, so a load
+        # spike slows both sides of its ratio, and the median ratio is kept
+        # as the best one swings with the luck of a single pair
+        runs = []
+        for _ in range(repeat):
+            reference_time = statistics.median(
+                timeit.repeat(reference, number=1, repeat=REFERENCE_RUNS)
+            )
+            runs.append((time_best(function, 1, number), reference_time))
+        results[name] = min(seconds for seconds, _ in runs)
+        ratios[name] = statistics.median(
+            seconds / reference_time for seconds, reference_time in runs
+        )
+
+    season, week = fixture_weeks(snapshot_dir)[0]
+    pages = backtest.load_week_pages(season, week, snapshot_dir)
+    as_of, season_as_of = pipeline.week_dates(season, week)
+
+    def parse():
+        with fresh_cache():
+            return pipeline.load_inputs(pages, week, season, as_of, season_as_of)
+
+    inputs = parse()
+    rates = pipeline.build_rates(**inputs)
+    entry_point = load_entry_point()
+    timed("main", lambda: run_main(entry_point, pages, season, week), repeat)
+    timed("parse", parse, repeat)
+    # the stages take milliseconds, so each timing run calls them 10 times
+    # and they get three times the runs
+    timed("rates", lambda: pipeline.build_rates(**inputs), 3 * repeat, 10)
+    timed("score", lambda: pipeline.score_rates(rates), 3 * repeat, 10)
+    timed("projections", lambda: pipeline.build_projections(**inputs), 3 * repeat, 10)
+
+    size = SCALES[scale]
+    seasons = sorted(maps.season_kickoffs)[-size["seasons"] :]
+    weeks = [(season, week) for season in seasons for week in range(1, 18)]
+    with tempfile.TemporaryDirectory() as directory:
+        write_fixtures(directory, weeks)
+
+        def replay():
+            with fresh_cache():
+                backtest.run_backtest(weeks, directory, workers=1)
+
+        # the replay takes seconds, three runs give its median some footing
+        timed(f"backtest_{len(weeks)}_weeks", replay, 3)
+    simulated = simulate.fused_rates(rates)
+    timed(
+        f"simulate_{size['sims']}",
+        lambda: simulate.simulate(simulated, n_sims=size["sims"]),
+        repeat,
+    )
+    results["reference"] = time_best(reference, repeat)
+    return results, ratios
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float]
+) -> Dict[str, Optional[float]]:
+    """Returns how many times slower than its baseline every benchmark ran,
+    both from the ratios of bench, None for benchmarks without a baseline."""
+    return {
+        name: seconds / baseline[name] if name in baseline else None
+        for name, seconds in results.items()
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline against offline fixtures."
+    )
+    parser.add_argument(
+        "--pages",
+        default=FIXTURES_DIR,
+        help="recorded pages in the backtest snapshot layout",
+    )
+    parser.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="use synthetic pages instead of --pages",
+    )
+    parser.add_argument(
+        "--record",
+        nargs=2,
+        type=int,
+        metavar=("SEASON", "WEEK"),
+        help="fetch a live week into --pages and exit",
+    )
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=3,
+        help="benchmark this many times and compare the median ratios",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store these results"
+    )
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_fixtures(args.pages, *args.record)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        if args.synthetic:
+            write_fixtures(directory, [(2020, 1)])
+        runs = [
+            bench(directory if args.synthetic else args.pages, args.scale, args.repeat)
+            for _ in range(args.runs)
+        ]
+    results = {name: min(run[0][name] for run in runs) for name in runs[0][0]}
+    ratios = {
+        name: statistics.median(run[1][name] for run in runs) for name in runs[0][1]
+    }
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    print(f"{'reference':<26} {results['reference'] * 1000:9.1f}ms")
+    failed = False
+    for name, ratio in compare(ratios, baseline).items():
+        regressed = ratio is not None and ratio > args.tolerance
+        failed |= regressed
+        versus = "no baseline" if ratio is None else f"{ratio:.2f}x baseline"
+        print(
+            f"{name:<26} {results[name] * 1000:9.1f}ms "
+            f"{ratios[name]:8.2f}x reference ({versus}) "
+            f"{'REGRESSED' if regressed else 'ok'}"
+        )
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as baseline_file:
+            json.dump({**baseline, **ratios}, baseline_file, indent=2)
+    sys.exit(1 if failed and not args.save_baseline else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import timeit
+
+import numpy as np
+
+import dst_scoring_model.maps as maps
+import dst_scoring_model.model as model
+import dst_scoring_model.points_allowed as points_allowed
+
+
+def score_of_mean(rates: np.ndarray, table: dict) -> np.ndarray:
+    """The old path, scoring the capped expected points allowed."""
+    expected = model.poisson_expectation(rates, maps.poisson_events["points_allowed"])
+    return model.points_allowed_scores(expected, table)
+
+
+def bench(rows: int, repeat: int = 3) -> dict:
+    """Times the score of the mean against the exact and interpolated
+    expected points allowed scores.
+
+    Args:
+        rows (int): number of teams/simulated rows to score
+        repeat (int): number of timing runs, the best one is kept
+    Returns:
+        result (dict): timings in seconds, the speedup and the largest bias
+            of the old path
+    """
+    table = maps.scoring_tables["standard"]["points_allowed"]
+    rates = np.random.default_rng(0).uniform(10, 35, size=rows)
+    points_allowed.expected_scores(rates[:1], table)
+    number = max(1, 3200 // rows)
+    timings = {
+        name: min(
+            timeit.repeat(lambda: score(rates, table), number=number, repeat=repeat)
+        )
+        / number
+        for name, score in (
+            ("mean", score_of_mean),
+            ("exact", points_allowed.exact_scores),
+            ("grid", points_allowed.expected_scores),
+        )
+    }
+    bias = score_of_mean(rates, table) - points_allowed.exact_scores(rates, table)
+    return dict(
+        timings,
+        rows=rows,
+        speedup=timings["mean"] / timings["grid"],
+        bias=np.abs(bias).max(),
+    )
+
+
+def main():
+    for rows in (32, 100_000):
+        result = bench(rows, repeat=1 if rows > 1000 else 3)
+        print(
+            f"{result['rows']:>7} rows: score of mean {result['mean']:.6f}s, "
+            f"exact {result['exact']:.6f}s, grid {result['grid']:.6f}s, "
+            f"speedup {result['speedup']:.1f}x, max bias {result['bias']:.2f} pts"
+        )
+
+
+if __name__ == "__main__":
+    main()
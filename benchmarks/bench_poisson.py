@@ -0,0 +1,62 @@
+import timeit
+
+import numpy as np
+
+import dst_scoring_model.maps as maps
+import dst_scoring_model.model as model
+
+
+def per_row(rates: np.ndarray, caps: list) -> np.ndarray:
+    """The old path, calling poisson_create once per team and event."""
+    return np.array(
+        [
+            [model.poisson_create(rate, cap) for rate, cap in zip(row, caps)]
+            for row in rates
+        ]
+    )
+
+
+def bench(rows: int, repeat: int = 3) -> dict:
+    """Times the per row path against poisson_expectation_matrix.
+
+    Args:
+        rows (int): number of teams/simulated rows to score
+        repeat (int): number of timing runs, the best one is kept
+    Returns:
+        result (dict): timings in seconds and the speedup
+    """
+    caps = list(maps.poisson_events.values())
+    rates = np.random.default_rng(0).uniform(0, 3, size=(rows, len(caps)))
+    rates[:, 0] *= 10
+    np.testing.assert_array_equal(
+        per_row(rates[:32], caps), model.poisson_expectation_matrix(rates[:32], caps)
+    )
+    number = max(1, 3200 // rows)
+    old = min(timeit.repeat(lambda: per_row(rates, caps), number=number, repeat=repeat))
+    new = min(
+        timeit.repeat(
+            lambda: model.poisson_expectation_matrix(rates, caps),
+            number=number,
+            repeat=repeat,
+        )
+    )
+    return {
+        "rows": rows,
+        "per_row": old / number,
+        "vectorized": new / number,
+        "speedup": old / new,
+    }
+
+
+def main():
+    for rows in (32, 100_000):
+        result = bench(rows, repeat=1 if rows > 1000 else 3)
+        print(
+            f"{result['rows']:>7} rows: per row {result['per_row']:.4f}s, "
+            f"vectorized {result['vectorized']:.6f}s, "
+            f"speedup {result['speedup']:.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,84 @@
+import argparse
 import logging
-from datetime import datetime, date
-
-import pandas as pd
+from typing import List, Optional
 
+import dst_scoring_model.instrument as instrument
 import dst_scoring_model.maps as maps
-import dst_scoring_model.clean_data as clean_data
-import dst_scoring_model.get_pinnacle_data as get_pinnacle_data
-import dst_scoring_model.get_tr_data as get_tr_data
-import dst_scoring_model.model as model
-import dst_scoring_model.get_qb_data as get_qb_data
-
+import dst_scoring_model.outputs as outputs
+import dst_scoring_model.pipeline as pipeline
+import dst_scoring_model.snapshots as snapshots
 
-def main():
-    logging.basicConfig(filename="dst_log.log", level=logging.DEBUG)
-    spreads = get_pinnacle_data.get_lines()
-    tr_items = {}
-    defense_pure_df = pd.DataFrame()
-    for key, value in maps.tr_stat_list.items():
-        tr_items[key] = get_tr_data.get_tr_stats_full(
-            value["url"], value["column_name"]
-        )
 
-    logging.info("merging items together for defense_pure_df")
-    defense_pure_df = pd.merge(
-        spreads, tr_items["sacks_defense_list"], how="left", on="team_name"
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Project this week's D/ST scores.")
+    parser.add_argument(
+        "--from-store",
+        action="store_true",
+        help="score the latest stored snapshot instead of scraping",
     )
-
-    for item in maps.defense_pure_list:
-        defense_pure_df = pd.merge(
-            defense_pure_df, tr_items[item], how="left", on="team_name"
-        )
-
-    logging.info("merging items together for opponent_pure_df")
-    qb_interceptions = get_qb_data.get_footballdb_data()
-    int_fusion = pd.merge(
-        tr_items["interceptions_thrown"], qb_interceptions, how="left"
+    parser.add_argument(
+        "--trace", help="write a json trace of the time spent in every stage"
     )
-    int_fusion["interceptions_thrown"] = int_fusion.apply(
-        lambda row: clean_data.interceptions_merge(row), axis=1
+    parser.add_argument("--profile", help="write cProfile stats of the run")
+    parser.add_argument(
+        "--format", choices=sorted(outputs.formats), default="csv", dest="format"
     )
-    opponent_pure_df = pd.merge(
-        tr_items["sacks_offense_list"], int_fusion, how="left", on="team_name"
-    )
-    opponent_pure_df = pd.merge(
-        opponent_pure_df, tr_items["fumbles_thrown"], how="left", on="team_name"
-    )
-
-    logging.info("merging items for full fused_df")
-    fused_df = pd.merge(
-        defense_pure_df,
-        opponent_pure_df,
-        how="left",
-        left_on="opponent",
-        right_on="team_name",
+    parser.add_argument("--output-dir", default=outputs.OUTPUT_DIR)
+    parser.add_argument("--season", type=int, default=maps.current_season)
+    parser.add_argument("--week", type=int, default=1)
+    parser.add_argument(
+        "--store",
+        default=snapshots.STORE_DIR,
+        help="snapshots store the inputs are saved to and read from",
     )
+    args = parser.parse_args(argv)
 
-    for key, value in maps.poisson_events.items():
-        logging.info("getting poisson event probablity for " + key)
-        fused_df[key] = fused_df[key].apply(
-            lambda row: model.poisson_create(row, value)
+    logging.basicConfig(filename="dst_log.log", level=logging.DEBUG)
+    with instrument.session(args.trace, args.profile):
+        path = run(
+            args.from_store,
+            args.format,
+            args.output_dir,
+            args.season,
+            args.week,
+            args.store,
         )
+    print(path)
 
-    for item in maps.defense_opponent_list:
-        fused_df = clean_data.defense_opponent_fusion(fused_df, item)
 
-    logging.info("applying points_allowed_score")
-    fused_df["points_allowed_score"] = fused_df["points_allowed"].apply(
-        lambda row: model.points_allowed_score(row)
-    )
-    logging.info("creating final score output")
-    fused_df["final"] = (
-        fused_df["points_allowed_score"]
-        + fused_df["interceptions"] * 2
-        + fused_df["sacks"] * 1
-        + fused_df["fumbles"] * 2
-        + fused_df["defensive_touchdowns"] * 6
+def run(
+    from_store: bool = False,
+    output_format: str = "csv",
+    output_dir: str = outputs.OUTPUT_DIR,
+    season: int = maps.current_season,
+    week: int = 1,
+    store: str = snapshots.STORE_DIR,
+) -> str:
+    """Loads this week's inputs, scores them and writes the projections as a
+    new run of the week's projections output.
+
+    Args:
+        from_store (bool): score the latest stored snapshot instead of scraping
+        output_format (string): one of outputs.formats
+        output_dir (string): root directory of the outputs
+        season (int): season the week belongs to, must be in
+            maps.season_kickoffs, picks the games of the lines and the dates
+            of the teamrankings snapshots, and the inputs are stored and the
+            projections written under it
+        week (int): week to project
+        store (string): root directory of the snapshots store
+    Returns:
+        path (string): path of the written projections
+    """
+    if from_store:
+        inputs = snapshots.load_inputs(season, week, root=store)
+    else:
+        inputs = pipeline.fetch_inputs(season, week)
+        snapshots.save_inputs(inputs, season, week, root=store)
+    fused_df = pipeline.build_projections(**inputs)
+    return outputs.write_output(
+        fused_df, "projections", season, week, output_format, root=output_dir
     )
-    logging.info("formatting df")
-    fused_df = fused_df.drop("team_name_y", axis=1)
-    fused_df["team_name"] = fused_df["team_name_x"]
-    fused_df = fused_df[
-        [
-            "team_name",
-            "final",
-            "opponent",
-            "points_allowed_score",
-            "interceptions",
-            "fumbles",
-            "sacks",
-            "defensive_touchdowns",
-        ]
-    ]
-    fused_df.sort_values(by="final", ascending=False, inplace=True)
-    logging.info("creating csv")
-    current_date = "{:%Y_%m_%d}".format(datetime.now())
-    fused_df.to_csv(f"df_final_{current_date}.csv", index=False)
 
 
 if __name__ == "__main__":
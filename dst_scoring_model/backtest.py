@@ -0,0 +1,297 @@
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import dst_scoring_model.maps as maps
+import dst_scoring_model.outputs as outputs
+import dst_scoring_model.pipeline as pipeline
+import dst_scoring_model.snapshots as snapshots
+
+
+def week_dir(snapshot_dir: str, season: int, week: int) -> str:
+    """Returns the directory the saved pages of a week live in."""
+    return os.path.join(snapshot_dir, str(season), f"week_{week:02d}")
+
+
+def page_files(season: int, week: int) -> Dict[str, str]:
+    """Maps every url the pipeline needs for a week to the file name its page
+    is saved under in the week's snapshot directory.
+
+    Args:
+        season (int): the season
+        week (int): the week of the season
+    Returns:
+        files (dict): url to file name
+    """
+    import dst_scoring_model.get_tr_data as get_tr_data
+
+    as_of, season_as_of = pipeline.week_dates(season, week)
+    files = {
+        maps.rundown_events_url: "lines.json",
+        maps.pfr_interception_url: "pfr_interceptions.html",
+        maps.pfr_attempts_url: "pfr_attempts.html",
+    }
+    for key, value in maps.tr_stat_list.items():
+        season_url, snapshot_url = get_tr_data.tr_urls(
+            value["url"], as_of, season_as_of
+        )
+        files[season_url] = key + "_season.html"
+        files[snapshot_url] = key + "_as_of.html"
+    return files
+
+
+def save_week_pages(pages: Dict[str, str], snapshot_dir: str, season: int, week: int):
+    """Saves the fetched pages of a week so it can be backtested later.
+
+    Args:
+        pages (dict): url to body mapping with every url of the week
+        snapshot_dir (string): root directory of the saved pages
+        season (int): the season
+        week (int): the week of the season
+    """
+    directory = week_dir(snapshot_dir, season, week)
+    os.makedirs(directory, exist_ok=True)
+    for url, file_name in page_files(season, week).items():
+        with open(os.path.join(directory, file_name), "w") as page_file:
+            page_file.write(pages[url])
+
+
+def load_week_pages(season: int, week: int, snapshot_dir: str) -> Dict[str, str]:
+    """Loads the pages of a week from the snapshot directory.
+
+    There is no fallback to the response cache, as the lines and PFR pages are
+    cached under the same url for every week and only hold the latest one.
+
+    Args:
+        season (int): the season
+        week (int): the week of the season
+        snapshot_dir (string): root directory of the saved pages
+    Returns:
+        pages (dict): url to body mapping with every url of the week
+    """
+    files = page_files(season, week)
+    directory = week_dir(snapshot_dir, season, week)
+    pages = {}
+    for url, file_name in files.items():
+        with open(os.path.join(directory, file_name)) as page_file:
+            pages[url] = page_file.read()
+    return pages
+
+
+def load_week_inputs(
+    season: int,
+    week: int,
+    snapshot_dir: Optional[str] = None,
+    store: Optional[str] = None,
+) -> Dict:
+    """Loads the input dfs of one week, from a snapshots store when given and
+    from its saved pages otherwise.
+
+    Args:
+        season (int): the season
+        week (int): the week of the season
+        snapshot_dir (string): root directory of the saved pages
+        store (string): root directory of a snapshots store
+    Returns:
+        inputs (dict): spreads, tr_items and qb_interceptions
+    Raises:
+        ValueError: if neither a snapshot directory nor a store is given
+    """
+    if store is not None:
+        return snapshots.load_inputs(season, week, root=store)
+    if snapshot_dir is None:
+        raise ValueError("past weeks need saved pages or a snapshots store")
+    as_of, season_as_of = pipeline.week_dates(season, week)
+    pages = load_week_pages(season, week, snapshot_dir)
+    return pipeline.load_inputs(pages, week, season, as_of, season_as_of)
+
+
+def project_week(
+    season: int,
+    week: int,
+    snapshot_dir: Optional[str] = None,
+    store: Optional[str] = None,
+) -> pd.DataFrame:
+    """Replays the full pipeline for one week.
+
+    Args:
+        season (int): the season
+        week (int): the week of the season
+        snapshot_dir (string): root directory of the saved pages
+        store (string): root directory of a snapshots store, used instead of
+            parsing pages when given
+    Returns:
+        projections (pandas.Dataframe): the week's projections, with season
+            and week columns
+    Raises:
+        LookupError: if the week has no lines
+    """
+    logging.info("projecting %s week %s", season, week)
+    inputs = load_week_inputs(season, week, snapshot_dir, store)
+    if inputs["spreads"].empty:
+        raise LookupError(f"no lines for {season} week {week}")
+    projections = pipeline.build_projections(**inputs)
+    projections.insert(0, "week", week)
+    projections.insert(0, "season", season)
+    return projections
+
+
+def _project_week(
+    args: Tuple[int, int, Optional[str], Optional[str]],
+) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    season, week, snapshot_dir, store = args
+    try:
+        return project_week(season, week, snapshot_dir, store), None
+    except (OSError, LookupError) as error:
+        logging.warning("could not project %s week %s: %s", season, week, error)
+        return None, str(error)
+
+
+def run_backtest(
+    weeks: Iterable[Tuple[int, int]],
+    snapshot_dir: Optional[str] = None,
+    actuals: Optional[pd.DataFrame] = None,
+    workers: Optional[int] = None,
+    store: Optional[str] = None,
+    skip_missing: bool = False,
+) -> pd.DataFrame:
+    """Projects every (season, week) pair across a process pool and lines
+    the projections up with the actual D/ST results.
+
+    A week that can not be projected, e.g. one without saved pages or one
+    missing from its lines, fails the run unless skip_missing is set, in
+    which case it is logged and left out.
+
+    Args:
+        weeks (iterable): (season, week) pairs to project
+        snapshot_dir (string): root directory of the saved pages
+        actuals (pandas.Dataframe): actual results, with season, week,
+            team_name and actual columns
+        workers (int): processes to use, 1 runs everything in this process
+        store (string): root directory of a snapshots store to load the
+            inputs from instead of saved pages
+        skip_missing (bool): leave out weeks that can not be projected
+            instead of failing
+    Returns:
+        results (pandas.Dataframe): projections with actual and error columns
+    Raises:
+        ValueError: if neither a snapshot directory nor a store is given
+        LookupError: if a week can not be projected and skip_missing is off,
+            or no week can be projected
+    """
+    if snapshot_dir is None and store is None:
+        raise ValueError("past weeks need saved pages or a snapshots store")
+    jobs = [(season, week, snapshot_dir, store) for season, week in weeks]
+    if workers == 1:
+        outcomes = list(map(_project_week, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(_project_week, jobs))
+    failed = [
+        f"{season} week {week}: {error}"
+        for (season, week, _, _), (_, error) in zip(jobs, outcomes)
+        if error is not None
+    ]
+    if failed and not skip_missing:
+        raise LookupError(
+            f"could not project {len(failed)} weeks: " + "; ".join(failed)
+        )
+    projections = [df for df, _ in outcomes if df is not None]
+    if not projections:
+        raise LookupError("no weeks could be projected")
+    results = pd.concat(projections, ignore_index=True)
+    if actuals is not None:
+        results = pd.merge(
+            results,
+            actuals[["season", "week", "team_name", "actual"]],
+            how="left",
+            on=["season", "week", "team_name"],
+        )
+        results["error"] = results["final"] - results["actual"]
+    return results
+
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """Computes the error metrics of a backtest per season.
+
+    Args:
+        results (pandas.Dataframe): output of run_backtest with actuals
+    Returns:
+        summary (pandas.Dataframe): weeks, mae, rmse and correlation per season
+    """
+    scored = results.dropna(subset=["final", "actual"])
+    grouped = scored.groupby("season")
+    correlation = grouped[["final", "actual"]].corr().xs("final", level=1)
+    return pd.DataFrame(
+        {
+            "weeks": grouped["week"].nunique(),
+            "mae": grouped["error"].apply(lambda error: error.abs().mean()),
+            "rmse": grouped["error"].apply(lambda error: np.sqrt((error**2).mean())),
+            "correlation": correlation["actual"],
+        }
+    )
+
+
+def parse_range(value: str) -> List[int]:
+    """Parses "2016-2020" or "3" into a list of ints."""
+    start, _, end = value.partition("-")
+    return list(range(int(start), int(end or start) + 1))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Replay the D/ST model over past weeks and score it."
+    )
+    parser.add_argument("--seasons", required=True, help="e.g. 2016-2020")
+    parser.add_argument("--weeks", default="1-17", help="e.g. 1-17")
+    parser.add_argument("--snapshots", help="directory of saved pages")
+    parser.add_argument(
+        "--store", help="snapshots store to load inputs from instead of pages"
+    )
+    parser.add_argument(
+        "--actuals", help="csv with season, week, team_name and actual columns"
+    )
+    parser.add_argument("--output", default="backtest.csv")
+    parser.add_argument(
+        "--output-dir",
+        help="write the results to the outputs, one partition per week, "
+        "instead of --output",
+    )
+    parser.add_argument(
+        "--format", choices=sorted(outputs.formats), default="csv", dest="format"
+    )
+    parser.add_argument("--workers", type=int)
+    parser.add_argument(
+        "--skip-missing",
+        action="store_true",
+        help="leave out weeks that can not be projected instead of failing",
+    )
+    args = parser.parse_args(argv)
+    if args.snapshots is None and args.store is None:
+        parser.error("one of --snapshots or --store is needed")
+
+    logging.basicConfig(filename="dst_log.log", level=logging.INFO)
+    weeks = [
+        (season, week)
+        for season in parse_range(args.seasons)
+        for week in parse_range(args.weeks)
+    ]
+    actuals = pd.read_csv(args.actuals) if args.actuals else None
+    results = run_backtest(
+        weeks, args.snapshots, actuals, args.workers, args.store, args.skip_missing
+    )
+    if args.output_dir:
+        outputs.write_weeks(results, "backtest", args.format, root=args.output_dir)
+    else:
+        results.to_csv(args.output, index=False)
+    if actuals is not None:
+        print(summarize(results).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import atexit
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+from urllib.parse import urlparse
+
+import dst_scoring_model.maps as maps
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, windows
+    fcntl = None
+
+CACHE_DIR = os.environ.get("DST_CACHE_DIR", ".dst_cache")
+MAX_BYTES = 200 * 1024 * 1024
+OFFLINE = os.environ.get("DST_OFFLINE", "") not in ("", "0")
+
+
+class CacheMissError(LookupError):
+    """Raised when offline mode is on and a url has never been cached."""
+
+
+def ttl_for(url: str) -> Optional[float]:
+    """Returns how many seconds a cached response for the url stays fresh.
+
+    Dated teamrankings snapshots never change, so they never expire. Every
+    other url uses the per host ttl in maps.cache_ttls.
+
+    Args:
+        url (string): url of the response
+    Returns:
+        ttl (float): seconds the response is fresh for, None if it never expires
+    """
+    if "?date=" in url:
+        return None
+    return maps.cache_ttls.get(urlparse(url).netloc, maps.cache_ttls["default"])
+
+
+def cache_key(*parts: str) -> str:
+    """Hashes the parts into a key usable as a file name."""
+    return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+def replace_file(path: str, data: bytes):
+    """Writes data to path through a uniquely named temporary file in the same
+    directory, so processes sharing the cache never write the same temporary
+    file and readers never see a partial file."""
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class ResponseCache:
+    """On disk cache of response bodies and parsed dataframes.
+
+    Each entry is stored as its own file in the cache directory, with an
+    index.json holding the validators, fetch time, size and last access time
+    of every entry. Once the entries grow past max_bytes the least recently
+    used ones are evicted. Reads only update the access times in memory, they
+    are saved with the next write or by flush.
+
+    Processes can share a cache directory: the index is saved under a file
+    lock, merging this process's changes into the index on disk, and evicting
+    over the merged index, so no process drops the entries of another.
+
+    Args:
+        directory (string): directory the cache lives in
+        max_bytes (int): max total size of the cached entries
+        offline (bool): only serve from the cache, never call out
+        memoize_parsed (bool): keep parsed results, off for one off parses
+    """
+
+    def __init__(
+        self,
+        directory: str = CACHE_DIR,
+        max_bytes: int = MAX_BYTES,
+        offline=OFFLINE,
+        memoize_parsed: bool = True,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.memoize_parsed = memoize_parsed
+        self.lock = threading.RLock()
+        self.dirty = False
+        # keys this process wrote and dropped since the last save, so merging
+        # the index on disk neither loses nor brings them back
+        self.added: Set[str] = set()
+        self.removed: Set[str] = set()
+        self.index_path = os.path.join(directory, "index.json")
+        self.lock_path = os.path.join(directory, "index.lock")
+        self.index = self.load_index()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Reads index.json, an empty index if there is none yet."""
+        try:
+            with open(self.index_path) as index_file:
+                return json.load(index_file)
+        except FileNotFoundError:
+            return {}
+
+    @contextlib.contextmanager
+    def index_lock(self) -> Iterator[None]:
+        """Holds an exclusive lock on the index across processes."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def merge_index(self, on_disk: Dict[str, Dict[str, Any]]):
+        """Merges the index on disk into this one, keeping the newest copy of
+        entries both have and the latest access time of either. Entries gone
+        from the disk that this process did not write were evicted by another
+        process and are dropped here too."""
+        for key in [key for key in self.index if key not in on_disk]:
+            if key not in self.added:
+                del self.index[key]
+        for key, entry in on_disk.items():
+            if key in self.removed:
+                continue
+            mine = self.index.get(key)
+            if mine is None or entry["stored"] > mine["stored"]:
+                merged = dict(entry)
+            else:
+                merged = mine
+            if mine is not None:
+                merged["accessed"] = max(entry["accessed"], mine["accessed"])
+            self.index[key] = merged
+
+    def save_index(self):
+        """Merges the index on disk into this one, evicts over the merged
+        index and saves it, all under the index lock."""
+        with self.index_lock():
+            self.merge_index(self.load_index())
+            self.evict()
+            replace_file(self.index_path, json.dumps(self.index).encode("utf-8"))
+        self.added.clear()
+        self.removed.clear()
+        self.dirty = False
+
+    def flush(self):
+        """Saves the index if reads have touched entries since the last save."""
+        with self.lock:
+            if self.dirty:
+                self.save_index()
+
+    def write(self, key: str, data: bytes, **meta: Any):
+        """Writes an entry to disk, records it in the index and evicts the
+        least recently used entries if the cache is now too big."""
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            replace_file(self.path(key), data)
+            now = time.time()
+            self.index[key] = dict(meta, size=len(data), stored=now, accessed=now)
+            self.added.add(key)
+            self.removed.discard(key)
+            self.save_index()
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Reads an entry and marks it as recently used in memory, returns None
+        if the entry is missing."""
+        with self.lock:
+            if key not in self.index:
+                return None
+            try:
+                with open(self.path(key), "rb") as entry_file:
+                    data = entry_file.read()
+            except FileNotFoundError:
+                del self.index[key]
+                self.removed.add(key)
+                self.dirty = True
+                return None
+            self.index[key]["accessed"] = time.time()
+            self.dirty = True
+            return data
+
+    def evict(self):
+        """Drops least recently used entries until under max_bytes."""
+        total = sum(entry["size"] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]["accessed"]):
+            if total <= self.max_bytes:
+                break
+            logging.debug("evicting cache entry %s", key)
+            total -= self.index.pop(key)["size"]
+            self.added.discard(key)
+            self.removed.add(key)
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Returns the index entry for a cached url, or None."""
+        with self.lock:
+            return self.index.get(cache_key("response", url))
+
+    def is_fresh(
+        self, url: str, entry: Dict[str, Any], max_age: Optional[float] = None
+    ) -> bool:
+        ttl = ttl_for(url) if max_age is None else max_age
+        return ttl is None or time.time() - entry["stored"] < ttl
+
+    def get_body(self, url: str) -> Optional[str]:
+        data = self.read(cache_key("response", url))
+        return None if data is None else data.decode("utf-8")
+
+    def put_body(
+        self,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        self.write(
+            cache_key("response", url),
+            body.encode("utf-8"),
+            url=url,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    def revalidated(self, url: str):
+        """Marks a cached response as fresh again after a 304."""
+        with self.lock:
+            entry = self.index[cache_key("response", url)]
+            entry["stored"] = entry["accessed"] = time.time()
+            self.save_index()
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Returns the conditional request headers for a cached url."""
+        entry = self.lookup(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def parsed(self, text: str, name: str, parse: Callable[[], Any]) -> Any:
+        """Returns the parsed form of a page, only calling parse if the exact
+        same page has not been parsed by that parser before.
+
+        Args:
+            text (string): body of the page
+            name (string): name of the parser, part of the key
+            parse (function): called with no arguments to parse the page
+        Returns:
+            result: whatever parse returns
+        """
+        if not self.memoize_parsed:
+            return parse()
+        key = cache_key("parsed", name, text)
+        data = self.read(key)
+        if data is not None:
+            return pickle.loads(data)
+        result = parse()
+        self.write(key, pickle.dumps(result), parser=name)
+        return result
+
+
+default_cache = ResponseCache()
+
+
+@atexit.register
+def flush_default_cache():
+    """Saves the access times of the default cache's reads at exit."""
+    default_cache.flush()
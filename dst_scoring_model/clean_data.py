@@ -1,19 +1,33 @@
 import logging
+from typing import Mapping, Sequence
 
+import numpy as np
 import pandas as pd
 
+import dst_scoring_model.maps as maps
+import dst_scoring_model.team_registry as team_registry
 
-def defense_opponent_fusion(df: pd.DataFrame, stat: str) -> pd.DataFrame:
+teams = team_registry.names
+team_index = team_registry.team_index
+
+
+def defense_opponent_fusion(
+    df: pd.DataFrame, stat: str, fusion: Mapping = maps.model_spec["fusion"]
+) -> pd.DataFrame:
     """Create the composite number for each stat, fusing offense and defense.
 
     Args:
         df (pandas.Dataframe): df of the full table
         stat (string): stat to fuse
+        fusion (dict): weights of the created and thrown stats
     Return:s
         df (pandas.Dataframe): df with new/dropped column(s)
     """
-    logging.info("fusing stats for " + stat)
-    df[stat] = df[stat + "_created"] * 0.45 + df[stat + "_thrown"] * 0.55
+    logging.info("fusing stats for %s", stat)
+    df[stat] = (
+        df[stat + "_created"] * fusion["created"]
+        + df[stat + "_thrown"] * fusion["thrown"]
+    )
     df = df.drop([stat + "_created", stat + "_thrown"], axis=1)
     return df
 
@@ -27,8 +41,89 @@ def interceptions_merge(row: pd.Series) -> float:
     a game. If the QB is indeed in the historical interception data, it will
     use that number instead.
     """
-    logging.info("checking ints for row: " + str(row))
+    logging.debug("checking ints for row: %s", row)
     if pd.isna(row["interceptions_per_game_qb"]):
         return row["interceptions_thrown"]
     else:
         return row["interceptions_per_game_qb"]
+
+
+def interceptions_merge_columns(df: pd.DataFrame) -> pd.Series:
+    """Columnar interceptions_merge, consolidating the int # for every row of
+    the merged tr and qb dfs at once.
+
+    Uses the QB's historical interceptions per game where there is one, and
+    falls back to the team's average interceptions thrown where there is not.
+
+    Args:
+        df (pandas.Dataframe): merged tr and qb dfs
+    Returns:
+        interceptions (pandas.Series): consolidated interceptions thrown
+    """
+    logging.debug("merging interceptions for %s rows", len(df))
+    return df["interceptions_per_game_qb"].where(
+        df["interceptions_per_game_qb"].notna(), df["interceptions_thrown"]
+    )
+
+
+def take_rows(df: pd.DataFrame, positions: np.ndarray, index=None) -> pd.DataFrame:
+    """Takes rows of a df by position, with a row of NaN wherever the position
+    is -1, filling whole blocks of columns at once.
+
+    Args:
+        df (pandas.Dataframe): df to take the rows of
+        positions (numpy.ndarray): row positions, -1 for a missing row
+        index (pandas.Index): index of the result, defaults to a range
+    Returns:
+        rows (pandas.Dataframe): one row per position
+    """
+    rows = df.reset_index(drop=True).reindex(positions)
+    rows.index = pd.RangeIndex(len(positions)) if index is None else index
+    return rows
+
+
+def team_indexed(df: pd.DataFrame) -> pd.DataFrame:
+    """Indexes a df with a team_name column on the shared team_index.
+
+    Team names are resolved to their ids through team_registry, so any alias
+    of a team finds its row. Rows for unknown teams are dropped, only the
+    first row of a team is kept, and teams missing from the df get a row of
+    NaN, so every team indexed df lines up row for row.
+
+    Args:
+        df (pandas.Dataframe): df with a team_name column
+    Returns:
+        df (pandas.Dataframe): df indexed by team_index
+    """
+    ids = team_registry.team_ids(df["team_name"])
+    positions = np.full(len(teams), -1, dtype=np.intp)
+    # reversed, so the first row of a repeated team is the one that sticks
+    rows = np.flatnonzero(ids >= 0)[::-1]
+    positions[ids[rows]] = rows
+    return take_rows(df.drop(columns="team_name"), positions, team_index)
+
+
+def assemble_team_table(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Aligns every stat df on team_index and puts them side by side in a
+    single concat, instead of merging them one after another.
+
+    Args:
+        frames (list): dfs with a team_name column and distinct stat columns
+    Returns:
+        table (pandas.Dataframe): one row per team, every stat column
+    """
+    logging.info("assembling team table from %s frames", len(frames))
+    return pd.concat([team_indexed(df) for df in frames], axis=1)
+
+
+def lookup_teams(table: pd.DataFrame, team_names: pd.Series) -> pd.DataFrame:
+    """Looks up the rows of a team indexed table by team id, which is the
+    row's position in a team_index indexed table.
+
+    Args:
+        table (pandas.Dataframe): df indexed by team_index
+        team_names (pandas.Series): team names to look up, may repeat
+    Returns:
+        rows (pandas.Dataframe): one row per team name, NaN for unknown teams
+    """
+    return take_rows(table, team_registry.team_ids(team_names).astype(np.intp))
@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import dst_scoring_model.cache as cache
+import dst_scoring_model.instrument as instrument
+import dst_scoring_model.maps as maps
+
+MAX_WORKERS = 8
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_RATE_LIMIT = {"rate": 10.0, "burst": 10}
+
+_session = None
+_session_lock = threading.Lock()
+_buckets: Dict[str, "TokenBucket"] = {}
+_buckets_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Simple thread safe token bucket used to rate limit requests per host.
+
+    Args:
+        rate (float): tokens added back to the bucket per second
+        burst (int): max number of tokens the bucket can hold
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then takes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_session() -> requests.Session:
+    """Returns the shared requests session, creating it on first use.
+
+    The session keeps a connection pool per host big enough for every worker
+    thread, so concurrent requests to the same site reuse connections.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS
+            )
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def get_bucket(host: str) -> TokenBucket:
+    """Returns the rate limiting bucket for a host, using maps.host_rate_limits
+    to decide on the rate and falling back to DEFAULT_RATE_LIMIT.
+
+    Args:
+        host (string): host name of the url being requested
+    Returns:
+        bucket (TokenBucket): the bucket shared by all requests to that host
+    """
+    with _buckets_lock:
+        if host not in _buckets:
+            limit = maps.host_rate_limits.get(host, DEFAULT_RATE_LIMIT)
+            _buckets[host] = TokenBucket(limit["rate"], limit["burst"])
+        return _buckets[host]
+
+
+def get_response(
+    url: str, headers: Optional[Dict[str, str]] = None
+) -> requests.Response:
+    """Requests a url through the shared session, waiting on the host's rate
+    limit first and retrying with exponential backoff on connection errors and
+    retryable status codes.
+
+    Args:
+        url (string): url to request
+        headers (dict): optional extra request headers
+    Returns:
+        response (requests.Response): the final response
+    """
+    bucket = get_bucket(urlparse(url).netloc)
+    for attempt in range(MAX_RETRIES + 1):
+        bucket.acquire()
+        try:
+            response = get_session().get(url, headers=headers, timeout=TIMEOUT)
+        except requests.ConnectionError:
+            if attempt == MAX_RETRIES:
+                raise
+            logging.warning("connection error for %s, retrying", url)
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                response.raise_for_status()
+                return response
+            logging.warning("got %s for %s, retrying", response.status_code, url)
+        time.sleep(BACKOFF_FACTOR * 2**attempt)
+
+
+def get_text(url: str, max_age: Optional[float] = None) -> str:
+    """Returns the decoded body of a url, going through cache.default_cache.
+
+    Fresh cached responses are returned without calling out. Stale ones are
+    revalidated with their ETag/Last-Modified validators, and in offline mode
+    whatever is cached is returned no matter how old it is.
+
+    Args:
+        url (string): url to request
+        max_age (float): seconds a cached response stays fresh for instead
+            of cache.ttl_for, 0 to revalidate it on every call
+    Returns:
+        text (string): body of the response
+    """
+    with instrument.span("fetch", url=url) as timer:
+        response_cache = cache.default_cache
+        entry = response_cache.lookup(url)
+        if entry is not None and (
+            response_cache.offline or response_cache.is_fresh(url, entry, max_age)
+        ):
+            body = response_cache.get_body(url)
+            if body is not None:
+                logging.debug("cache hit for %s", url)
+                timer.add(cache_hits=1)
+                return body
+        if response_cache.offline:
+            raise cache.CacheMissError(f"{url} is not cached and offline mode is on")
+
+        logging.info("fetching %s", url)
+        response = get_response(url, headers=response_cache.validators(url))
+        if response.status_code == 304:
+            body = response_cache.get_body(url)
+            if body is not None:
+                logging.debug("revalidated %s", url)
+                timer.add(revalidated=1)
+                response_cache.revalidated(url)
+                return body
+            response = get_response(url)
+        timer.add(bytes=len(response.content))
+        response_cache.put_body(
+            url,
+            response.text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return response.text
+
+
+def fetch_all(urls: Iterable[str], max_workers: int = MAX_WORKERS) -> Dict[str, str]:
+    """Fetches every url concurrently, at most max_workers at a time.
+
+    Args:
+        urls (iterable): urls to fetch, duplicates are only fetched once
+        max_workers (int): max number of requests in flight
+    Returns:
+        pages (dict): mapping of url to response body
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    with instrument.span("fetch_all", urls=len(unique_urls)):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            texts = executor.map(get_text, unique_urls)
+            return dict(zip(unique_urls, texts))
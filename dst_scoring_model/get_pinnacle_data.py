@@ -1,41 +1,165 @@
 import json
 import logging
+from typing import Dict, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
-import requests
 
+import dst_scoring_model.fetch as fetch
+import dst_scoring_model.instrument as instrument
+import dst_scoring_model.maps as maps
 
-def get_lines() -> pd.DataFrame:
-    """Calls out to rundown API to get Pinnacle betting lines.
 
+def get_lines(
+    pages: Optional[Dict[str, str]] = None,
+    week: int = 1,
+    season: Optional[int] = None,
+    weights: Optional[Dict[str, float]] = None,
+) -> pd.DataFrame:
+    """Calls out to rundown API to get betting lines, and turns the lines of
+    every book into a consensus points allowed per team.
+
+    Args:
+        pages (dict): optional url to body mapping from fetch.fetch_all, used
+            instead of calling out to the API
+        week (int): week of the season to keep the games of
+        season (int): season to keep the games of, None for any season
+        weights (dict): book id to weight, defaults to maps.book_weights
     Returns:
         spread_df (pandas.Dataframe): df of the lines
     """
-    logging.info("getting lines from Pinnacle")
-    response = requests.get("https://therundown.io/api/v1/sports/2/events")
-    events_list = json.loads(response.content.decode("utf-8"))
-    spread_list = []
+    logging.info("getting lines from the rundown")
+    if pages is not None:
+        text = pages[maps.rundown_events_url]
+    else:
+        text = fetch.get_text(maps.rundown_events_url)
+    with instrument.span("parse.lines") as timer:
+        events_list = json.loads(text)
+        events = list(week_events(events_list, week, season))
+        spread_df = consensus_spreads(events, weights)
+        spread_df["points_allowed"] = spread_df["points_allowed"].fillna(27)
+        timer.add(bytes=len(text), rows=len(spread_df))
+    return spread_df
+
 
+def week_events(
+    events_list: Dict, week: int = 1, season: Optional[int] = None
+) -> Iterator[Dict]:
+    """Yields the events of the rundown payload played in the week.
+
+    Args:
+        events_list (dict): decoded rundown events payload
+        week (int): week of the season to keep the games of
+        season (int): season to keep the games of, None for any season
+    Returns:
+        events (iterator): the week's events
+    """
     for event in events_list["events"]:
-        if event.get("schedule") and event["schedule"]["week"] == 1:
-            spread_list.extend(
-                [
-                    {
-                        "team_name": event["teams"][0]["name"],
-                        "points_allowed": event["lines"]["3"]["total"]["total_under"]
-                        / 2
-                        + (-1) * event["lines"]["3"]["spread"]["point_spread_home"],
-                        "opponent": event["teams"][1]["name"],
-                    },
-                    {
-                        "team_name": event["teams"][1]["name"],
-                        "points_allowed": event["lines"]["3"]["total"]["total_under"]
-                        / 2
-                        + event["lines"]["3"]["spread"]["point_spread_home"],
-                        "opponent": event["teams"][0]["name"],
-                    },
-                ]
-            )
-    spread_df = pd.DataFrame(data=spread_list)
-    spread_df["points_allowed"].fillna(27, inplace=True)
-    return spread_df
+        schedule = event.get("schedule")
+        if (
+            schedule
+            and schedule["week"] == week
+            and (season is None or schedule.get("season_year") == season)
+        ):
+            yield event
+
+
+def line_value(line: Optional[Dict], key: str) -> float:
+    """Reads a spread or total from a book's line, NaN if it is missing or
+    off the board."""
+    value = line.get(key) if line else None
+    if value is None or value == maps.off_board_line:
+        return np.nan
+    return value
+
+
+def book_lines(events: List[Dict]) -> pd.DataFrame:
+    """Flattens the lines of every book of every event into columns.
+
+    Args:
+        events (list): events from the rundown payload
+    Returns:
+        lines_df (pandas.Dataframe): event position, book id, home spread and
+            total of every book line, NaN where a book has no number
+    """
+    event_ids, books, spreads, totals = [], [], [], []
+    for position, event in enumerate(events):
+        for book, line in (event.get("lines") or {}).items():
+            event_ids.append(position)
+            books.append(book)
+            spreads.append(line_value(line.get("spread"), "point_spread_home"))
+            totals.append(line_value(line.get("total"), "total_under"))
+    return pd.DataFrame(
+        {
+            "event": np.array(event_ids, dtype=np.intp),
+            "book": books,
+            "spread_home": np.array(spreads, dtype=float),
+            "total": np.array(totals, dtype=float),
+        }
+    )
+
+
+def weighted_consensus(
+    event_ids: np.ndarray, weights: np.ndarray, values: np.ndarray, n_events: int
+) -> np.ndarray:
+    """Weighted mean of values per event, skipping NaN values, NaN for events
+    without any value. A single book's value is returned exactly."""
+    valid = ~np.isnan(values)
+    book_weights = np.where(valid, weights, 0.0)
+    total_weights = np.bincount(event_ids, book_weights, minlength=n_events)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = book_weights / total_weights[event_ids]
+        consensus = np.bincount(
+            event_ids, np.where(valid, shares * values, 0.0), minlength=n_events
+        ).astype(float, copy=False)
+    consensus[total_weights == 0] = np.nan
+    return consensus
+
+
+def consensus_spreads(
+    events: List[Dict], weights: Optional[Dict[str, float]] = None
+) -> pd.DataFrame:
+    """Computes the implied points allowed of both teams of every event from
+    the weighted consensus spread and total across books.
+
+    Books missing a number are left out of that number's consensus, an event
+    without any spread is treated as a pick'em and one without any total gets
+    a NaN points allowed.
+
+    Args:
+        events (list): events from the rundown payload
+        weights (dict): book id to weight, defaults to maps.book_weights, with
+            maps.default_book_weight for books not in it
+    Returns:
+        spread_df (pandas.Dataframe): team_name, points_allowed and opponent,
+            two rows per event in event order
+    """
+    if weights is None:
+        weights = maps.book_weights
+    lines_df = book_lines(events)
+    event_ids = lines_df["event"].to_numpy()
+    book_weights = (
+        lines_df["book"]
+        .map(weights)
+        .fillna(maps.default_book_weight)
+        .to_numpy(dtype=float)
+    )
+    spread_home = weighted_consensus(
+        event_ids, book_weights, lines_df["spread_home"].to_numpy(), len(events)
+    )
+    total = weighted_consensus(
+        event_ids, book_weights, lines_df["total"].to_numpy(), len(events)
+    )
+    spread_home = np.nan_to_num(spread_home)
+
+    first = np.array([event["teams"][0]["name"] for event in events], dtype=object)
+    second = np.array([event["teams"][1]["name"] for event in events], dtype=object)
+    return pd.DataFrame(
+        {
+            "team_name": np.column_stack([first, second]).ravel(),
+            "points_allowed": np.column_stack(
+                [total / 2 + (-1) * spread_home, total / 2 + spread_home]
+            ).ravel(),
+            "opponent": np.column_stack([second, first]).ravel(),
+        }
+    )
@@ -1,53 +1,82 @@
 import logging
+from typing import Dict, Optional
 
-import requests
+import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
 
+import dst_scoring_model.cache as cache
+import dst_scoring_model.fetch as fetch
+import dst_scoring_model.instrument as instrument
 import dst_scoring_model.maps as maps
+import dst_scoring_model.tables as tables
+import dst_scoring_model.team_registry as team_registry
 
+pfr_urls = [maps.pfr_interception_url, maps.pfr_attempts_url]
 
-def get_footballdb_data() -> pd.DataFrame:
+
+def get_footballdb_data(pages: Optional[Dict[str, str]] = None) -> pd.DataFrame:
     """Goes to the Football DB active QB website and grabs the data.
 
     First grabs interceptions percentages amongst all passing attempts, then
     grabs passing attempts per game to calculate interceptions per game. Then
-    uses the qb_to_team mapping to map QB to a current team.
+    uses the qb_to_team mapping to map QB to a current team. If pages from
+    fetch.fetch_all are passed in, those are used instead of calling out.
     """
-    logging.info("grabbing interception percentage data")
-    response = requests.get(
-        "https://www.pro-football-reference.com/leaders/pass_int_perc_active.htm"
+    if pages is None:
+        pages = {url: fetch.get_text(url) for url in pfr_urls}
+    interception_text = pages[maps.pfr_interception_url]
+    attempts_text = pages[maps.pfr_attempts_url]
+    return cache.default_cache.parsed(
+        interception_text + attempts_text,
+        "footballdb",
+        lambda: parse_footballdb_data(interception_text, attempts_text),
     )
-    response_html = BeautifulSoup(response.text, "html.parser")
-    table = response_html.find("table", class_="sortable stats_table")
-    interception_percentage_list = []
-    for tr in table.find_all("tr")[1:]:
-        tds = tr.find_all("td")
-        interception_percentage_list.append(
-            {"name": tds[0].text, "interception_%": float(tds[1].text.strip("%")) / 100}
+
+
+def parse_footballdb_data(interception_text: str, attempts_text: str) -> pd.DataFrame:
+    """Parses the interception percentage and passing attempts pages and
+    merges them into interceptions per game per QB.
+
+    Args:
+        interception_text (string): html of the interception percentage page
+        attempts_text (string): html of the passing attempts per game page
+    Returns:
+        merged_df (pandas.Dataframe): df of interceptions per game per QB
+    """
+    with instrument.span("parse.footballdb") as timer:
+        logging.info("grabbing interception percentage data")
+        rows = tables.table_rows(interception_text, "sortable stats_table")
+        interception_percentage_df = pd.DataFrame(
+            data={
+                "name": [tds[0] for tds in rows],
+                "interception_%": np.array(
+                    [float(tds[1].strip("%")) / 100 for tds in rows], dtype=float
+                ),
+            }
         )
 
-    logging.info("grabbing passing attempts per game info")
-    response = requests.get(
-        "https://www.pro-football-reference.com/leaders/pass_att_per_g_active.htm"
-    )
-    response_html = BeautifulSoup(response.text, "html.parser")
-    table = response_html.find("table", class_="sortable stats_table")
-    passing_attempts_list = []
-    for tr in table.find_all("tr")[1:]:
-        tds = tr.find_all("td")
-        passing_attempts_list.append(
-            {"name": tds[0].text, "passing_attempts": float(tds[1].text)}
+        logging.info("grabbing passing attempts per game info")
+        rows = tables.table_rows(attempts_text, "sortable stats_table")
+        passing_attempts_df = pd.DataFrame(
+            data={
+                "name": [tds[0] for tds in rows],
+                "passing_attempts": np.array(
+                    [float(tds[1]) for tds in rows], dtype=float
+                ),
+            }
         )
-    interception_percentage_df = pd.DataFrame(data=interception_percentage_list)
-    passing_attempts_df = pd.DataFrame(data=passing_attempts_list)
 
-    logging.info("merging and mapping dataframes")
-    merged_df = pd.merge(
-        interception_percentage_df, passing_attempts_df, on="name", how="left"
-    )
-    merged_df["interceptions_per_game_qb"] = (
-        merged_df["interception_%"] * merged_df["passing_attempts"]
-    )
-    merged_df["team_name"] = merged_df["name"].map(maps.qb_to_team)
+        logging.info("merging and mapping dataframes")
+        merged_df = pd.merge(
+            interception_percentage_df, passing_attempts_df, on="name", how="left"
+        )
+        merged_df["interceptions_per_game_qb"] = (
+            merged_df["interception_%"] * merged_df["passing_attempts"]
+        )
+        merged_df["team_name"] = team_registry.teams_categorical(
+            merged_df["name"].map(maps.qb_to_team)
+        )
+        timer.add(
+            bytes=len(interception_text) + len(attempts_text), rows=len(merged_df)
+        )
     return merged_df
@@ -1,80 +1,139 @@
 import logging
+from typing import Dict, List, Mapping, Optional
 
+import dst_scoring_model.cache as cache
+import dst_scoring_model.fetch as fetch
+import dst_scoring_model.instrument as instrument
 import dst_scoring_model.maps as maps
+import dst_scoring_model.tables as tables
+import dst_scoring_model.team_registry as team_registry
 import numpy as np
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
 
 
-def get_tr_stats(url: str, stat_name: str) -> pd.DataFrame:
-    """Calls out to the URL specified at teamrankings.com, finds the table using
-    BeautifulSoup, then sends table to construct_tr_df to make and return the
-    dataframe.
+def get_tr_stats(
+    url: str, stat_name: str, pages: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """Calls out to the URL specified at teamrankings.com, reads the stat table
+    with tables.table_rows, then sends the columns to construct_tr_df to make
+    and return the dataframe.
 
     Args:
         stat_name (string): the stat name in question
         url (string): url of the site to scrape
+        pages (dict): optional url to html mapping from fetch.fetch_all, used
+            instead of calling out to the URL
     Returns:
         tr_df (pandas.Dataframe): dataframe of specified stat per team
     """
-    logging.info("getting teamrankings stats for " + stat_name + " for url " + url)
-    queried_stat = requests.get(url)
-    queried_stat_html = BeautifulSoup(queried_stat.text, "html.parser")
-    table = queried_stat_html.find("table", class_="tr-table datatable scrollable")
-    queried_stat_list = []
-    for tr in table.find_all("tr")[1:]:
-        tds = tr.find_all("td")
-        try:
-            queried_stat_list.append(
-                {
-                    "team_name": tds[1].text,
-                    stat_name + "_season": float(tds[2].text),
-                    stat_name + "_last_3": float(tds[3].text),
-                }
-            )
-        except ValueError:
-            queried_stat_list.append(
-                {
-                    "team_name": tds[1].text,
-                    stat_name + "_season": np.nan,
-                    stat_name + "_last_3": np.nan,
-                }
-            )
+    logging.info("getting teamrankings stats for %s for url %s", stat_name, url)
+    if pages is not None:
+        text = pages[url]
+    else:
+        text = fetch.get_text(url)
+    return cache.default_cache.parsed(
+        text, "tr_stats:" + stat_name, lambda: parse_tr_stats(text, stat_name)
+    )
+
+
+def parse_tr_stats(text: str, stat_name: str) -> pd.DataFrame:
+    """Finds the stat table in a teamrankings.com page and builds the dataframe.
+
+    Args:
+        text (string): html of the page
+        stat_name (string): the stat name in question
+    Returns:
+        tr_df (pandas.Dataframe): dataframe of specified stat per team
+    """
+    with instrument.span("parse.tr_stats", stat=stat_name) as timer:
+        team_names, season, last_3 = [], [], []
+        for tds in tables.table_rows(text, "tr-table datatable scrollable"):
+            team_names.append(tds[1])
+            try:
+                season_value, last_3_value = float(tds[2]), float(tds[3])
+            except ValueError:
+                season_value = last_3_value = np.nan
+            season.append(season_value)
+            last_3.append(last_3_value)
+        timer.add(bytes=len(text), rows=len(team_names))
+    queried_stat_list = {
+        "team_name": team_names,
+        stat_name + "_season": np.array(season, dtype=float),
+        stat_name + "_last_3": np.array(last_3, dtype=float),
+    }
     return construct_tr_df(queried_stat_list)
 
 
-def get_tr_stats_full(url: str, stat_name: str) -> pd.DataFrame:
+def tr_urls(
+    url: str, as_of: str = maps.tr_snapshot_date, season_as_of: Optional[str] = None
+) -> List[str]:
+    """Returns both the 2019 and 2020 urls get_tr_stats_full needs for a stat.
+
+    Args:
+        url (string): url of the stat at teamrankings.com
+        as_of (string): date of the snapshot used for the last 3 games
+        season_as_of (string): date of the snapshot used for the full season,
+            None for the current page
+    Returns:
+        urls (list): the season url and the snapshot url
+    """
+    season_url = url if season_as_of is None else url + "?date=" + season_as_of
+    return [season_url, url + "?date=" + as_of]
+
+
+def get_tr_stats_full(
+    url: str,
+    stat_name: str,
+    pages: Optional[Dict[str, str]] = None,
+    as_of: str = maps.tr_snapshot_date,
+    season_as_of: Optional[str] = None,
+    recency: Mapping[str, float] = maps.model_spec["recency"],
+) -> pd.DataFrame:
     """Calls out to URL for both 2019 and 2020 stats, fuses dfs, and returns
     a dataframe.
 
+    The unweighted season and last 3 values are kept next to the fused stat,
+    so other recency weights can be tried without scraping again.
+
     Args:
         url (string): url of the site to scrape
         stat_name (string): the stat name in question
+        pages (dict): optional url to html mapping from fetch.fetch_all
+        as_of (string): date of the snapshot used for the last 3 games
+        season_as_of (string): date of the snapshot used for the full season,
+            None for the current page
+        recency (dict): weights of the season and last 3 values
     Returns:
-        tr_df (pandas.Dataframe): dataframe of specified stat per team
+        tr_df (pandas.Dataframe): dataframe of specified stat per team, with
+            stat_name_season and stat_name_last_3 columns
     """
-    df1 = get_tr_stats(url, stat_name + "2019")
-    df2 = get_tr_stats(url + "?date=2020-09-05", stat_name + "2020")
-    df_merge = pd.merge(df1, df2, how="left", on="team_name", suffixes=("", "_x"))
-    df_merge[stat_name] = (
-        df_merge[stat_name + "2019_season"] * 0.7
-        + df_merge[stat_name + "2020_last_3"] * 0.3
-    )
-    df_merge = df_merge[["team_name", stat_name]]
+    season_url, snapshot_url = tr_urls(url, as_of, season_as_of)
+    df1 = get_tr_stats(season_url, stat_name + "2019", pages)
+    df2 = get_tr_stats(snapshot_url, stat_name + "2020", pages)
+    with instrument.span("merge.tr_stats", stat=stat_name) as timer:
+        last_3 = df2.drop_duplicates("team_name").set_index("team_name")[
+            stat_name + "2020_last_3"
+        ]
+        df_merge = df1[["team_name"]].copy()
+        season = df1[stat_name + "2019_season"].to_numpy()
+        last_3 = last_3.reindex(df1["team_name"]).to_numpy()
+        df_merge[stat_name] = season * recency["season"] + last_3 * recency["last_3"]
+        df_merge[stat_name + "_season"] = season
+        df_merge[stat_name + "_last_3"] = last_3
+        timer.add(rows=len(df_merge))
     return df_merge
 
 
-def construct_tr_df(tr_list: list) -> pd.DataFrame:
-    """Takes in the list of dictionaries, converts to a dataframe, and then
-    maps town_to_team dict as well as computes average of last season and last
-    3 games score.
+def construct_tr_df(tr_list) -> pd.DataFrame:
+    """Takes in the list of dictionaries or dictionary of columns, converts to
+    a dataframe, and then interns the towns as team names.
 
     Args:
-        tr_list (list): list of dictionaries from tr_stats()
+        tr_list (list): list of dictionaries or dictionary of columns from
+            parse_tr_stats()
     Returns:
         tr_df (pandas.Dataframe): dataframe of specified stat per team
     """
     tr_df = pd.DataFrame(data=tr_list)
-    tr_df["team_name"] = tr_df["team_name"].map(maps.town_to_team)
+    tr_df["team_name"] = team_registry.teams_categorical(tr_df["team_name"])
     return tr_df
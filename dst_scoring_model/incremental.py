@@ -0,0 +1,91 @@
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import dst_scoring_model.pipeline as pipeline
+
+line_columns = ["team_name", "points_allowed", "opponent"]
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Returns a sha1 of a df's column names and values, ignoring its index."""
+    digest = hashlib.sha1(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def row_fingerprints(spreads: pd.DataFrame) -> np.ndarray:
+    """Returns a 64 bit hash of every line, so a moved line gets a new key."""
+    return pd.util.hash_pandas_object(spreads[line_columns], index=False).to_numpy()
+
+
+class IncrementalProjections:
+    """Keeps the output of every pipeline stage keyed by a fingerprint of its
+    inputs, so repeated updates only redo the stages whose inputs changed.
+
+    The team tables only depend on the teamrankings and qb dfs, and are
+    rebuilt when one of them changes. Everything after that, from the poisson
+    expectations to the fantasy points, is computed row by row, so scored rows
+    are kept per line and a line move for one game only rescores that game's
+    two rows.
+    """
+
+    def __init__(self):
+        self.tables_key: Optional[str] = None
+        self.tables: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
+        self.rows: Optional[pd.DataFrame] = None
+        self.recomputed = 0
+
+    def team_tables(
+        self, tr_items: Dict, qb_interceptions: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Returns the tables from pipeline.build_team_tables, only rebuilding
+        them, and dropping every scored row, when their inputs changed."""
+        key = ",".join(
+            [frame_fingerprint(tr_items[name]) for name in sorted(tr_items)]
+            + [frame_fingerprint(qb_interceptions)]
+        )
+        if key != self.tables_key:
+            logging.info("team stats changed, rebuilding team tables")
+            self.tables = pipeline.build_team_tables(tr_items, qb_interceptions)
+            self.tables_key = key
+            self.rows = None
+        return self.tables
+
+    def update(
+        self, spreads: pd.DataFrame, tr_items: Dict, qb_interceptions: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Same as pipeline.build_projections, only scoring the lines that
+        were not scored with the same team tables before.
+
+        Args:
+            spreads (pandas.Dataframe): df of the lines from get_lines
+            tr_items (dict): tr_stat_list key to df from get_tr_stats_full
+            qb_interceptions (pandas.Dataframe): df from get_footballdb_data
+        Returns:
+            fused_df (pandas.Dataframe): final projections, best first
+        """
+        defense_table, opponent_table = self.team_tables(tr_items, qb_interceptions)
+        keys = row_fingerprints(spreads)
+        stale = ~pd.Index(keys).duplicated()
+        if self.rows is not None:
+            stale &= ~np.isin(keys, self.rows.index)
+        self.recomputed = int(stale.sum())
+        logging.info("rescoring %s of %s lines", self.recomputed, len(keys))
+        # with nothing scored yet, an empty set of lines still scores to an
+        # empty projections df with every column
+        if self.recomputed or self.rows is None:
+            scored = pipeline.score_rates(
+                pipeline.attach_rates(spreads[stale], defense_table, opponent_table)
+            )
+            scored.index = keys[stale]
+            if self.rows is None or self.rows.empty:
+                self.rows = scored
+            else:
+                self.rows = pd.concat([self.rows, scored])
+        self.rows = self.rows.loc[keys]
+        fused_df = self.rows.reset_index(drop=True)
+        return fused_df.sort_values(by="final", ascending=False)
@@ -0,0 +1,212 @@
+import argparse
+import contextlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+import dst_scoring_model.backtest as backtest
+import dst_scoring_model.cache as cache
+import dst_scoring_model.maps as maps
+import dst_scoring_model.pipeline as pipeline
+import dst_scoring_model.snapshots as snapshots
+
+# save_inputs writes this source last, so a week that has it is complete
+LAST_SOURCE = "qb_interceptions"
+
+
+def ingested_weeks(root: str = snapshots.STORE_DIR) -> Set[Tuple[int, int]]:
+    """Returns the (season, week) pairs already fully ingested into a store.
+
+    Args:
+        root (string): root directory of the store
+    Returns:
+        weeks (set): ingested (season, week) pairs
+    """
+    listed = snapshots.list_snapshots(LAST_SOURCE, root=root)
+    return {
+        (int(season), int(week))
+        for season, week in zip(listed["season"], listed["week"])
+    }
+
+
+def ingest_week(
+    season: int, week: int, pages: Dict[str, str], root: str = snapshots.STORE_DIR
+) -> str:
+    """Parses the pages of a week and stores the input dfs.
+
+    Args:
+        season (int): the season
+        week (int): the week of the season
+        pages (dict): url to body mapping with every url of backtest.page_files
+        root (string): root directory of the store
+    Returns:
+        fetched (string): the timestamp the inputs were stored under
+    Raises:
+        LookupError: if the week has no lines
+    """
+    as_of, season_as_of = pipeline.week_dates(season, week)
+    inputs = pipeline.load_inputs(pages, week, season, as_of, season_as_of)
+    if inputs["spreads"].empty:
+        raise LookupError(f"no lines for {season} week {week}")
+    return snapshots.save_inputs(inputs, season, week, root=root)
+
+
+@contextlib.contextmanager
+def unmemoized_parsing():
+    """Stops cache.default_cache from keeping parsed pages for the block, as a
+    backfill parses every page once and never reads them back."""
+    response_cache = cache.default_cache
+    memoize_parsed, response_cache.memoize_parsed = response_cache.memoize_parsed, False
+    try:
+        yield
+    finally:
+        response_cache.memoize_parsed = memoize_parsed
+
+
+def _ingest_week(
+    args: Tuple[int, int, Optional[str], Optional[Dict[str, str]], str],
+) -> Optional[str]:
+    season, week, snapshot_dir, pages, root = args
+    try:
+        if pages is None:
+            pages = backtest.load_week_pages(season, week, snapshot_dir)
+        with unmemoized_parsing():
+            ingest_week(season, week, pages, root)
+    except (OSError, LookupError, ValueError) as error:
+        logging.warning("could not ingest %s week %s: %s", season, week, error)
+        return str(error)
+    logging.info("ingested %s week %s", season, week)
+    return None
+
+
+def fetch_week_pages(season: int, week: int) -> Dict[str, str]:
+    """Fetches every page of a week concurrently, through the response cache.
+
+    The lines and PFR pages are not dated, so this only gets a week's own
+    pages while that week is current.
+    """
+    import dst_scoring_model.fetch as fetch
+
+    return fetch.fetch_all(backtest.page_files(season, week))
+
+
+def run_ingest(
+    weeks: Iterable[Tuple[int, int]],
+    snapshot_dir: Optional[str] = None,
+    root: str = snapshots.STORE_DIR,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> pd.DataFrame:
+    """Backfills a store with the inputs of many weeks, parsing the weeks
+    across a process pool.
+
+    Weeks already in the store are skipped, so an interrupted run picks up
+    where it stopped. Pages are read from the snapshot directory by the
+    workers, or fetched here one week at a time while earlier weeks parse.
+    Fetching is only allowed for the week pipeline.current_week gives, as
+    the fetched lines and PFR pages are always the current ones, and a week
+    whose pages can not be fetched, or that has no lines, is marked failed
+    like one that can not be parsed.
+
+    Args:
+        weeks (iterable): (season, week) pairs to ingest
+        snapshot_dir (string): root directory of the saved pages, None to
+            fetch them
+        root (string): root directory of the store
+        workers (int): processes to use, 1 runs everything in this process
+        force (bool): ingest weeks even if they are already in the store
+    Returns:
+        results (pandas.Dataframe): season, week, status (ingested, skipped or
+            failed) and error of every week
+    Raises:
+        ValueError: if pages are to be fetched for a week other than the
+            current one
+    """
+    weeks = list(dict.fromkeys(weeks))
+    current = (maps.current_season, pipeline.current_week())
+    past = [key for key in weeks if key != current]
+    if not snapshot_dir and past:
+        raise ValueError(
+            f"can not fetch the pages of {len(past)} weeks other than "
+            f"{current[0]} week {current[1]}, the lines and PFR pages are only "
+            "the current ones, ingest them from saved pages"
+        )
+    done = set() if force else ingested_weeks(root)
+    pending = [key for key in weeks if key not in done]
+    logging.info(
+        "ingesting %s weeks, %s already done", len(pending), len(weeks) - len(pending)
+    )
+
+    errors: Dict[Tuple[int, int], Optional[str]] = {}
+
+    def jobs():
+        for season, week in pending:
+            pages = None
+            if not snapshot_dir:
+                try:
+                    pages = fetch_week_pages(season, week)
+                except (OSError, LookupError) as error:
+                    logging.warning(
+                        "could not fetch %s week %s: %s", season, week, error
+                    )
+                    errors[season, week] = str(error)
+                    continue
+            yield season, week, snapshot_dir, pages, root
+
+    if workers == 1:
+        for job in jobs():
+            errors[job[:2]] = _ingest_week(job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {job[:2]: executor.submit(_ingest_week, job) for job in jobs()}
+            errors.update({key: future.result() for key, future in futures.items()})
+
+    rows = []
+    for key in weeks:
+        if key not in errors:
+            status, error = "skipped", None
+        elif errors[key] is None:
+            status, error = "ingested", None
+        else:
+            status, error = "failed", errors[key]
+        rows.append(
+            {"season": key[0], "week": key[1], "status": status, "error": error}
+        )
+    return pd.DataFrame(rows, columns=["season", "week", "status", "error"])
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Backfill the snapshots store with past weeks."
+    )
+    parser.add_argument("--seasons", required=True, help="e.g. 2016-2020")
+    parser.add_argument("--weeks", default="1-17", help="e.g. 1-17")
+    parser.add_argument(
+        "--snapshots",
+        help="directory of saved pages, fetched when not given, which only "
+        "works for the current week",
+    )
+    parser.add_argument("--store", default=snapshots.STORE_DIR)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument(
+        "--force", action="store_true", help="ingest weeks already in the store"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(filename="dst_log.log", level=logging.INFO)
+    weeks = [
+        (season, week)
+        for season in backtest.parse_range(args.seasons)
+        for week in backtest.parse_range(args.weeks)
+    ]
+    results = run_ingest(weeks, args.snapshots, args.store, args.workers, args.force)
+    print(results["status"].value_counts().to_string())
+    failed = results[results["status"] == "failed"]
+    if not failed.empty:
+        print(failed.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+enabled = False
+
+_records: List[Dict] = []
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class Span:
+    """Times a stage of the pipeline and counts what it processed.
+
+    Use span() to get one, which returns a shared no-op span when
+    instrumentation is disabled.
+
+    Args:
+        name (string): name of the stage, e.g. "fetch" or "parse.tr_stats"
+        attrs (dict): extra attributes to record, e.g. the url
+    """
+
+    __slots__ = ("name", "attrs", "start", "parent")
+
+    def __init__(self, name: str, attrs: Dict):
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+        self.parent: Optional[str] = None
+
+    def add(self, **counts):
+        """Adds to counters of the span, e.g. bytes=len(body) or rows=n."""
+        for key, value in counts.items():
+            self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.start
+        _stack().pop()
+        record = {
+            "name": self.name,
+            "start": self.start,
+            "wall": wall,
+            "parent": self.parent,
+            "thread": threading.get_ident(),
+            "attrs": self.attrs,
+        }
+        with _lock:
+            _records.append(record)
+        return False
+
+
+class _NullSpan:
+    """Span handed out while instrumentation is disabled, doing nothing."""
+
+    __slots__ = ()
+
+    def add(self, **counts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def _stack() -> List[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def span(name: str, **attrs):
+    """Returns a span timing the block it is used with, or the no-op span
+    when instrumentation is disabled, so disabled spans cost one call.
+
+    Args:
+        name (string): name of the stage
+        attrs (dict): extra attributes to record
+    Returns:
+        span (Span): context manager for the stage
+    """
+    if not enabled:
+        return NULL_SPAN
+    return Span(name, attrs)
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Drops every recorded span."""
+    with _lock:
+        _records.clear()
+
+
+def records() -> List[Dict]:
+    """Returns a copy of the recorded spans, oldest first to finish."""
+    with _lock:
+        return list(_records)
+
+
+def summary() -> Dict[str, Dict]:
+    """Totals the recorded spans per name.
+
+    Returns:
+        summary (dict): name to count, total wall time and summed counters
+    """
+    totals: Dict[str, Dict] = {}
+    for record in records():
+        total = totals.setdefault(record["name"], {"count": 0, "wall": 0.0})
+        total["count"] += 1
+        total["wall"] += record["wall"]
+        for key, value in record["attrs"].items():
+            if isinstance(value, (int, float)):
+                total[key] = total.get(key, 0) + value
+    return totals
+
+
+def write_trace(path: str):
+    """Writes the recorded spans as a Chrome trace event file, which
+    chrome://tracing and Perfetto can open.
+
+    Args:
+        path (string): path of the json trace file
+    """
+    recorded = records()
+    origin = min((record["start"] for record in recorded), default=0.0)
+    events = [
+        {
+            "name": record["name"],
+            "ph": "X",
+            "ts": (record["start"] - origin) * 1e6,
+            "dur": record["wall"] * 1e6,
+            "pid": os.getpid(),
+            "tid": record["thread"],
+            "args": dict(record["attrs"], parent=record["parent"]),
+        }
+        for record in recorded
+    ]
+    with open(path, "w") as trace_file:
+        json.dump({"traceEvents": events, "summary": summary()}, trace_file)
+
+
+@contextlib.contextmanager
+def session(
+    trace_path: Optional[str] = None, profile_path: Optional[str] = None
+) -> Iterator[None]:
+    """Instruments the block when a trace path is given, writing the trace
+    file at the end, and runs it under cProfile when a profile path is given,
+    dumping the stats for pstats/snakeviz.
+
+    Args:
+        trace_path (string): path of the json trace file, None to not trace
+        profile_path (string): path of the cProfile dump, None to not profile
+    """
+    if trace_path:
+        reset()
+        enable()
+    profiler = cProfile.Profile() if profile_path else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        if trace_path:
+            disable()
+            write_trace(trace_path)
@@ -33,6 +33,59 @@ town_to_team = {
     "Washington": "Washington Redskins",
 }
 
+team_abbreviations = {
+    "ARI": "Arizona Cardinals",
+    "ATL": "Atlanta Falcons",
+    "BAL": "Baltimore Ravens",
+    "BUF": "Buffalo Bills",
+    "CAR": "Carolina Panthers",
+    "CHI": "Chicago Bears",
+    "CIN": "Cincinnati Bengals",
+    "CLE": "Cleveland Browns",
+    "DAL": "Dallas Cowboys",
+    "DEN": "Denver Broncos",
+    "DET": "Detroit Lions",
+    "GB": "Green Bay Packers",
+    "HOU": "Houston Texans",
+    "IND": "Indianapolis Colts",
+    "JAX": "Jacksonville Jaguars",
+    "JAC": "Jacksonville Jaguars",
+    "KC": "Kansas City Chiefs",
+    "LAC": "Los Angeles Chargers",
+    "LAR": "Los Angeles Rams",
+    "LA": "Los Angeles Rams",
+    "MIA": "Miami Dolphins",
+    "MIN": "Minnesota Vikings",
+    "NE": "New England Patriots",
+    "NO": "New Orleans Saints",
+    "NYG": "New York Giants",
+    "NYJ": "New York Jets",
+    "LV": "Las Vegas Raiders",
+    "PHI": "Philadelphia Eagles",
+    "PIT": "Pittsburgh Steelers",
+    "SF": "San Francisco 49ers",
+    "SEA": "Seattle Seahawks",
+    "TB": "Tampa Bay Buccaneers",
+    "TEN": "Tennessee Titans",
+    "WAS": "Washington Redskins",
+    "WSH": "Washington Redskins",
+}
+
+# names and abbreviations teams went by before a rename or relocation
+team_renames = {
+    "Washington Football Team": "Washington Redskins",
+    "Washington Commanders": "Washington Redskins",
+    "Oakland Raiders": "Las Vegas Raiders",
+    "Oakland": "Las Vegas Raiders",
+    "OAK": "Las Vegas Raiders",
+    "San Diego Chargers": "Los Angeles Chargers",
+    "San Diego": "Los Angeles Chargers",
+    "SD": "Los Angeles Chargers",
+    "St. Louis Rams": "Los Angeles Rams",
+    "St. Louis": "Los Angeles Rams",
+    "STL": "Los Angeles Rams",
+}
+
 tr_stat_list = {
     "sacks_defense_list": {
         "url": "https://www.teamrankings.com/nfl/stat/sacks-per-game",
@@ -64,6 +117,48 @@ tr_stat_list = {
     },
 }
 
+current_season = 2020
+
+tr_snapshot_date = "2020-09-05"
+
+season_kickoffs = {
+    2015: "2015-09-10",
+    2016: "2016-09-08",
+    2017: "2017-09-07",
+    2018: "2018-09-06",
+    2019: "2019-09-05",
+    2020: "2020-09-10",
+}
+
+rundown_events_url = "https://therundown.io/api/v1/sports/2/events"
+
+book_weights = {"3": 3.0}
+
+default_book_weight = 1.0
+
+off_board_line = 0.0001
+
+pfr_interception_url = (
+    "https://www.pro-football-reference.com/leaders/pass_int_perc_active.htm"
+)
+
+pfr_attempts_url = (
+    "https://www.pro-football-reference.com/leaders/pass_att_per_g_active.htm"
+)
+
+host_rate_limits = {
+    "www.teamrankings.com": {"rate": 10.0, "burst": 14},
+    "www.pro-football-reference.com": {"rate": 0.33, "burst": 2},
+    "therundown.io": {"rate": 1.0, "burst": 1},
+}
+
+cache_ttls = {
+    "www.teamrankings.com": 6 * 60 * 60,
+    "www.pro-football-reference.com": 24 * 60 * 60,
+    "therundown.io": 10 * 60,
+    "default": 60 * 60,
+}
+
 defense_pure_list = ["interceptions_created", "fumbles_created", "defensive_touchdowns"]
 
 poisson_events = {
@@ -77,8 +172,52 @@ poisson_events = {
     "fumbles_thrown": 5,
 }
 
+scoring_tables = {
+    "standard": {
+        "points_allowed": {
+            "shutout": 10,
+            "edges": [7, 14, 18, 28, 35],
+            "scores": [7, 4, 1, 0, -3, -4],
+        },
+        "weights": {
+            "interceptions": 2,
+            "sacks": 1,
+            "fumbles": 2,
+            "defensive_touchdowns": 6,
+        },
+    },
+    "yahoo": {
+        "points_allowed": {
+            "shutout": 10,
+            "edges": [7, 14, 21, 28, 35],
+            "scores": [7, 4, 1, 0, -1, -4],
+        },
+        "weights": {
+            "interceptions": 2,
+            "sacks": 1,
+            "fumbles": 2,
+            "defensive_touchdowns": 6,
+        },
+    },
+}
+
 defense_opponent_list = ["fumbles", "interceptions", "sacks"]
 
+scored_events = [
+    "points_allowed",
+    "interceptions",
+    "sacks",
+    "fumbles",
+    "defensive_touchdowns",
+]
+
+model_spec = {
+    "recency": {"season": 0.7, "last_3": 0.3},
+    "fusion": {"created": 0.45, "thrown": 0.55},
+    "caps": poisson_events,
+    "scoring": scoring_tables,
+}
+
 qb_to_team = {
     "Kyler Murray": "Arizona Cardinals",
     "Matt Ryan": "Atlanta Falcons",
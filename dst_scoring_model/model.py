@@ -1,5 +1,8 @@
+import functools
+import math
+from typing import Dict, Mapping, Sequence, Tuple
+
 import numpy as np
-import scipy.stats as stats
 
 
 def poisson_create(rate: float, max_possible: float) -> float:
@@ -12,14 +15,92 @@ def poisson_create(rate: float, max_possible: float) -> float:
     Returns:
         event_pred (float): the sum of all the predicted events and their rates
     """
-    n = np.arange(0, max_possible)
-    n2 = np.arange(0, max_possible)
-    y = stats.poisson.pmf(n, rate)
-    y2 = n2 * y
+    n, log_factorial = poisson_tables(math.ceil(max_possible))
+    y = poisson_pmf(n, log_factorial, np.float64(rate))
+    y2 = n * y
     event_pred = y2.sum()
     return event_pred
 
 
+def poisson_pmf(n: np.ndarray, log_factorial: np.ndarray, rates) -> np.ndarray:
+    """Poisson pmf of the counts n at the rates, in NumPy only.
+
+    Computed in log space as exp(n * log(rate) - log(n!) - rate), with the
+    n = 0 term taken as 0 so a rate of 0 gives a pmf of 1 at 0, the same way
+    scipy.stats.poisson.pmf does.
+
+    Args:
+        n (numpy.ndarray): the event counts
+        log_factorial (numpy.ndarray): log(n!) for every count in n
+        rates (array-like): the rates, broadcastable against n
+    Returns:
+        pmf (numpy.ndarray): the probability of every count at every rate
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_rates = np.log(rates)
+        n_log_rates = np.where(n == 0, 0.0, n * log_rates)
+    return np.exp(n_log_rates - log_factorial - rates)
+
+
+@functools.lru_cache(maxsize=None)
+def poisson_tables(max_possible: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Builds the n grid and log factorial table for a cap once and caches it.
+
+    Args:
+        max_possible (int): the max possible number of times event can occur
+    Returns:
+        n (numpy.ndarray): the possible event counts, 0 to max_possible - 1
+        log_factorial (numpy.ndarray): log(n!) for every count in n
+    """
+    n = np.arange(0, max_possible)
+    log_factorial = np.array([math.lgamma(count + 1) for count in range(max_possible)])
+    n.flags.writeable = False
+    log_factorial.flags.writeable = False
+    return n, log_factorial
+
+
+def poisson_expectation(rates, max_possible: int) -> np.ndarray:
+    """Vectorized poisson_create, finding the truncated expected value of the
+    event for a whole array of rates in one go.
+
+    Uses the same pmf as poisson_create, so the results are identical to
+    calling poisson_create on each rate.
+
+    Args:
+        rates (array-like): the average rates of the event, any shape
+        max_possible (int): the max possible number of times event can occur
+    Returns:
+        event_pred (numpy.ndarray): the expected events, same shape as rates
+    """
+    rates = np.asarray(rates, dtype=float)[..., np.newaxis]
+    n, log_factorial = poisson_tables(math.ceil(max_possible))
+    y = poisson_pmf(n, log_factorial, rates)
+    return (n * y).sum(axis=-1)
+
+
+def poisson_expectation_matrix(
+    rates: np.ndarray, max_possibles: Sequence[int]
+) -> np.ndarray:
+    """Finds the truncated expected values for a matrix of rates, one column
+    per event type, each column with its own cap.
+
+    Columns sharing a cap are computed together in a single call.
+
+    Args:
+        rates (numpy.ndarray): 2-D array of rates, rows by event types
+        max_possibles (sequence): the cap of each column
+    Returns:
+        event_preds (numpy.ndarray): the expected events, same shape as rates
+    """
+    rates = np.asarray(rates, dtype=float)
+    max_possibles = np.asarray(max_possibles)
+    event_preds = np.empty_like(rates)
+    for max_possible in np.unique(max_possibles):
+        columns = np.flatnonzero(max_possibles == max_possible)
+        event_preds[:, columns] = poisson_expectation(rates[:, columns], max_possible)
+    return event_preds
+
+
 def points_allowed_score(points: float) -> int:
     """The points allowed score logic generator based on standard D/ST fantasy
     football scoring.
@@ -44,3 +125,61 @@ def points_allowed_score(points: float) -> int:
     else:
         score = -4
     return score
+
+
+def points_allowed_scores(points, table: Mapping) -> np.ndarray:
+    """Vectorized points_allowed_score, scoring a whole array of points
+    allowed against a points allowed table from maps.scoring_tables.
+
+    Points allowed below table["edges"][i] and at or above the edge before it
+    score table["scores"][i], anything at or above the last edge scores the
+    last score, and exactly zero scores table["shutout"].
+
+    Args:
+        points (array-like): points allowed, any shape
+        table (dict): the "points_allowed" entry of a scoring table
+    Returns:
+        score (numpy.ndarray): the points allowed score, same shape as points
+    """
+    points = np.asarray(points, dtype=float)
+    bins = np.searchsorted(table["edges"], points, side="right")
+    score = np.asarray(table["scores"])[bins]
+    return np.where(points == 0, table["shutout"], score)
+
+
+def fantasy_points(
+    points_allowed, events: Mapping, scoring_tables: Mapping[str, Mapping]
+) -> Dict[str, np.ndarray]:
+    """Scores the points allowed and expected events under every scoring
+    table in one pass.
+
+    Args:
+        points_allowed (array-like): points allowed, any shape
+        events (mapping): event name to array of expected events, each the
+            same shape as points_allowed, a DataFrame works as well
+        scoring_tables (dict): scoring table name to scoring table, see
+            maps.scoring_tables
+    Returns:
+        scores (dict): scoring table name to the final fantasy points
+    """
+    names = list(scoring_tables)
+    total = np.stack(
+        [
+            points_allowed_scores(
+                points_allowed, scoring_tables[name]["points_allowed"]
+            )
+            for name in names
+        ],
+        axis=-1,
+    )
+    event_names = dict.fromkeys(
+        event for name in names for event in scoring_tables[name]["weights"]
+    )
+    for event in event_names:
+        weights = np.array(
+            [scoring_tables[name]["weights"].get(event, 0) for name in names]
+        )
+        total = (
+            total + np.asarray(events[event], dtype=float)[..., np.newaxis] * weights
+        )
+    return dict(zip(names, np.moveaxis(total, -1, 0)))
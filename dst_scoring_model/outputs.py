@@ -0,0 +1,231 @@
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+OUTPUT_DIR = os.environ.get("DST_OUTPUT_DIR", "dst_output")
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+def write_csv(df: pd.DataFrame, path: str):
+    df.to_csv(path, index=False)
+
+
+def read_csv(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    df = pd.read_csv(path, usecols=columns)
+    # usecols keeps the columns in file order
+    return df if columns is None else df[columns]
+
+
+def write_parquet(df: pd.DataFrame, path: str):
+    df.to_parquet(path, index=False)
+
+
+def read_parquet(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    return pd.read_parquet(path, columns=columns)
+
+
+def write_json(df: pd.DataFrame, path: str):
+    df.to_json(path, orient="records", lines=True)
+
+
+def read_json(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    df = pd.read_json(path, orient="records", lines=True)
+    return df if columns is None else df[columns]
+
+
+# file extension to the writer and reader of the format, see register_format
+formats: Dict[str, Tuple[Callable, Callable]] = {
+    "csv": (write_csv, read_csv),
+    "parquet": (write_parquet, read_parquet),
+    "json": (write_json, read_json),
+}
+
+
+def register_format(extension: str, write: Callable, read: Callable):
+    """Adds an output format.
+
+    Args:
+        extension (string): file extension, also the name of the format
+        write (function): called with the df and the path to write it to
+        read (function): called with the path and the columns to read, None
+            for all of them, returns the df
+    """
+    formats[extension] = (write, read)
+
+
+def partition_dir(name: str, season: int, week: int, root: str = OUTPUT_DIR) -> str:
+    """Returns the hive style partition directory of an output's week."""
+    return os.path.join(root, f"output={name}", f"season={season}", f"week={week}")
+
+
+def write_output(
+    df: pd.DataFrame,
+    name: str,
+    season: int,
+    week: int,
+    output_format: str = "csv",
+    run: Optional[str] = None,
+    root: str = OUTPUT_DIR,
+) -> str:
+    """Writes one run of an output for a week as a new file of its partition,
+    through a temporary file, so earlier runs are never rewritten and readers
+    never see a partial file.
+
+    Args:
+        df (pandas.Dataframe): the df to write
+        name (string): name of the output, e.g. "projections" or "backtest"
+        season (int): season the df is for
+        week (int): week the df is for
+        output_format (string): one of formats
+        run (string): run timestamp, defaults to now in UTC
+        root (string): root directory of the outputs
+    Returns:
+        path (string): path of the written file
+    """
+    write, _ = formats[output_format]
+    if run is None:
+        run = datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+    directory = partition_dir(name, season, week, root)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"run={run}.{output_format}")
+    tmp_path = path + ".tmp"
+    write(df, tmp_path)
+    os.replace(tmp_path, path)
+    logging.info("wrote output %s", path)
+    return path
+
+
+def write_weeks(
+    df: pd.DataFrame,
+    name: str,
+    output_format: str = "csv",
+    run: Optional[str] = None,
+    root: str = OUTPUT_DIR,
+) -> List[str]:
+    """Writes a df spanning many weeks, e.g. backtest results, one partition
+    per week under a single run timestamp.
+
+    Args:
+        df (pandas.Dataframe): df with season and week columns
+        name (string): name of the output
+        output_format (string): one of formats
+        run (string): run timestamp, defaults to now in UTC
+        root (string): root directory of the outputs
+    Returns:
+        paths (list): paths of the written files
+    """
+    if run is None:
+        run = datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+    return [
+        write_output(week_df, name, season, week, output_format, run, root)
+        for (season, week), week_df in df.groupby(["season", "week"], sort=True)
+    ]
+
+
+def partition_values(directory: str, key: str) -> List[Tuple[str, int]]:
+    """Returns the name and value of every key=<int> partition directory in
+    a directory, skipping anything else in it, e.g. .DS_Store."""
+    if not os.path.isdir(directory):
+        return []
+    partitions = []
+    for entry in sorted(os.listdir(directory)):
+        prefix, _, value = entry.partition("=")
+        if prefix != key or not os.path.isdir(os.path.join(directory, entry)):
+            continue
+        try:
+            partitions.append((entry, int(value)))
+        except ValueError:
+            continue
+    return partitions
+
+
+def list_outputs(
+    name: str,
+    season: Optional[int] = None,
+    week: Optional[int] = None,
+    root: str = OUTPUT_DIR,
+) -> pd.DataFrame:
+    """Lists the written runs of an output, optionally for one season/week,
+    without opening any of them.
+
+    Args:
+        name (string): name of the output
+        season (int): only list this season
+        week (int): only list this week
+        root (string): root directory of the outputs
+    Returns:
+        outputs (pandas.Dataframe): season, week, run, format and path of
+            every run, oldest first
+    """
+    rows = []
+    output_dir = os.path.join(root, f"output={name}")
+    for season_dir, season_value in partition_values(output_dir, "season"):
+        if season is not None and season_value != season:
+            continue
+        season_path = os.path.join(output_dir, season_dir)
+        for week_dir, week_value in partition_values(season_path, "week"):
+            if week is not None and week_value != week:
+                continue
+            directory = os.path.join(season_path, week_dir)
+            for file_name in os.listdir(directory):
+                stem, _, extension = file_name.rpartition(".")
+                if stem.startswith("run=") and extension in formats:
+                    rows.append(
+                        {
+                            "season": season_value,
+                            "week": week_value,
+                            "run": stem[len("run=") :],
+                            "format": extension,
+                            "path": os.path.join(directory, file_name),
+                        }
+                    )
+    outputs = pd.DataFrame(rows, columns=["season", "week", "run", "format", "path"])
+    return outputs.sort_values(["season", "week", "run"], ignore_index=True)
+
+
+def read_outputs(
+    name: str,
+    weeks: Optional[Iterable[Tuple[int, int]]] = None,
+    run: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    root: str = OUTPUT_DIR,
+) -> pd.DataFrame:
+    """Reads the latest run of every asked for week of an output, only
+    opening those partitions.
+
+    Args:
+        name (string): name of the output
+        weeks (iterable): (season, week) pairs to read, defaults to all
+        run (string): read this run instead of the latest one of each week
+        columns (list): columns to read, defaults to all of them
+        root (string): root directory of the outputs
+    Returns:
+        df (pandas.Dataframe): the runs, with season and week columns added
+            where the output does not have them
+    """
+    listed = list_outputs(name, root=root)
+    if weeks is not None:
+        keys = pd.MultiIndex.from_tuples(list(weeks), names=["season", "week"])
+        listed = listed[pd.MultiIndex.from_frame(listed[["season", "week"]]).isin(keys)]
+    if run is not None:
+        listed = listed[listed["run"] == run]
+    listed = listed.drop_duplicates(["season", "week"], keep="last")
+    if listed.empty:
+        raise LookupError(f"no {name} output for the weeks asked for")
+    # the partition columns are filled in from the path when a file does not
+    # have them, so they are never asked of the reader
+    file_columns = (
+        None if columns is None else [c for c in columns if c not in ("season", "week")]
+    )
+    frames = []
+    for row in listed.itertuples(index=False):
+        _, read = formats[row.format]
+        df = read(row.path, file_columns)
+        for key, value in (("week", row.week), ("season", row.season)):
+            if key not in df.columns:
+                df.insert(0, key, value)
+        frames.append(df if columns is None else df[columns])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,251 @@
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import dst_scoring_model.clean_data as clean_data
+import dst_scoring_model.instrument as instrument
+import dst_scoring_model.maps as maps
+import dst_scoring_model.spec as spec
+
+
+def week_dates(season: int, week: int) -> Tuple[str, str]:
+    """Finds the teamrankings snapshot dates for a week of a season.
+
+    The last 3 games snapshot is taken five days before the week's Thursday
+    game, the same way 2020-09-05 was picked for week 1 of 2020, and the full
+    season snapshot is the week 1 snapshot of the season.
+
+    Args:
+        season (int): the season, must be in maps.season_kickoffs
+        week (int): the week of the season
+    Returns:
+        as_of (string): date of the last 3 games snapshot
+        season_as_of (string): date of the full season snapshot
+    """
+    kickoff = date.fromisoformat(maps.season_kickoffs[season])
+    season_as_of = kickoff - timedelta(days=5)
+    as_of = season_as_of + timedelta(weeks=week - 1)
+    return as_of.isoformat(), season_as_of.isoformat()
+
+
+def current_week(today: Optional[date] = None) -> int:
+    """Finds the week of maps.current_season that is being projected on a
+    date, a week running from its week_dates snapshot to the next one.
+
+    Args:
+        today (datetime.date): the date, defaults to today
+    Returns:
+        week (int): the week of maps.current_season, 1 before the season
+    """
+    today = today or date.today()
+    _, season_as_of = week_dates(maps.current_season, 1)
+    return max((today - date.fromisoformat(season_as_of)).days // 7 + 1, 1)
+
+
+def week_urls(
+    as_of: str = maps.tr_snapshot_date, season_as_of: Optional[str] = None
+) -> List[str]:
+    """Returns every url the pipeline needs for a set of snapshot dates."""
+    import dst_scoring_model.get_qb_data as get_qb_data
+    import dst_scoring_model.get_tr_data as get_tr_data
+
+    urls = [maps.rundown_events_url] + get_qb_data.pfr_urls
+    for value in maps.tr_stat_list.values():
+        urls.extend(get_tr_data.tr_urls(value["url"], as_of, season_as_of))
+    return urls
+
+
+def load_inputs(
+    pages: Dict[str, str],
+    week: int = 1,
+    season: Optional[int] = None,
+    as_of: str = maps.tr_snapshot_date,
+    season_as_of: Optional[str] = None,
+) -> Dict:
+    """Parses the fetched pages into the input dfs of the model.
+
+    Args:
+        pages (dict): url to body mapping with every url from week_urls
+        week (int): week of the season to get lines for
+        season (int): season to get lines for, None for any season
+        as_of (string): date of the last 3 games snapshot
+        season_as_of (string): date of the full season snapshot
+    Returns:
+        inputs (dict): spreads df, tr_items dict of stat dfs and
+            qb_interceptions df
+    """
+    # the scrapers are only imported here, so scoring stored inputs with
+    # build_projections never loads them or requests
+    import dst_scoring_model.get_pinnacle_data as get_pinnacle_data
+    import dst_scoring_model.get_qb_data as get_qb_data
+    import dst_scoring_model.get_tr_data as get_tr_data
+
+    spreads = get_pinnacle_data.get_lines(pages, week, season)
+    tr_items = {}
+    for key, value in maps.tr_stat_list.items():
+        tr_items[key] = get_tr_data.get_tr_stats_full(
+            value["url"], value["column_name"], pages, as_of, season_as_of
+        )
+    qb_interceptions = get_qb_data.get_footballdb_data(pages)
+    return {
+        "spreads": spreads,
+        "tr_items": tr_items,
+        "qb_interceptions": qb_interceptions,
+    }
+
+
+def fetch_inputs(season: int, week: int) -> Dict:
+    """Fetches the pages of a week of a season, with the teamrankings
+    snapshots dated to that week by week_dates, and parses them.
+
+    Args:
+        season (int): the season, must be in maps.season_kickoffs
+        week (int): the week of the season
+    Returns:
+        inputs (dict): spreads, tr_items and qb_interceptions, see load_inputs
+    """
+    import dst_scoring_model.fetch as fetch
+
+    as_of, season_as_of = week_dates(season, week)
+    urls = week_urls(as_of, season_as_of)
+    logging.info("fetching %s pages", len(urls))
+    pages = fetch.fetch_all(urls)
+    return load_inputs(pages, week, season, as_of, season_as_of)
+
+
+def build_team_tables(
+    tr_items: Dict, qb_interceptions: pd.DataFrame
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Assembles the team indexed tables of defensive and offensive rates.
+
+    Args:
+        tr_items (dict): tr_stat_list key to df from get_tr_stats_full
+        qb_interceptions (pandas.Dataframe): df from get_footballdb_data
+    Returns:
+        defense_table (pandas.Dataframe): rates of each team's defense
+        opponent_table (pandas.Dataframe): rates of each team's offense
+    """
+    logging.info("assembling team indexed tables")
+    with instrument.span("merge.team_tables"):
+        defense_table = clean_data.assemble_team_table(
+            [tr_items["sacks_defense_list"]]
+            + [tr_items[item] for item in maps.defense_pure_list]
+        )
+        opponent_table = clean_data.assemble_team_table(
+            [
+                tr_items["sacks_offense_list"],
+                tr_items["interceptions_thrown"],
+                qb_interceptions[["team_name", "interceptions_per_game_qb"]],
+                tr_items["fumbles_thrown"],
+            ]
+        )
+        opponent_table["interceptions_thrown"] = clean_data.interceptions_merge_columns(
+            opponent_table
+        )
+    return defense_table, opponent_table
+
+
+def attach_rates(
+    spreads: pd.DataFrame, defense_table: pd.DataFrame, opponent_table: pd.DataFrame
+) -> pd.DataFrame:
+    """Lines up every team playing in the lines with its own defensive rates
+    and its opponent's offensive rates from build_team_tables.
+
+    Args:
+        spreads (pandas.Dataframe): df of the lines from get_lines
+        defense_table (pandas.Dataframe): rates of each team's defense
+        opponent_table (pandas.Dataframe): rates of each team's offense
+    Returns:
+        fused_df (pandas.Dataframe): one row per team, with the lines and the
+            rate of every event in maps.poisson_events
+    """
+    logging.info("attaching team and opponent stats for full fused_df")
+    with instrument.span("merge.attach_rates", rows=len(spreads)):
+        fused_df = pd.concat(
+            [
+                spreads.reset_index(drop=True),
+                clean_data.lookup_teams(defense_table, spreads["team_name"]),
+                clean_data.lookup_teams(opponent_table, spreads["opponent"]),
+            ],
+            axis=1,
+        )
+    return fused_df
+
+
+def build_rates(
+    spreads: pd.DataFrame, tr_items: Dict, qb_interceptions: pd.DataFrame
+) -> pd.DataFrame:
+    """Lines up every team playing in the lines with its own defensive rates
+    and its opponent's offensive rates.
+
+    Args:
+        spreads (pandas.Dataframe): df of the lines from get_lines
+        tr_items (dict): tr_stat_list key to df from get_tr_stats_full
+        qb_interceptions (pandas.Dataframe): df from get_footballdb_data
+    Returns:
+        fused_df (pandas.Dataframe): one row per team, with the lines and the
+            rate of every event in maps.poisson_events
+    """
+    return attach_rates(spreads, *build_team_tables(tr_items, qb_interceptions))
+
+
+def score_rates(fused_df: pd.DataFrame, plan: Optional[Dict] = None) -> pd.DataFrame:
+    """Turns the rates from build_rates into expected events and fantasy
+    points. Every row is scored on its own, so any subset of the rows scores
+    the same as it would in the full df.
+
+    Args:
+        fused_df (pandas.Dataframe): df from build_rates
+        plan (dict): compiled model spec from spec.compile_spec, defaults to
+            maps.model_spec
+    Returns:
+        fused_df (pandas.Dataframe): projections, in the order of the rates
+    """
+    if plan is None:
+        plan = spec.default_plan()
+    logging.info("scoring poisson events with the compiled model spec")
+    scored = spec.score_plan(
+        plan, fused_df[list(maps.poisson_events)].to_numpy(dtype=float)
+    )
+    events = scored["events"][0]
+    scores = dict(zip(plan["tables"], np.moveaxis(scored["scores"][0], -1, 0)))
+    primary = plan["tables"].index(spec.primary_table)
+
+    logging.info("formatting df")
+    projections = pd.DataFrame(
+        {
+            "team_name": fused_df["team_name"].to_numpy(),
+            "final": scores.pop(spec.primary_table),
+            "opponent": fused_df["opponent"].to_numpy(),
+            "points_allowed_score": scored["points_allowed_score"][0][:, primary],
+            "shutout_probability": np.exp(
+                -fused_df["points_allowed"].to_numpy(dtype=float)
+            ),
+        },
+        index=fused_df.index,
+    )
+    for event in ["interceptions", "fumbles", "sacks", "defensive_touchdowns"]:
+        projections[event] = events[:, maps.scored_events.index(event)]
+    for name, score in scores.items():
+        projections["final_" + name] = score
+    return projections
+
+
+def build_projections(
+    spreads: pd.DataFrame, tr_items: Dict, qb_interceptions: pd.DataFrame
+) -> pd.DataFrame:
+    """Fuses the input dfs and scores every team playing in the lines.
+
+    Args:
+        spreads (pandas.Dataframe): df of the lines from get_lines
+        tr_items (dict): tr_stat_list key to df from get_tr_stats_full
+        qb_interceptions (pandas.Dataframe): df from get_footballdb_data
+    Returns:
+        fused_df (pandas.Dataframe): final projections, best first
+    """
+    with instrument.span("projections", rows=len(spreads)):
+        fused_df = score_rates(build_rates(spreads, tr_items, qb_interceptions))
+        return fused_df.sort_values(by="final", ascending=False)
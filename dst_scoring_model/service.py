@@ -0,0 +1,220 @@
+import argparse
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import pandas as pd
+
+import dst_scoring_model.incremental as incremental
+import dst_scoring_model.maps as maps
+import dst_scoring_model.outputs as outputs
+import dst_scoring_model.pipeline as pipeline
+import dst_scoring_model.team_registry as team_registry
+
+REFRESH_SECONDS = 300
+
+
+class ProjectionService:
+    """Keeps the latest projections in memory, refreshed in the background.
+
+    The team tables and scored lines live in an IncrementalProjections, so a
+    refresh only redoes what changed, and the responses are serialized once
+    per refresh, so requests are answered without touching pandas.
+
+    The lines are revalidated with a conditional request on every refresh
+    rather than served from the response cache until their ttl runs out.
+
+    Args:
+        week (int): week of the season to project, None for
+            pipeline.current_week
+        season (int): season to project, None for maps.current_season
+        interval (float): seconds between refreshes
+        output_format (string): also write every refresh as a run of the
+            projections output in this format, None to not write them
+        output_dir (string): root directory of the outputs
+    """
+
+    def __init__(
+        self,
+        week: Optional[int] = None,
+        season: Optional[int] = None,
+        interval: float = REFRESH_SECONDS,
+        output_format: Optional[str] = None,
+        output_dir: str = outputs.OUTPUT_DIR,
+    ):
+        self.week = week
+        self.season = season
+        self.interval = interval
+        self.output_format = output_format
+        self.output_dir = output_dir
+        self.projections = incremental.IncrementalProjections()
+        self.responses: Dict[str, bytes] = {}
+        self.stopped = threading.Event()
+
+    def current(self) -> Tuple[int, int]:
+        """Returns the (season, week) projected by the next refresh."""
+        season = maps.current_season if self.season is None else self.season
+        week = pipeline.current_week() if self.week is None else self.week
+        return season, week
+
+    def load(self) -> pd.DataFrame:
+        """Fetches the week's pages and returns fresh projections."""
+        import dst_scoring_model.fetch as fetch
+
+        season, week = self.current()
+        as_of, season_as_of = pipeline.week_dates(season, week)
+        urls = pipeline.week_urls(as_of, season_as_of)
+        pages = fetch.fetch_all(url for url in urls if url != maps.rundown_events_url)
+        pages[maps.rundown_events_url] = fetch.get_text(
+            maps.rundown_events_url, max_age=0
+        )
+        inputs = pipeline.load_inputs(pages, week, season, as_of, season_as_of)
+        return self.projections.update(**inputs)
+
+    def publish(self, fused_df: pd.DataFrame):
+        """Serializes the projections into the responses served until the
+        next refresh, swapping them in all at once."""
+        updated = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        records = json.loads(fused_df.to_json(orient="records"))
+        responses = {
+            "/projections": json.dumps(
+                {"updated": updated, "projections": records}
+            ).encode("utf-8")
+        }
+        for record in records:
+            responses["/team/" + record["team_name"].lower()] = json.dumps(
+                {"updated": updated, "projection": record}
+            ).encode("utf-8")
+        self.responses = responses
+
+    def refresh(self) -> bool:
+        """Reloads and publishes the projections, keeping the old ones if
+        anything fails."""
+        try:
+            season, week = self.current()
+            fused_df = self.load()
+            self.publish(fused_df)
+            if self.output_format is not None:
+                outputs.write_output(
+                    fused_df,
+                    "projections",
+                    season,
+                    week,
+                    self.output_format,
+                    root=self.output_dir,
+                )
+        except Exception:
+            logging.exception("refresh failed, serving the last projections")
+            return False
+        logging.info("published projections for %s lines", len(self.responses) - 1)
+        return True
+
+    def refresh_forever(self):
+        """Refreshes every interval seconds until stop is called."""
+        while not self.stopped.is_set():
+            self.refresh()
+            self.stopped.wait(self.interval)
+
+    def start(self) -> threading.Thread:
+        """Starts refreshing on a background thread."""
+        thread = threading.Thread(target=self.refresh_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stopped.set()
+
+    def response(self, path: str) -> Optional[bytes]:
+        """Returns the serialized response of a path, or None if unknown.
+
+        /team/<name> takes any name team_registry knows the team by.
+        """
+        path = unquote(path).rstrip("/")
+        if path.startswith("/team/"):
+            team_id = team_registry.team_ids([path[len("/team/") :]])[0]
+            if team_id >= 0:
+                path = "/team/" + team_registry.names[team_id]
+        return self.responses.get(path.lower())
+
+
+class ProjectionHandler(BaseHTTPRequestHandler):
+    """Answers /projections and /team/<name> from the server's service."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        service = self.server.service
+        if not service.responses:
+            self.send_json(503, b'{"error": "projections not loaded yet"}')
+            return
+        body = service.response(self.path.split("?", 1)[0])
+        if body is None:
+            self.send_json(404, b'{"error": "not found"}')
+        else:
+            self.send_json(200, body)
+
+    def send_json(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug("%s - " + format, self.address_string(), *args)
+
+
+def make_server(
+    service: ProjectionService, host: str = "127.0.0.1", port: int = 8000
+) -> ThreadingHTTPServer:
+    """Returns an http server answering requests from the service."""
+    server = ThreadingHTTPServer((host, port), ProjectionHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Serve D/ST projections over http, refreshed in the background."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--interval", type=float, default=REFRESH_SECONDS)
+    parser.add_argument(
+        "--week", type=int, help="week to project, defaults to the current one"
+    )
+    parser.add_argument(
+        "--season", type=int, help="season to project, defaults to the current one"
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=sorted(outputs.formats),
+        help="also write every refresh to the outputs in this format",
+    )
+    parser.add_argument("--output-dir", default=outputs.OUTPUT_DIR)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(filename="dst_log.log", level=logging.INFO)
+    service = ProjectionService(
+        args.week, args.season, args.interval, args.output_format, args.output_dir
+    )
+    service.start()
+    server = make_server(service, args.host, args.port)
+    logging.info("serving projections on %s:%s", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+import argparse
+import logging
+from datetime import datetime
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import dst_scoring_model.clean_data as clean_data
+import dst_scoring_model.maps as maps
+import dst_scoring_model.model as model
+import dst_scoring_model.pipeline as pipeline
+
+simulated_events = [
+    "points_allowed",
+    "interceptions",
+    "sacks",
+    "fumbles",
+    "defensive_touchdowns",
+]
+
+RESOLUTION = 0.01
+
+# poisson_draws stops building the CDF once it is this close to 1, or after
+# MAX_COUNT steps, whichever comes first
+CDF_EPS = 1e-12
+MAX_COUNT = 1000
+
+# guide_search splits [0, 1) into this many buckets per rate, so most draws
+# are found with a single lookup, poisson_draws only uses it for CDFs of at
+# least GUIDE_MIN_STEPS steps, below which comparing every draw to every step
+# is faster
+GUIDE_SIZE = 1024
+GUIDE_MIN_STEPS = 16
+
+
+def fused_rates(rates_df: pd.DataFrame) -> pd.DataFrame:
+    """Fuses the created and thrown rates from pipeline.build_rates into the
+    rate of each simulated event, the same way build_projections fuses the
+    expected events.
+
+    Args:
+        rates_df (pandas.Dataframe): df from pipeline.build_rates
+    Returns:
+        rates_df (pandas.Dataframe): team_name plus one column per simulated
+            event
+    """
+    rates_df = rates_df.copy()
+    for item in maps.defense_opponent_list:
+        rates_df = clean_data.defense_opponent_fusion(rates_df, item)
+    return rates_df[["team_name"] + simulated_events]
+
+
+def event_caps(caps: Mapping = maps.poisson_events) -> List[int]:
+    """Finds the cap of every simulated event from the caps of a model spec.
+
+    The fused events take the larger of their created and thrown caps, which
+    are the same unless a spec sets them apart.
+
+    Args:
+        caps (dict): poisson event to cap, see maps.poisson_events
+    Returns:
+        caps (list): the cap of every event in simulated_events
+    """
+    return [
+        (
+            max(caps.get(f"{event}_created", 0), caps.get(f"{event}_thrown", 0))
+            if event in maps.defense_opponent_list
+            else caps[event]
+        )
+        for event in simulated_events
+    ]
+
+
+def guide_search(table: np.ndarray, uniforms: np.ndarray) -> np.ndarray:
+    """Counts the steps of a CDF every uniform draw lies above, starting each
+    draw at the count of the lowest of GUIDE_SIZE evenly spaced points below
+    it and only stepping up the few whose bucket holds a step of the CDF.
+
+    Args:
+        table (numpy.ndarray): rates by steps CDF, increasing along each row
+        uniforms (numpy.ndarray): rates by draws uniform draws
+    Returns:
+        counts (numpy.ndarray): rates by draws counts
+    """
+    n_rates, n_sims = uniforms.shape
+    # end every row in a step no draw lies above
+    table = np.concatenate([table, np.full((n_rates, 1), 2.0)], axis=1)
+    width = table.shape[1]
+    rows = np.arange(n_rates, dtype=np.int32)[:, np.newaxis]
+    edges = np.arange(GUIDE_SIZE) / GUIDE_SIZE
+    guide = np.stack([np.searchsorted(row, edges) for row in table]).astype(np.int32)
+    guide = (guide + rows * width).ravel()
+
+    buckets = (uniforms * GUIDE_SIZE).astype(np.int32)
+    buckets += rows * GUIDE_SIZE
+    positions = guide[buckets.ravel()]
+    uniforms = uniforms.ravel()
+    table = table.ravel()
+    pending = np.flatnonzero(table[positions] < uniforms)
+    while pending.size:
+        positions[pending] += 1
+        pending = pending[table[positions[pending]] < uniforms[pending]]
+    counts = positions.reshape(n_rates, n_sims)
+    counts -= rows * width
+    return counts.astype(np.int16)
+
+
+def poisson_draws(
+    rates: np.ndarray,
+    n_sims: int,
+    rng: np.random.Generator,
+    cap: Optional[int] = None,
+) -> np.ndarray:
+    """Draws n_sims poisson counts for every rate by inverting the CDF.
+
+    The CDF of every rate is tabulated one step at a time until it lies above
+    every draw of that rate, is within CDF_EPS of 1 or has cap steps, and each
+    count is the number of steps its uniform draw lies above, found by
+    comparing it to every step of short CDFs and with guide_search for long
+    ones, so the draws are exact up to rounding. This is much faster than
+    rng.poisson for the small rates of the model. Rates whose pmf underflows
+    at 0 are drawn with rng.poisson instead.
+
+    Args:
+        rates (numpy.ndarray): 1-D array of rates
+        n_sims (int): number of draws per rate
+        rng (numpy.random.Generator): generator to draw from
+        cap (int): counts at or above it are returned as cap, None to only
+            stop at MAX_COUNT
+    Returns:
+        counts (numpy.ndarray): n_sims by rates counts
+    """
+    limit = MAX_COUNT if cap is None else min(int(cap), MAX_COUNT)
+    n_rates = len(rates)
+    uniforms = rng.random((n_rates, n_sims))
+    highest = uniforms.max(axis=1, initial=0)
+    pmf = np.exp(-rates)
+    underflowed = pmf == 0
+    cdfs = [pmf]
+    k = 0
+    while k + 1 < limit and np.any(
+        (cdfs[-1] < highest) & (cdfs[-1] < 1 - CDF_EPS) & ~underflowed
+    ):
+        k += 1
+        pmf = pmf * rates / k
+        cdfs.append(cdfs[-1] + pmf)
+    table = np.stack(cdfs, axis=1)
+    if table.shape[1] < GUIDE_MIN_STEPS:
+        counts = np.zeros(uniforms.shape, dtype=np.int16)
+        above = np.empty(uniforms.shape, dtype=bool)
+        for step in table.T:
+            np.greater(uniforms, step[:, np.newaxis], out=above)
+            counts += above.view(np.int8)
+    else:
+        counts = guide_search(table, uniforms)
+    if underflowed.any():
+        counts[underflowed] = np.minimum(
+            rng.poisson(rates[underflowed, np.newaxis], (underflowed.sum(), n_sims)),
+            limit,
+        )
+    return counts.T
+
+
+def simulate_scores(
+    rates: np.ndarray,
+    n_sims: int,
+    rng: np.random.Generator,
+    scoring_table: Mapping = maps.scoring_tables["standard"],
+    caps: Optional[Sequence[int]] = None,
+) -> np.ndarray:
+    """Draws n_sims games per team and scores every draw.
+
+    Each draw is one game per team, with every event in simulated_events drawn
+    from a poisson distribution with that team's rate. The events of a game
+    are drawn independently of each other, as the model has no estimate of
+    how they move together. Teams with a missing rate score NaN.
+
+    Every event is scored with a lookup of the score of each count, and an
+    event drawn at or above its cap scores nothing, the same truncation the
+    projections take their expectations over, so the simulated means match
+    the projected scores.
+
+    Args:
+        rates (numpy.ndarray): teams by simulated_events rates
+        n_sims (int): number of games to simulate per team
+        rng (numpy.random.Generator): generator to draw from
+        scoring_table (dict): scoring table from maps.scoring_tables
+        caps (list): cap of every event in simulated_events, see event_caps,
+            None to not truncate
+    Returns:
+        scores (numpy.ndarray): n_sims by teams fantasy points
+    """
+    if caps is None:
+        caps = [None] * len(simulated_events)
+    missing = np.isnan(rates).any(axis=1)
+    scores = np.zeros((n_sims, len(rates)))
+    for i, (event, cap) in enumerate(zip(simulated_events, caps)):
+        counts = poisson_draws(np.nan_to_num(rates[:, i]), n_sims, rng, cap)
+        # the score of every count the draws can take, counts can only reach
+        # the cap when they are at or above it
+        possible = np.arange(MAX_COUNT + 1 if cap is None else cap + 1)
+        if event == "points_allowed":
+            values = model.points_allowed_scores(
+                possible, scoring_table["points_allowed"]
+            )
+        else:
+            values = possible * float(scoring_table["weights"].get(event, 0))
+        if cap is not None:
+            values[cap:] = 0
+        scores += values[counts]
+    scores[:, missing] = np.nan
+    return scores
+
+
+def add_histogram(histogram: Optional[Tuple[int, np.ndarray]], bins: np.ndarray):
+    """Adds binned scores to a running per team histogram.
+
+    Args:
+        histogram (tuple): lowest bin and bins by teams counts, or None
+        bins (numpy.ndarray): n_sims by teams binned scores
+    Returns:
+        histogram (tuple): the updated lowest bin and counts
+    """
+    n_teams = bins.shape[1]
+    low, high = int(bins.min()), int(bins.max())
+    if histogram is not None:
+        low, high = min(low, histogram[0]), max(
+            high, histogram[0] + len(histogram[1]) - 1
+        )
+    span = high - low + 1
+    flat = (bins - low) * n_teams + np.arange(n_teams)
+    counts = np.bincount(flat.ravel(), minlength=span * n_teams).reshape(span, n_teams)
+    if histogram is not None:
+        offset = histogram[0] - low
+        counts[offset : offset + len(histogram[1])] += histogram[1]
+    return low, counts
+
+
+def simulate(
+    rates_df: pd.DataFrame,
+    n_sims: int = 100_000,
+    seed: Optional[int] = 0,
+    chunk_size: int = 25_000,
+    scoring_table: Mapping = maps.scoring_tables["standard"],
+    caps: Mapping = maps.poisson_events,
+    boom: float = 15,
+    bust: float = 3,
+    percentiles: Sequence[float] = (10, 25, 75, 90),
+) -> pd.DataFrame:
+    """Simulates the distribution of D/ST scores for every team.
+
+    Draws are made chunk_size games at a time to bound memory, each chunk from
+    its own stream spawned off the seed, so the same seed and chunk_size
+    always give the same results. Scores are kept as a histogram at
+    RESOLUTION points, which the median and percentiles are read off of.
+
+    Args:
+        rates_df (pandas.Dataframe): df from fused_rates
+        n_sims (int): number of games to simulate per team
+        seed (int): seed of the random streams, None for a fresh one
+        chunk_size (int): max number of games drawn at once
+        scoring_table (dict): scoring table from maps.scoring_tables
+        caps (dict): poisson event to cap, see maps.poisson_events
+        boom (float): score at or above which a game is a boom
+        bust (float): score at or below which a game is a bust
+        percentiles (list): percentiles of the score to report
+    Returns:
+        summary (pandas.Dataframe): mean, median, percentiles and boom/bust
+            probabilities per team, best mean first
+    """
+    rates = rates_df[simulated_events].to_numpy(dtype=float)
+    n_teams = len(rates)
+    chunks = [chunk_size] * (n_sims // chunk_size)
+    if n_sims % chunk_size:
+        chunks.append(n_sims % chunk_size)
+    streams = np.random.SeedSequence(seed).spawn(len(chunks))
+    simulated_caps = event_caps(caps)
+    logging.info("simulating %s games for %s teams", n_sims, n_teams)
+
+    total = np.zeros(n_teams)
+    booms = np.zeros(n_teams)
+    busts = np.zeros(n_teams)
+    histogram = None
+    for n_chunk, stream in zip(chunks, streams):
+        scores = simulate_scores(
+            rates,
+            n_chunk,
+            np.random.default_rng(stream),
+            scoring_table,
+            simulated_caps,
+        )
+        total += scores.sum(axis=0)
+        booms += (scores >= boom).sum(axis=0)
+        busts += (scores <= bust).sum(axis=0)
+        bins = np.rint(np.nan_to_num(scores) / RESOLUTION).astype(np.int64)
+        histogram = add_histogram(histogram, bins)
+
+    summary = pd.DataFrame(
+        {
+            "team_name": rates_df["team_name"].to_numpy(),
+            "mean": total / n_sims,
+        }
+    )
+    low, counts = histogram
+    cumulative = np.cumsum(counts, axis=0)
+    quantiles = np.array([50] + list(percentiles))
+    positions = np.ceil(quantiles / 100 * n_sims).clip(1, n_sims)
+    values = np.empty((n_teams, len(quantiles)))
+    for team in range(n_teams):
+        found = np.searchsorted(cumulative[:, team], positions)
+        values[team] = (found + low) * RESOLUTION
+    missing = np.isnan(total)
+    values[missing] = np.nan
+    booms[missing] = busts[missing] = np.nan
+    summary["median"] = values[:, 0]
+    for i, percentile in enumerate(percentiles, start=1):
+        summary[f"p{percentile:g}"] = values[:, i]
+    summary["boom"] = booms / n_sims
+    summary["bust"] = busts / n_sims
+    return summary.sort_values(by="mean", ascending=False)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Simulate the D/ST score distribution of this week's teams."
+    )
+    parser.add_argument("--sims", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=25_000)
+    args = parser.parse_args(argv)
+
+    import dst_scoring_model.fetch as fetch
+
+    logging.basicConfig(filename="dst_log.log", level=logging.INFO)
+    pages = fetch.fetch_all(pipeline.week_urls())
+    rates_df = fused_rates(pipeline.build_rates(**pipeline.load_inputs(pages)))
+    summary = simulate(rates_df, args.sims, args.seed, args.chunk_size)
+    current_date = "{:%Y_%m_%d}".format(datetime.now())
+    summary.to_csv(f"df_sim_{current_date}.csv", index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow.feather as feather
+
+import dst_scoring_model.maps as maps
+
+STORE_DIR = os.environ.get("DST_STORE_DIR", "dst_store")
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+def partition_dir(source: str, season: int, week: int, root: str = STORE_DIR) -> str:
+    """Returns the hive style partition directory of a source's week."""
+    return os.path.join(root, f"source={source}", f"season={season}", f"week={week}")
+
+
+def write_snapshot(
+    df: pd.DataFrame,
+    source: str,
+    season: int,
+    week: int,
+    fetched: Optional[str] = None,
+    root: str = STORE_DIR,
+) -> str:
+    """Writes a source's normalized df to the store as an uncompressed Feather
+    file, so it can be memory mapped on read.
+
+    Args:
+        df (pandas.Dataframe): the df to store
+        source (string): name of the source, e.g. "lines" or a tr_stat_list key
+        season (int): season the df is for
+        week (int): week the df is for
+        fetched (string): fetch timestamp, defaults to now in UTC
+        root (string): root directory of the store
+    Returns:
+        path (string): path of the written file
+    """
+    if fetched is None:
+        fetched = datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+    directory = partition_dir(source, season, week, root)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"fetched={fetched}.feather")
+    tmp_path = path + ".tmp"
+    # one chunk per column, as columns split over chunks are copied on read
+    feather.write_feather(
+        df.reset_index(drop=True),
+        tmp_path,
+        compression="uncompressed",
+        chunksize=max(len(df), 1),
+    )
+    os.replace(tmp_path, path)
+    logging.debug("wrote snapshot %s", path)
+    return path
+
+
+def list_snapshots(
+    source: str,
+    season: Optional[int] = None,
+    week: Optional[int] = None,
+    root: str = STORE_DIR,
+) -> pd.DataFrame:
+    """Lists the stored snapshots of a source, optionally for one season/week.
+
+    Args:
+        source (string): name of the source
+        season (int): only list this season
+        week (int): only list this week
+        root (string): root directory of the store
+    Returns:
+        snapshots (pandas.Dataframe): season, week, fetched and path of every
+            snapshot, oldest first
+    """
+    rows = []
+    source_dir = os.path.join(root, f"source={source}")
+    for season_dir in (
+        sorted(os.listdir(source_dir)) if os.path.isdir(source_dir) else []
+    ):
+        season_value = int(season_dir.split("=", 1)[1])
+        if season is not None and season_value != season:
+            continue
+        for week_dir in os.listdir(os.path.join(source_dir, season_dir)):
+            week_value = int(week_dir.split("=", 1)[1])
+            if week is not None and week_value != week:
+                continue
+            directory = os.path.join(source_dir, season_dir, week_dir)
+            for file_name in os.listdir(directory):
+                if file_name.endswith(".feather"):
+                    rows.append(
+                        {
+                            "season": season_value,
+                            "week": week_value,
+                            "fetched": file_name[len("fetched=") : -len(".feather")],
+                            "path": os.path.join(directory, file_name),
+                        }
+                    )
+    snapshots = pd.DataFrame(rows, columns=["season", "week", "fetched", "path"])
+    return snapshots.sort_values(["season", "week", "fetched"], ignore_index=True)
+
+
+def read_snapshot(
+    source: str,
+    season: int,
+    week: int,
+    fetched: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    root: str = STORE_DIR,
+) -> pd.DataFrame:
+    """Reads a stored snapshot, memory mapping the file and only reading the
+    columns asked for. Numeric columns without nulls are handed to pandas
+    without copying them out of the memory map, so they are read only.
+
+    Args:
+        source (string): name of the source
+        season (int): season of the snapshot
+        week (int): week of the snapshot
+        fetched (string): fetch timestamp, defaults to the latest one
+        columns (list): columns to read, defaults to all of them
+        root (string): root directory of the store
+    Returns:
+        df (pandas.Dataframe): the stored df
+    """
+    if fetched is None:
+        snapshots = list_snapshots(source, season, week, root)
+        if snapshots.empty:
+            raise LookupError(f"no {source} snapshot for {season} week {week}")
+        path = snapshots["path"].iloc[-1]
+    else:
+        path = os.path.join(
+            partition_dir(source, season, week, root), f"fetched={fetched}.feather"
+        )
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    # split_blocks stops pandas consolidating the columns into one copied block
+    return table.to_pandas(split_blocks=True)
+
+
+def save_inputs(
+    inputs: Dict,
+    season: int,
+    week: int,
+    fetched: Optional[str] = None,
+    root: str = STORE_DIR,
+) -> str:
+    """Stores every input df from pipeline.load_inputs under one timestamp.
+
+    Args:
+        inputs (dict): spreads, tr_items and qb_interceptions
+        season (int): season the inputs are for
+        week (int): week the inputs are for
+        fetched (string): fetch timestamp, defaults to now in UTC
+        root (string): root directory of the store
+    Returns:
+        fetched (string): the fetch timestamp used
+    """
+    if fetched is None:
+        fetched = datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+    write_snapshot(inputs["spreads"], "lines", season, week, fetched, root)
+    for key, df in inputs["tr_items"].items():
+        write_snapshot(df, key, season, week, fetched, root)
+    write_snapshot(
+        inputs["qb_interceptions"], "qb_interceptions", season, week, fetched, root
+    )
+    return fetched
+
+
+def load_inputs(
+    season: int, week: int, fetched: Optional[str] = None, root: str = STORE_DIR
+) -> Dict:
+    """Loads the input dfs of a week back from the store, ready for
+    pipeline.build_projections.
+
+    Args:
+        season (int): season of the inputs
+        week (int): week of the inputs
+        fetched (string): fetch timestamp, defaults to the latest lines
+        root (string): root directory of the store
+    Returns:
+        inputs (dict): spreads, tr_items and qb_interceptions
+    """
+    if fetched is None:
+        snapshots = list_snapshots("lines", season, week, root)
+        if snapshots.empty:
+            raise LookupError(f"no snapshot for {season} week {week}")
+        fetched = snapshots["fetched"].iloc[-1]
+    return {
+        "spreads": read_snapshot("lines", season, week, fetched, root=root),
+        "tr_items": {
+            key: read_snapshot(key, season, week, fetched, root=root)
+            for key in maps.tr_stat_list
+        },
+        "qb_interceptions": read_snapshot(
+            "qb_interceptions",
+            season,
+            week,
+            fetched,
+            columns=["team_name", "interceptions_per_game_qb"],
+            root=root,
+        ),
+    }
@@ -0,0 +1,306 @@
+import functools
+import json
+import os
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import dst_scoring_model.instrument as instrument
+import dst_scoring_model.maps as maps
+import dst_scoring_model.model as model
+import dst_scoring_model.points_allowed as points_allowed
+
+primary_table = "standard"
+
+
+def read_toml(path: str) -> Dict:
+    """Reads a toml file with tomllib, or tomli or toml before python 3.11."""
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            tomllib = None
+    if tomllib is not None:
+        with open(path, "rb") as toml_file:
+            return tomllib.load(toml_file)
+    try:
+        import toml
+    except ImportError:
+        raise ImportError("reading toml specs needs python 3.11, tomli or toml")
+    with open(path) as toml_file:
+        return toml.load(toml_file)
+
+
+def read_yaml(path: str) -> Dict:
+    """Reads a yaml file with PyYAML."""
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("reading yaml specs needs PyYAML")
+    with open(path) as yaml_file:
+        return yaml.safe_load(yaml_file) or {}
+
+
+def read_json(path: str) -> Dict:
+    with open(path) as json_file:
+        return json.load(json_file)
+
+
+# spec file readers by extension, anything else is read as json
+spec_readers = {".toml": read_toml, ".yaml": read_yaml, ".yml": read_yaml}
+
+
+def load_spec(path: str) -> Dict:
+    """Reads a model spec from a json, toml or yaml file, filling anything it
+    leaves out from maps.model_spec.
+
+    Args:
+        path (string): path of the spec file
+    Returns:
+        spec (dict): the full model spec
+    """
+    extension = os.path.splitext(path)[1].lower()
+    return merge_spec(spec_readers.get(extension, read_json)(path))
+
+
+def merge_spec(spec: Mapping) -> Dict:
+    """Fills a partial spec from maps.model_spec. recency, fusion and caps are
+    merged key by key, scoring tables are replaced as a whole."""
+    unknown = set(spec) - set(maps.model_spec)
+    if unknown:
+        raise ValueError(f"unknown model spec keys: {sorted(unknown)}")
+    merged = {}
+    for key, default in maps.model_spec.items():
+        if key == "scoring":
+            merged[key] = spec.get(key, default)
+        else:
+            merged[key] = {**default, **spec.get(key, {})}
+    return merged
+
+
+def compile_specs(specs: Sequence[Mapping]) -> Dict:
+    """Compiles model specs into the arrays score_plan works on, one slice per
+    spec along the first axis.
+
+    Args:
+        specs (list): model specs, see maps.model_spec, all with the same
+            scoring table names
+    Returns:
+        plan (dict): recency (specs by 2), caps (specs by poisson events),
+            fusion (specs by poisson events by scored events), weights
+            (specs by scored events by tables), the points_allowed tables of
+            every spec and the table names
+    """
+    specs = [merge_spec(spec) for spec in specs]
+    tables = list(specs[0]["scoring"])
+    if primary_table not in tables:
+        raise ValueError(f"the scoring tables need a {primary_table} table")
+    events = list(maps.poisson_events)
+    recency = np.empty((len(specs), 2))
+    caps = np.empty((len(specs), len(events)), dtype=np.int64)
+    fusion = np.zeros((len(specs), len(events), len(maps.scored_events)))
+    weights = np.zeros((len(specs), len(maps.scored_events) - 1, len(tables)))
+    points_allowed = []
+    for i, spec in enumerate(specs):
+        if list(spec["scoring"]) != tables:
+            raise ValueError("every spec needs the same scoring tables")
+        recency[i] = spec["recency"]["season"], spec["recency"]["last_3"]
+        caps[i] = [spec["caps"][event] for event in events]
+        for j, event in enumerate(events):
+            stat, _, side = event.rpartition("_")
+            if side in ("created", "thrown"):
+                fusion[i, j, maps.scored_events.index(stat)] = spec["fusion"][side]
+            else:
+                fusion[i, j, maps.scored_events.index(event)] = 1.0
+        for t, table in enumerate(tables):
+            for e, event in enumerate(maps.scored_events[1:]):
+                weights[i, e, t] = spec["scoring"][table]["weights"].get(event, 0)
+        points_allowed.append(
+            [spec["scoring"][table]["points_allowed"] for table in tables]
+        )
+    return {
+        "recency": recency,
+        "caps": caps,
+        "fusion": fusion,
+        "weights": weights,
+        "points_allowed": points_allowed,
+        "tables": tables,
+    }
+
+
+def compile_spec(spec: Mapping = maps.model_spec) -> Dict:
+    """Compiles a single spec, see compile_specs."""
+    return compile_specs([spec])
+
+
+@functools.lru_cache(maxsize=None)
+def default_plan() -> Dict:
+    """Returns the compiled maps.model_spec, compiled once."""
+    return compile_spec(maps.model_spec)
+
+
+def score_plan(plan: Dict, rates: np.ndarray) -> Dict[str, np.ndarray]:
+    """Scores rates under every compiled spec of a plan at once, see
+    plan_expectations and score_expectations.
+
+    Args:
+        plan (dict): plan from compile_specs
+        rates (numpy.ndarray): teams by poisson events rates, or specs by
+            teams by poisson events to give each spec its own rates
+    Returns:
+        scored (dict): events (specs by teams by scored events),
+            points_allowed_score and scores (both specs by teams by tables)
+    """
+    rates = np.asarray(rates, dtype=float)
+    return score_expectations(plan, plan_expectations(plan, rates), rates[..., 0])
+
+
+def plan_expectations(plan: Dict, rates: np.ndarray) -> np.ndarray:
+    """Runs the rates through the poisson expectation of each spec's caps.
+
+    Args:
+        plan (dict): plan from compile_specs, only its caps are used
+        rates (numpy.ndarray): teams by poisson events rates, or specs by
+            teams by poisson events to give each spec its own rates
+    Returns:
+        expected (numpy.ndarray): specs by teams by poisson events
+    """
+    n_specs, n_events = plan["caps"].shape
+    rates = np.broadcast_to(
+        np.asarray(rates, dtype=float), (n_specs,) + np.shape(rates)[-2:]
+    )
+    n_teams = rates.shape[1]
+    with instrument.span("poisson", rows=n_teams, specs=n_specs):
+        expected = model.poisson_expectation_matrix(
+            rates.transpose(1, 0, 2).reshape(n_teams, n_specs * n_events),
+            plan["caps"].ravel(),
+        )
+    return expected.reshape(n_teams, n_specs, n_events).transpose(1, 0, 2)
+
+
+def score_expectations(
+    plan: Dict, expected: np.ndarray, points_allowed_rates: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Fuses and scores expected events under every spec of a plan.
+
+    A single contraction with the fusion matrix gives the scored events and
+    one with the weight matrix gives the fantasy points, on top of the
+    expected points allowed score of each table, which is taken over the
+    points allowed distribution, truncated at each spec's points allowed cap,
+    rather than from the expected points.
+
+    Args:
+        plan (dict): plan from compile_specs
+        expected (numpy.ndarray): specs by teams by poisson events
+        points_allowed_rates (numpy.ndarray): points allowed rate of every
+            team, or specs by teams
+    Returns:
+        scored (dict): events (specs by teams by scored events),
+            points_allowed_score and scores (both specs by teams by tables)
+    """
+    n_specs, n_teams, _ = expected.shape
+    points_allowed_rates = np.broadcast_to(points_allowed_rates, (n_specs, n_teams))
+    with instrument.span("score", rows=n_teams, specs=n_specs):
+        # a missing rate only makes the events it feeds missing, not every event
+        # it shares a row of the fusion contraction with
+        events = np.einsum("ste,sek->stk", np.nan_to_num(expected), plan["fusion"])
+        missing = np.einsum("ste,sek->stk", np.isnan(expected), plan["fusion"] != 0)
+        events[missing] = np.nan
+        points_allowed_score = np.stack(
+            [
+                np.stack(
+                    [
+                        points_allowed.expected_scores(
+                            points_allowed_rates[s], table, plan["caps"][s, 0]
+                        )
+                        for table in spec
+                    ],
+                    axis=-1,
+                )
+                for s, spec in enumerate(plan["points_allowed"])
+            ]
+        )
+        scores = points_allowed_score + np.einsum(
+            "ste,sek->stk", events[:, :, 1:], plan["weights"]
+        )
+    return {
+        "events": events,
+        "points_allowed_score": points_allowed_score,
+        "scores": scores,
+    }
+
+
+def rate_arrays(rates_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Pulls the arrays blend_rates needs out of a build_rates df, once.
+
+    Args:
+        rates_df (pandas.Dataframe): df from pipeline.build_rates
+    Returns:
+        arrays (dict): points_allowed, qb interceptions, and the season and
+            last 3 values of every teamrankings stat, teams by stats
+    """
+    stats = list(maps.poisson_events)[1:]
+    return {
+        "points_allowed": rates_df["points_allowed"].to_numpy(dtype=float),
+        "season": rates_df[[stat + "_season" for stat in stats]].to_numpy(dtype=float),
+        "last_3": rates_df[[stat + "_last_3" for stat in stats]].to_numpy(dtype=float),
+        "qb": rates_df["interceptions_per_game_qb"].to_numpy(dtype=float),
+    }
+
+
+def blend_rates(arrays: Mapping[str, np.ndarray], plan: Dict) -> np.ndarray:
+    """Re-weights the season and last 3 values kept by get_tr_stats_full with
+    the recency weights of every spec.
+
+    The line's points allowed is not a teamrankings stat and is used as is,
+    and a QB's own interceptions per game still replace the team's.
+
+    Args:
+        arrays (dict): arrays from rate_arrays
+        plan (dict): plan from compile_specs
+    Returns:
+        rates (numpy.ndarray): specs by teams by poisson events
+    """
+    blended = (
+        arrays["season"] * plan["recency"][:, 0, np.newaxis, np.newaxis]
+        + arrays["last_3"] * plan["recency"][:, 1, np.newaxis, np.newaxis]
+    )
+    column = list(maps.poisson_events)[1:].index("interceptions_thrown")
+    qb = arrays["qb"]
+    blended[:, :, column] = np.where(np.isnan(qb), blended[:, :, column], qb)
+    points_allowed = np.broadcast_to(arrays["points_allowed"], blended.shape[:2])
+    return np.concatenate([points_allowed[..., np.newaxis], blended], axis=-1)
+
+
+def evaluate_specs(
+    rates_df: pd.DataFrame, specs: Sequence[Mapping], names: Optional[List] = None
+) -> pd.DataFrame:
+    """Scores a week under many candidate specs in one batched call.
+
+    Args:
+        rates_df (pandas.Dataframe): df from pipeline.build_rates
+        specs (list): model specs to score
+        names (list): name of every spec, defaults to its position
+    Returns:
+        scores (pandas.Dataframe): spec, team_name, opponent and the final
+            points of every scoring table, one row per spec and team
+    """
+    plan = compile_specs(specs)
+    scores = score_plan(plan, blend_rates(rate_arrays(rates_df), plan))["scores"]
+    n_specs, n_teams, _ = scores.shape
+    if names is None:
+        names = list(range(n_specs))
+    result = pd.DataFrame(
+        {
+            "spec": np.repeat(np.asarray(names, dtype=object), n_teams),
+            "team_name": np.tile(rates_df["team_name"].to_numpy(), n_specs),
+            "opponent": np.tile(rates_df["opponent"].to_numpy(), n_specs),
+        }
+    )
+    for t, table in enumerate(plan["tables"]):
+        column = "final" if table == primary_table else "final_" + table
+        result[column] = scores[:, :, t].ravel()
+    return result
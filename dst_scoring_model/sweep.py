@@ -0,0 +1,292 @@
+import argparse
+import itertools
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import dst_scoring_model.backtest as backtest
+import dst_scoring_model.pipeline as pipeline
+import dst_scoring_model.spec as spec
+
+CHUNK_SIZE = 128
+
+complements = {"recency": ("season", "last_3"), "fusion": ("created", "thrown")}
+
+metrics = ["n", "mae", "rmse", "correlation"]
+
+
+def grid_specs(grid: Mapping[str, Sequence]) -> Tuple[List[Dict], pd.DataFrame]:
+    """Expands a grid of parameters into one spec per combination.
+
+    Parameters are named "section.key" after maps.model_spec, e.g.
+    "recency.season", "fusion.created" or "caps.points_allowed". Sweeping one
+    weight of recency or fusion sets the other to 1 minus it, unless both are
+    swept.
+
+    Args:
+        grid (dict): parameter name to the values to try
+    Returns:
+        specs (list): partial specs for spec.compile_specs
+        params (pandas.Dataframe): the parameters of every spec
+    """
+    names = list(grid)
+    for name in names:
+        section, _, key = name.partition(".")
+        if section not in complements and section != "caps" or not key:
+            raise ValueError(f"can not sweep {name}")
+    combinations = list(itertools.product(*(grid[name] for name in names)))
+    specs = []
+    for combination in combinations:
+        candidate: Dict[str, Dict] = {}
+        for name, value in zip(names, combination):
+            section, _, key = name.partition(".")
+            candidate.setdefault(section, {})[key] = value
+        for section, (first, second) in complements.items():
+            values = candidate.get(section, {})
+            if first in values and second not in values:
+                values[second] = 1 - values[first]
+            elif second in values and first not in values:
+                values[first] = 1 - values[second]
+        specs.append(candidate)
+    return specs, pd.DataFrame(combinations, columns=names)
+
+
+def load_history(
+    weeks: Iterable[Tuple[int, int]],
+    actuals: pd.DataFrame,
+    snapshot_dir: Optional[str] = None,
+    store: Optional[str] = None,
+) -> Dict[str, np.ndarray]:
+    """Loads every week once and lines its rates up with the actual results.
+
+    Weeks that can not be loaded are logged and skipped, and teams without an
+    actual result are dropped.
+
+    Args:
+        weeks (iterable): (season, week) pairs to load
+        actuals (pandas.Dataframe): actual results, with season, week,
+            team_name and actual columns
+        snapshot_dir (string): root directory of the saved pages
+        store (string): root directory of a snapshots store
+    Returns:
+        arrays (dict): arrays from spec.rate_arrays for every team week, plus
+            the actual results
+    """
+    frames = []
+    for season, week in weeks:
+        try:
+            inputs = backtest.load_week_inputs(season, week, snapshot_dir, store)
+        except (OSError, LookupError) as error:
+            logging.warning("skipping %s week %s: %s", season, week, error)
+            continue
+        frames.append(pipeline.build_rates(**inputs).assign(season=season, week=week))
+    if not frames:
+        raise LookupError("no weeks could be loaded")
+    history = pd.merge(
+        pd.concat(frames, ignore_index=True),
+        actuals[["season", "week", "team_name", "actual"]],
+        how="inner",
+        on=["season", "week", "team_name"],
+    )
+    history = history[history["actual"].notna()]
+    arrays = spec.rate_arrays(history)
+    arrays["actual"] = history["actual"].to_numpy(dtype=float)
+    return arrays
+
+
+def error_metrics(predictions: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """Computes the error metrics of many sets of predictions at once.
+
+    Args:
+        predictions (numpy.ndarray): specs by team weeks predictions
+        actual (numpy.ndarray): actual result of every team week
+    Returns:
+        metrics (numpy.ndarray): specs by n, mae, rmse and correlation,
+            skipping missing predictions
+    """
+    valid = ~np.isnan(predictions)
+    n = valid.sum(axis=1)
+    error = np.where(valid, predictions - actual, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mae = np.abs(error).sum(axis=1) / n
+        rmse = np.sqrt((error**2).sum(axis=1) / n)
+        mean_prediction = np.where(valid, predictions, 0.0).sum(axis=1) / n
+        mean_actual = np.where(valid, actual, 0.0).sum(axis=1) / n
+        prediction_diff = np.where(valid, predictions - mean_prediction[:, None], 0.0)
+        actual_diff = np.where(valid, actual - mean_actual[:, None], 0.0)
+        correlation = (prediction_diff * actual_diff).sum(axis=1) / np.sqrt(
+            (prediction_diff**2).sum(axis=1) * (actual_diff**2).sum(axis=1)
+        )
+    return np.column_stack([n, mae, rmse, correlation])
+
+
+def score_specs(arrays: Mapping[str, np.ndarray], specs: Sequence[Mapping]):
+    """Scores every team week under a chunk of specs and measures the errors.
+
+    Specs sharing their recency weights and caps share their poisson
+    expectations, so those are only computed once per distinct pair.
+
+    Args:
+        arrays (dict): arrays from load_history
+        specs (list): specs to score
+    Returns:
+        metrics (numpy.ndarray): specs by metrics, see error_metrics
+    """
+    plan = spec.compile_specs(specs)
+    keys = np.concatenate([plan["recency"], plan["caps"]], axis=1)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    distinct = {"recency": plan["recency"][first], "caps": plan["caps"][first]}
+    expected = spec.plan_expectations(distinct, spec.blend_rates(arrays, distinct))
+    scores = spec.score_expectations(
+        plan, expected[inverse.ravel()], arrays["points_allowed"]
+    )["scores"]
+    final = scores[:, :, plan["tables"].index(spec.primary_table)]
+    return error_metrics(final, arrays["actual"])
+
+
+def share_arrays(arrays: Mapping[str, np.ndarray]):
+    """Copies arrays into shared memory blocks, once, for the workers.
+
+    Returns:
+        blocks (list): the shared memory blocks, to close and unlink
+        layout (dict): name to (block name, shape, dtype) for attach_arrays
+    """
+    blocks, layout = [], {}
+    for name, array in arrays.items():
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        layout[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, layout
+
+
+def attach_arrays(layout: Mapping[str, tuple]):
+    """Maps the shared arrays of share_arrays without copying them.
+
+    Returns:
+        blocks (list): the attached blocks, to close once the arrays are gone
+        arrays (dict): name to read only array
+    """
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in layout.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        array = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        blocks.append(block)
+        arrays[name] = array
+    return blocks, arrays
+
+
+def _score_chunk(args: Tuple[Mapping[str, tuple], Sequence[Mapping]]) -> np.ndarray:
+    layout, specs = args
+    blocks, arrays = attach_arrays(layout)
+    try:
+        return score_specs(arrays, specs)
+    finally:
+        del arrays
+        for block in blocks:
+            block.close()
+
+
+def run_sweep(
+    arrays: Mapping[str, np.ndarray],
+    specs: Sequence[Mapping],
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> np.ndarray:
+    """Scores every spec against the history, chunk_size specs per batched
+    call, fanning the chunks out across a process pool that reads the history
+    from shared memory.
+
+    Args:
+        arrays (dict): arrays from load_history
+        specs (list): specs to score
+        workers (int): processes to use, 1 runs everything in this process
+        chunk_size (int): max number of specs scored in one batched call
+    Returns:
+        metrics (numpy.ndarray): specs by metrics, see error_metrics
+    """
+    chunks = [specs[i : i + chunk_size] for i in range(0, len(specs), chunk_size)]
+    logging.info("sweeping %s specs in %s chunks", len(specs), len(chunks))
+    if workers == 1 or len(chunks) == 1:
+        results = [score_specs(arrays, chunk) for chunk in chunks]
+    else:
+        blocks, layout = share_arrays(arrays)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(
+                    executor.map(_score_chunk, [(layout, chunk) for chunk in chunks])
+                )
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    return np.concatenate(results)
+
+
+def sweep(
+    grid: Mapping[str, Sequence],
+    arrays: Mapping[str, np.ndarray],
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> pd.DataFrame:
+    """Scores every combination of a parameter grid against the history.
+
+    Args:
+        grid (dict): parameter name to the values to try, see grid_specs
+        arrays (dict): arrays from load_history
+        workers (int): processes to use, 1 runs everything in this process
+        chunk_size (int): max number of specs scored in one batched call
+    Returns:
+        results (pandas.Dataframe): the parameters and error metrics of every
+            combination, lowest mae first
+    """
+    specs, params = grid_specs(grid)
+    results = run_sweep(arrays, specs, workers, chunk_size)
+    params[metrics] = results
+    params["n"] = params["n"].astype(np.int64)
+    return params.sort_values(by="mae", ignore_index=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Grid search the model spec against past D/ST results."
+    )
+    parser.add_argument(
+        "--grid", required=True, help='json file, e.g. {"fusion.created": [0.4, 0.5]}'
+    )
+    parser.add_argument("--seasons", required=True, help="e.g. 2016-2020")
+    parser.add_argument("--weeks", default="1-17", help="e.g. 1-17")
+    parser.add_argument("--snapshots", help="directory of saved pages")
+    parser.add_argument("--store", help="snapshots store to load inputs from")
+    parser.add_argument(
+        "--actuals",
+        required=True,
+        help="csv with season, week, team_name and actual columns",
+    )
+    parser.add_argument("--output", default="sweep.csv")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(filename="dst_log.log", level=logging.INFO)
+    with open(args.grid) as grid_file:
+        grid = json.load(grid_file)
+    weeks = [
+        (season, week)
+        for season in backtest.parse_range(args.seasons)
+        for week in backtest.parse_range(args.weeks)
+    ]
+    arrays = load_history(weeks, pd.read_csv(args.actuals), args.snapshots, args.store)
+    results = sweep(grid, arrays, args.workers, args.chunk_size)
+    results.to_csv(args.output, index=False)
+    print(results.head(10).to_string())
+
+
+if __name__ == "__main__":
+    main()
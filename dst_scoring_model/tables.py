@@ -0,0 +1,106 @@
+from html.parser import HTMLParser
+from typing import List
+
+
+class TableRowParser(HTMLParser):
+    """Streaming parser that only keeps the td text of the first table with
+    the given class, instead of building a tree of the whole page.
+
+    Open table, tr and td elements are tracked on a stack and end tags close
+    everything above their matching start tag, the same way BeautifulSoup
+    nests tags with html.parser, so cell text matches td.text exactly.
+
+    Args:
+        table_class (string): class attribute of the table to read
+    """
+
+    def __init__(self, table_class: str):
+        super().__init__(convert_charrefs=True)
+        self.table_class = table_class
+        self.rows: List[List[list]] = []
+        self.stack: List[tuple] = []
+        self.found = False
+        self.done = False
+
+    def is_target(self, attrs) -> bool:
+        for name, value in attrs:
+            if name == "class" and value is not None:
+                return value == self.table_class or self.table_class in value.split()
+        return False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if not self.stack:
+            if tag == "table" and not self.found and self.is_target(attrs):
+                self.found = True
+                self.stack.append(("table", None))
+        elif tag == "table":
+            self.stack.append(("table", None))
+        elif tag == "tr":
+            row: List[list] = []
+            self.rows.append(row)
+            self.stack.append(("tr", row))
+        elif tag == "td":
+            cell: List[str] = []
+            for name, row in self.stack:
+                if name == "tr":
+                    row.append(cell)
+            self.stack.append(("td", cell))
+
+    def handle_endtag(self, tag):
+        if self.done or tag not in ("table", "tr", "td"):
+            return
+        for position in range(len(self.stack) - 1, -1, -1):
+            if self.stack[position][0] == tag:
+                del self.stack[position:]
+                self.done = not self.stack
+                return
+
+    def handle_data(self, data):
+        for name, cell in self.stack:
+            if name == "td":
+                cell.append(data)
+
+
+def table_rows(text: str, table_class: str) -> List[List[str]]:
+    """Reads the td text of every row of the first table with the class,
+    skipping the header row, like tr.find_all("td") for every
+    table.find_all("tr")[1:] does with BeautifulSoup.
+
+    Only the part of the page from the table onwards is parsed, and parsing
+    stops as soon as the table is closed.
+
+    Args:
+        text (string): html of the page
+        table_class (string): class attribute of the table to read
+    Returns:
+        rows (list): list of the cell texts of each row
+    Raises:
+        LookupError: if the page has no table with the class, e.g. after the
+            site changed its layout
+    """
+    marker = text.find(table_class)
+    start = max(text.rfind("<table", 0, marker), 0) if marker != -1 else 0
+    parser = feed_table(text, table_class, start)
+    if not parser.found and start:
+        parser = feed_table(text, table_class, 0)
+    if not parser.found:
+        raise LookupError(f"no table with class {table_class!r} in the page")
+    return [["".join(cell) for cell in row] for row in parser.rows[1:]]
+
+
+def feed_table(text: str, table_class: str, start: int) -> TableRowParser:
+    """Feeds the page to a TableRowParser from start, a table at a time,
+    until the target table is closed."""
+    parser = TableRowParser(table_class)
+    end = text.find("</table>", start)
+    while not parser.done:
+        if end == -1:
+            parser.feed(text[start:])
+            break
+        end += len("</table>")
+        parser.feed(text[start:end])
+        start, end = end, text.find("</table>", end)
+    parser.close()
+    return parser
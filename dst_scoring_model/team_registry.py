@@ -0,0 +1,70 @@
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+import dst_scoring_model.maps as maps
+
+# canonical team names, a team's id is its position in this list
+names = list(maps.town_to_team.values())
+team_dtype = pd.CategoricalDtype(names)
+team_index = pd.CategoricalIndex(names, dtype=team_dtype, name="team_name")
+
+
+def alias_ids() -> Dict[str, int]:
+    """Maps every name a team goes by, casefolded, to its id: the full
+    names, the teamrankings towns, the abbreviations and the names from
+    before a rename or relocation.
+
+    Returns:
+        aliases (dict): casefolded alias to team id
+    """
+    ids = {name: i for i, name in enumerate(names)}
+    aliases = {}
+    for mapping in (
+        {name: name for name in names},
+        maps.town_to_team,
+        maps.team_abbreviations,
+        maps.team_renames,
+    ):
+        for alias, name in mapping.items():
+            aliases[alias.casefold()] = ids[name]
+    return aliases
+
+
+_aliases = alias_ids()
+_alias_index = pd.Index(list(_aliases))
+_alias_values = np.array(list(_aliases.values()), dtype=np.int8)
+
+
+def team_ids(values: Iterable) -> np.ndarray:
+    """Resolves team names or aliases to int8 team ids.
+
+    Every distinct value is only resolved once, and values already of
+    team_dtype are read straight off their codes.
+
+    Args:
+        values (iterable): team names, towns, abbreviations or old names
+    Returns:
+        ids (numpy.ndarray): int8 id of every value, -1 for unknown teams
+    """
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        if values.dtype == team_dtype:
+            return np.asarray(pd.Categorical(values).codes, dtype=np.int8)
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    keys = pd.Index(uniques, dtype=object).str.strip().str.casefold()
+    positions = _alias_index.get_indexer(keys)
+    unique_ids = np.where(positions < 0, -1, _alias_values[positions]).astype(np.int8)
+    return np.where(codes < 0, np.int8(-1), unique_ids[codes]).astype(np.int8)
+
+
+def teams_categorical(values: Iterable) -> pd.Categorical:
+    """Interns team names or aliases as a team_dtype Categorical of their
+    canonical names, NaN for unknown teams.
+
+    Args:
+        values (iterable): team names, towns, abbreviations or old names
+    Returns:
+        teams (pandas.Categorical): canonical names backed by int8 codes
+    """
+    return pd.Categorical.from_codes(team_ids(values), dtype=team_dtype)
@@ -0,0 +1,245 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import pandas as pd
+import requests
+
+import dst_scoring_model.fetch as fetch
+import dst_scoring_model.get_pinnacle_data as get_pinnacle_data
+import dst_scoring_model.incremental as incremental
+import dst_scoring_model.maps as maps
+import dst_scoring_model.outputs as outputs
+import dst_scoring_model.pipeline as pipeline
+
+MIN_INTERVAL = 60.0
+MAX_INTERVAL = 600.0
+BACKOFF = 2.0
+
+
+def event_key(event: Dict) -> str:
+    """Returns the id of a rundown event, falling back to its teams."""
+    if event.get("event_id"):
+        return str(event["event_id"])
+    return "|".join(team["name"] for team in event["teams"])
+
+
+def week_lines(
+    events_list: Dict, week: int = 1, season: Optional[int] = None
+) -> Dict[str, List[Dict]]:
+    """Maps the id of every event of the week to its consensus spread rows,
+    skipping events that no book has a total for yet.
+
+    Args:
+        events_list (dict): decoded rundown events payload
+        week (int): week of the season to keep the games of
+        season (int): season to keep the games of, None for any season
+    Returns:
+        lines (dict): event id to spread rows from
+            get_pinnacle_data.consensus_spreads
+    """
+    events = list(get_pinnacle_data.week_events(events_list, week, season))
+    spread_df = get_pinnacle_data.consensus_spreads(events)
+    rows = spread_df.to_dict("records")
+    lines = {}
+    for position, event in enumerate(events):
+        event_rows = rows[2 * position : 2 * position + 2]
+        if pd.isna(event_rows[0]["points_allowed"]):
+            logging.debug("no lines for %s", event_key(event))
+            continue
+        lines[event_key(event)] = event_rows
+    return lines
+
+
+def diff_lines(previous: Dict[str, List[Dict]], current: Dict[str, List[Dict]]):
+    """Compares two week_lines by event id.
+
+    Returns:
+        changed (list): ids of events that are new or whose lines moved
+        removed (list): ids of events that are gone
+    """
+    changed = [key for key, rows in current.items() if previous.get(key) != rows]
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+
+def spread_frame(rows: List[Dict]) -> pd.DataFrame:
+    """Builds a spreads df like get_lines from spread rows."""
+    spread_df = pd.DataFrame(rows, columns=["team_name", "points_allowed", "opponent"])
+    spread_df["points_allowed"] = spread_df["points_allowed"].fillna(27)
+    return spread_df
+
+
+class LineWatcher:
+    """Polls the rundown events feed and yields only the games that moved.
+
+    Polls are conditional on the last ETag/Last-Modified, and a body that
+    hashes the same as the last one is dropped before it is decoded, so an
+    unchanged feed costs one small request. Every poll without a change
+    doubles the wait up to max_interval, and any change resets it to
+    min_interval.
+
+    Args:
+        url (string): events endpoint to poll
+        week (int): week of the season to keep the games of
+        season (int): season to keep the games of, None for any season
+        min_interval (float): seconds between polls while lines are moving
+        max_interval (float): most seconds between polls when they are not
+    """
+
+    def __init__(
+        self,
+        url: str = maps.rundown_events_url,
+        week: int = 1,
+        season: Optional[int] = None,
+        min_interval: float = MIN_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+    ):
+        self.url = url
+        self.week = week
+        self.season = season
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.validators: Dict[str, str] = {}
+        self.digest: Optional[str] = None
+        self.lines: Dict[str, List[Dict]] = {}
+
+    async def poll(self) -> Optional[str]:
+        """Requests the feed, returning None if it did not change."""
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            None, fetch.get_response, self.url, dict(self.validators)
+        )
+        if response.status_code == 304:
+            return None
+        self.validators = {}
+        if response.headers.get("ETag"):
+            self.validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            self.validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        digest = hashlib.sha1(response.content).hexdigest()
+        if digest == self.digest:
+            return None
+        self.digest = digest
+        return response.text
+
+    def apply(self, text: str) -> Optional[Dict]:
+        """Diffs a feed payload against the current lines and keeps it.
+
+        Args:
+            text (string): body of the events feed
+        Returns:
+            delta (dict): spreads df of the changed games and the ids of the
+                removed ones, or None if no game changed
+        """
+        current = week_lines(json.loads(text), self.week, self.season)
+        changed, removed = diff_lines(self.lines, current)
+        self.lines = current
+        if not changed and not removed:
+            return None
+        return {
+            "changed": spread_frame([row for key in changed for row in current[key]]),
+            "removed": removed,
+        }
+
+    def spreads(self) -> pd.DataFrame:
+        """Returns every current line as a spreads df."""
+        return spread_frame([row for rows in self.lines.values() for row in rows])
+
+    async def deltas(self) -> AsyncIterator[Dict]:
+        """Polls the feed forever, yielding a delta from apply whenever a game
+        changed and backing off while nothing does."""
+        while True:
+            delta = None
+            try:
+                text = await self.poll()
+                if text is not None:
+                    delta = self.apply(text)
+            except (requests.RequestException, ValueError) as error:
+                logging.warning("polling %s failed: %s", self.url, error)
+            if delta is None:
+                self.interval = min(self.interval * BACKOFF, self.max_interval)
+            else:
+                self.interval = self.min_interval
+                logging.info(
+                    "%s games moved, %s removed",
+                    len(delta["changed"]) // 2,
+                    len(delta["removed"]),
+                )
+                yield delta
+            await asyncio.sleep(self.interval)
+
+
+async def watch_projections(
+    watcher: LineWatcher,
+    tr_items: Dict,
+    qb_interceptions: pd.DataFrame,
+    on_update: Callable[[pd.DataFrame, Dict], None],
+    projections: Optional[incremental.IncrementalProjections] = None,
+):
+    """Rescores the week every time the watcher sees a line move, only
+    recomputing the moved games.
+
+    Args:
+        watcher (LineWatcher): watcher of the lines feed
+        tr_items (dict): tr_stat_list key to df from get_tr_stats_full
+        qb_interceptions (pandas.Dataframe): df from get_footballdb_data
+        on_update (callable): called with the projections and the delta
+        projections (IncrementalProjections): projections to update
+    """
+    if projections is None:
+        projections = incremental.IncrementalProjections()
+    async for delta in watcher.deltas():
+        fused_df = projections.update(watcher.spreads(), tr_items, qb_interceptions)
+        on_update(fused_df, delta)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Watch the lines feed and rewrite projections as lines move."
+    )
+    parser.add_argument("--season", type=int, default=maps.current_season)
+    parser.add_argument("--week", type=int, default=1)
+    parser.add_argument("--min-interval", type=float, default=MIN_INTERVAL)
+    parser.add_argument("--max-interval", type=float, default=MAX_INTERVAL)
+    parser.add_argument(
+        "--format", choices=sorted(outputs.formats), default="csv", dest="format"
+    )
+    parser.add_argument("--output-dir", default=outputs.OUTPUT_DIR)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(filename="dst_log.log", level=logging.INFO)
+    inputs = pipeline.fetch_inputs(args.season, args.week)
+    watcher = LineWatcher(
+        week=args.week,
+        season=args.season,
+        min_interval=args.min_interval,
+        max_interval=args.max_interval,
+    )
+
+    def write_output(fused_df: pd.DataFrame, delta: Dict):
+        outputs.write_output(
+            fused_df,
+            "projections",
+            args.season,
+            args.week,
+            args.format,
+            root=args.output_dir,
+        )
+
+    try:
+        asyncio.run(
+            watch_projections(
+                watcher, inputs["tr_items"], inputs["qb_interceptions"], write_output
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
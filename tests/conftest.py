@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dst_scoring_model.clean_data as clean_data
+import dst_scoring_model.maps as maps
+
+
+@pytest.fixture
+def inputs():
+    """A week of inputs for four teams, the way pipeline.load_inputs returns
+    them, ready for pipeline.build_projections(**inputs)."""
+    teams = clean_data.teams[:4]
+    tr_items = {}
+    for i, (key, value) in enumerate(maps.tr_stat_list.items()):
+        season = np.array([0.5, 1.0, 1.5, 2.0]) + 0.1 * i
+        last_3 = season[::-1].copy()
+        tr_items[key] = pd.DataFrame(
+            data={
+                "team_name": teams,
+                value["column_name"]: season * 0.7 + last_3 * 0.3,
+                value["column_name"] + "_season": season,
+                value["column_name"] + "_last_3": last_3,
+            }
+        )
+    spreads = pd.DataFrame(
+        data={
+            "team_name": teams,
+            "points_allowed": [20.5, 23.5, 17.0, 27.0],
+            "opponent": [teams[1], teams[0], teams[3], teams[2]],
+        }
+    )
+    qb_interceptions = pd.DataFrame(
+        data={"team_name": [teams[0]], "interceptions_per_game_qb": [0.8]}
+    )
+    return {
+        "spreads": spreads,
+        "tr_items": tr_items,
+        "qb_interceptions": qb_interceptions,
+    }
@@ -0,0 +1,10 @@
+import pytest
+
+import dst_scoring_model.cache as cache
+
+
+@pytest.fixture(autouse=True)
+def response_cache(tmp_path, monkeypatch):
+    response_cache = cache.ResponseCache(str(tmp_path / "cache"), offline=False)
+    monkeypatch.setattr(cache, "default_cache", response_cache)
+    return response_cache
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+import dst_scoring_model.backtest as backtest
+import dst_scoring_model.pipeline as pipeline
+import dst_scoring_model.snapshots as snapshots
+
+
+def construct_store(inputs, root, weeks):
+    for season, week in weeks:
+        snapshots.save_inputs(inputs, season, week, root=root)
+    return pipeline.build_projections(**inputs)
+
+
+def test_save_and_load_week_pages(tmp_path):
+    pages = {url: name for url, name in backtest.page_files(2019, 2).items()}
+    backtest.save_week_pages(pages, str(tmp_path), 2019, 2)
+    assert (tmp_path / "2019" / "week_02" / "lines.json").read_text() == "lines.json"
+    assert backtest.load_week_pages(2019, 2, str(tmp_path)) == pages
+
+
+def test_parse_range():
+    assert backtest.parse_range("2016-2018") == [2016, 2017, 2018]
+    assert backtest.parse_range("3") == [3]
+
+
+def test_summarize():
+    results = pd.DataFrame(
+        data={
+            "season": [2019, 2019, 2019],
+            "week": [1, 1, 2],
+            "final": [10.0, 5.0, 8.0],
+            "actual": [12.0, 4.0, 6.0],
+        }
+    )
+    results["error"] = results["final"] - results["actual"]
+    summary = backtest.summarize(results)
+    assert summary.loc[2019, "weeks"] == 2
+    assert summary.loc[2019, "mae"] == 5 / 3
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_backtest(tmp_path, workers, inputs):
+    projections = construct_store(inputs, str(tmp_path), [(2019, 1), (2019, 2)])
+    actuals = projections[["team_name"]].assign(season=2019, week=2, actual=10.0)
+    results = backtest.run_backtest(
+        [(2019, 1), (2019, 2)], actuals=actuals, workers=workers, store=str(tmp_path)
+    )
+    assert results[["season", "week"]].drop_duplicates().values.tolist() == [
+        [2019, 1],
+        [2019, 2],
+    ]
+    week_2 = results[results["week"] == 2]
+    assert week_2["final"].tolist() == projections["final"].tolist()
+    assert (week_2["error"] == week_2["final"] - 10.0).all()
+    assert results[results["week"] == 1]["actual"].isna().all()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_backtest_fails_on_missing_weeks(tmp_path, workers, inputs):
+    construct_store(inputs, str(tmp_path), [(2019, 1)])
+    weeks = [(2019, 1), (2019, 3)]
+    with pytest.raises(LookupError, match="2019 week 3"):
+        backtest.run_backtest(weeks, workers=workers, store=str(tmp_path))
+    results = backtest.run_backtest(
+        weeks, workers=workers, store=str(tmp_path), skip_missing=True
+    )
+    assert set(results["week"]) == {1}
+    with pytest.raises(ValueError):
+        backtest.run_backtest(weeks, workers=workers)
+
+
+def test_run_backtest_fails_on_weeks_without_lines(tmp_path, inputs):
+    construct_store(inputs, str(tmp_path), [(2019, 1)])
+    without_lines = {**inputs, "spreads": inputs["spreads"].iloc[:0]}
+    snapshots.save_inputs(without_lines, 2019, 2, root=str(tmp_path))
+    with pytest.raises(LookupError, match="no lines for 2019 week 2"):
+        backtest.project_week(2019, 2, store=str(tmp_path))
+    weeks = [(2019, 1), (2019, 2)]
+    with pytest.raises(LookupError, match="2019 week 2"):
+        backtest.run_backtest(weeks, workers=1, store=str(tmp_path))
+    results = backtest.run_backtest(
+        weeks, workers=1, store=str(tmp_path), skip_missing=True
+    )
+    assert set(results["week"]) == {1}
@@ -0,0 +1,130 @@
+import multiprocessing
+import os
+import time
+import unittest.mock as mock
+
+import pytest
+
+import dst_scoring_model.cache as cache
+import dst_scoring_model.fetch as fetch
+
+
+def construct_response(status_code=200, text="hello", headers=None):
+    response = mock.MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    return response
+
+
+def test_ttl_for():
+    assert cache.ttl_for("https://www.teamrankings.com/nfl?date=2020-09-05") is None
+    assert cache.ttl_for("https://therundown.io/api") == 600
+
+
+def test_put_and_get_body_persists(response_cache):
+    response_cache.put_body("http://a", "hello", etag='"1"')
+    reloaded = cache.ResponseCache(response_cache.directory)
+    assert reloaded.get_body("http://a") == "hello"
+    assert reloaded.validators("http://a") == {"If-None-Match": '"1"'}
+
+
+def test_evicts_least_recently_used(tmp_path):
+    response_cache = cache.ResponseCache(str(tmp_path), max_bytes=10)
+    response_cache.put_body("http://a", "aaaa")
+    time.sleep(0.01)
+    response_cache.put_body("http://b", "bbbb")
+    time.sleep(0.01)
+    response_cache.get_body("http://a")
+    response_cache.put_body("http://c", "cccc")
+    assert response_cache.get_body("http://b") is None
+    assert response_cache.get_body("http://a") == "aaaa"
+
+
+def test_parsed_only_parses_once(response_cache):
+    parse = mock.MagicMock(return_value=[1, 2])
+    assert response_cache.parsed("page", "parser", parse) == [1, 2]
+    assert response_cache.parsed("page", "parser", parse) == [1, 2]
+    assert parse.call_count == 1
+
+
+def test_parsed_without_memoizing(response_cache):
+    response_cache.memoize_parsed = False
+    parse = mock.MagicMock(return_value=[1, 2])
+    response_cache.parsed("page", "parser", parse)
+    response_cache.parsed("page", "parser", parse)
+    assert parse.call_count == 2
+    assert response_cache.index == {}
+
+
+@mock.patch("dst_scoring_model.fetch.get_response", return_value=construct_response())
+def test_get_text_fresh_hit_skips_network(get_response):
+    assert fetch.get_text("http://a") == "hello"
+    assert fetch.get_text("http://a") == "hello"
+    assert get_response.call_count == 1
+
+
+@mock.patch(
+    "dst_scoring_model.fetch.get_response",
+    return_value=construct_response(304, text=""),
+)
+def test_get_text_revalidates_stale(get_response, response_cache):
+    response_cache.put_body("http://a", "hello", etag='"1"')
+    response_cache.lookup("http://a")["stored"] = 0
+    assert fetch.get_text("http://a") == "hello"
+    get_response.assert_called_once_with("http://a", headers={"If-None-Match": '"1"'})
+    assert response_cache.is_fresh("http://a", response_cache.lookup("http://a"))
+
+
+@mock.patch("dst_scoring_model.fetch.get_response")
+def test_get_text_offline(get_response, response_cache):
+    response_cache.offline = True
+    response_cache.put_body("http://a", "hello")
+    response_cache.lookup("http://a")["stored"] = 0
+    assert fetch.get_text("http://a") == "hello"
+    with pytest.raises(cache.CacheMissError):
+        fetch.get_text("http://b")
+    get_response.assert_not_called()
+
+
+def test_reads_touch_the_index_in_memory_until_flushed(response_cache):
+    response_cache.put_body("http://a", "hello")
+    with mock.patch.object(response_cache, "save_index") as save_index:
+        assert response_cache.get_body("http://a") == "hello"
+        save_index.assert_not_called()
+    accessed = response_cache.lookup("http://a")["accessed"]
+    response_cache.flush()
+    reloaded = cache.ResponseCache(response_cache.directory)
+    assert reloaded.lookup("http://a")["accessed"] == accessed
+
+
+def test_writes_leave_no_temporary_files(response_cache):
+    response_cache.put_body("http://a", "hello")
+    response_cache.put_body("http://b", "goodbye")
+    assert not [
+        name for name in os.listdir(response_cache.directory) if name.endswith(".tmp")
+    ]
+
+
+def write_entries(args):
+    directory, process, max_bytes = args
+    response_cache = cache.ResponseCache(directory, max_bytes=max_bytes)
+    for i in range(20):
+        response_cache.put_body(f"http://{process}/{i}", "x" * 10)
+
+
+@pytest.mark.parametrize("max_bytes", [cache.MAX_BYTES, 300])
+def test_processes_sharing_the_cache_keep_one_index(tmp_path, max_bytes):
+    directory = str(tmp_path / "shared")
+    with multiprocessing.Pool(4) as pool:
+        pool.map(
+            write_entries, [(directory, process, max_bytes) for process in range(4)]
+        )
+    index = cache.ResponseCache(directory).index
+    entry_files = {
+        name
+        for name in os.listdir(directory)
+        if name not in ("index.json", "index.lock")
+    }
+    assert entry_files == set(index)
+    assert len(index) == (80 if max_bytes == cache.MAX_BYTES else 30)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 import dst_scoring_model.clean_data as clean_data
@@ -10,3 +11,48 @@ def test_defense_opponent_fusion():
         clean_data.defense_opponent_fusion(df_data, "stat")["stat"][0]
         == 1.4500000000000002
     )
+
+
+def test_interceptions_merge_columns():
+    df_data = pd.DataFrame(
+        data={
+            "interceptions_thrown": [1.0, 0.5, 0.8],
+            "interceptions_per_game_qb": [0.7, np.nan, 0.0],
+        }
+    )
+    expected = df_data.apply(clean_data.interceptions_merge, axis=1)
+    result = clean_data.interceptions_merge_columns(df_data)
+    assert result.tolist() == expected.tolist() == [0.7, 0.5, 0.0]
+
+
+def test_assemble_team_table():
+    sacks = pd.DataFrame(
+        data={"team_name": ["Chicago Bears", "Arizona Cardinals"], "sacks": [2, 3]}
+    )
+    fumbles = pd.DataFrame(
+        data={"team_name": ["Arizona Cardinals", "hello"], "fumbles": [1, 5]}
+    )
+    table = clean_data.assemble_team_table([sacks, fumbles])
+    assert len(table) == 32
+    assert table.loc["Arizona Cardinals"].tolist() == [3, 1]
+    assert np.isnan(table.loc["Chicago Bears", "fumbles"])
+
+
+def test_lookup_teams():
+    sacks = pd.DataFrame(
+        data={"team_name": ["Chicago Bears", "Arizona Cardinals"], "sacks": [2, 3]}
+    )
+    table = clean_data.assemble_team_table([sacks])
+    rows = clean_data.lookup_teams(
+        table, pd.Series(["Arizona Cardinals", "hello", "Chicago Bears"])
+    )
+    assert rows["sacks"].tolist()[::2] == [3, 2]
+    assert np.isnan(rows["sacks"][1])
+
+
+def test_lookup_teams_by_alias():
+    sacks = pd.DataFrame(data={"team_name": ["Las Vegas", "Oakland"], "sacks": [2, 3]})
+    table = clean_data.assemble_team_table([sacks])
+    assert table.loc["Las Vegas Raiders", "sacks"] == 2
+    rows = clean_data.lookup_teams(table, pd.Series(["Oakland Raiders", "LV"]))
+    assert rows["sacks"].tolist() == [2, 2]
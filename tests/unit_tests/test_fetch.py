@@ -0,0 +1,62 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import dst_scoring_model.fetch as fetch
+
+DELAY = 0.2
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    failures = {}
+
+    def do_GET(self):
+        if self.failures.get(self.path, 0) > 0:
+            self.failures[self.path] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        time.sleep(DELAY)
+        body = self.path.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    monkeypatch.setattr(fetch, "BACKOFF_FACTOR", 0.01)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_all_is_concurrent(stub_server):
+    urls = [f"{stub_server}/stat/{i}" for i in range(8)]
+    start = time.monotonic()
+    pages = fetch.fetch_all(urls)
+    elapsed = time.monotonic() - start
+    assert pages[urls[3]] == "/stat/3"
+    assert elapsed < DELAY * 4
+
+
+def test_get_text_retries(stub_server):
+    StubHandler.failures["/flaky"] = 2
+    assert fetch.get_text(stub_server + "/flaky") == "/flaky"
+
+
+def test_token_bucket_limits_rate():
+    bucket = fetch.TokenBucket(rate=20, burst=1)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
@@ -3,13 +3,7 @@ import unittest.mock as mock
 import dst_scoring_model.get_pinnacle_data as get_pinnacle_data
 
 
-def construct_request_content():
-    response = mock.MagicMock()
-    response.content = mock.MagicMock(return_value="hello")
-    return response
-
-
-@mock.patch("requests.get", return_value=construct_request_content())
+@mock.patch("dst_scoring_model.fetch.get_text", return_value="hello")
 @mock.patch(
     "json.loads",
     return_value={
@@ -28,3 +22,33 @@ def construct_request_content():
 )
 def test_get_lines(get, loads):
     assert get_pinnacle_data.get_lines()["team_name"][0] == "hello"
+
+
+def test_consensus_spreads():
+    events = [
+        {
+            "teams": [{"name": "hello"}, {"name": "goodbye"}],
+            "lines": {
+                "3": {
+                    "spread": {"point_spread_home": -3},
+                    "total": {"total_under": 44},
+                },
+                "1": {
+                    "spread": {"point_spread_home": -4},
+                    "total": {"total_under": 46},
+                },
+                "2": {
+                    "spread": {"point_spread_home": 0.0001},
+                    "total": {"total_under": None},
+                },
+            },
+        },
+        {"teams": [{"name": "up"}, {"name": "down"}], "lines": {}},
+    ]
+    spread_df = get_pinnacle_data.consensus_spreads(events)
+    assert spread_df["team_name"].tolist() == ["hello", "goodbye", "up", "down"]
+    assert spread_df["opponent"].tolist() == ["goodbye", "hello", "down", "up"]
+    assert spread_df["points_allowed"].tolist()[:2] == [25.5, 19.0]
+    assert spread_df["points_allowed"].isna().tolist()[2:] == [True, True]
+    pinnacle_only = get_pinnacle_data.consensus_spreads(events, {"3": 1, "1": 0})
+    assert pinnacle_only["points_allowed"].tolist()[:2] == [25.0, 19.0]
@@ -6,8 +6,7 @@ import dst_scoring_model.get_tr_data as get_tr_data
 
 
 def construct_request_content_tr():
-    response = mock.MagicMock()
-    response.text = """<html>
+    return """<html>
     <body>
         <main>
             <table class="tr-table datatable scrollable">
@@ -43,7 +42,6 @@ def construct_request_content_tr():
         </main>>
     </body>
     </html>"""
-    return response
 
 
 def test_construct_tr_df():
@@ -61,6 +59,8 @@ def test_get_tr_stats_full(get_tr_stats):
     assert get_tr_data.get_tr_stats_full("hello", "stat")["team_name"][0] == "hello"
 
 
-@mock.patch("requests.get", return_value=construct_request_content_tr())
+@mock.patch(
+    "dst_scoring_model.fetch.get_text", return_value=construct_request_content_tr()
+)
 def test_get_tr_stats(get):
     assert get_tr_data.get_tr_stats("test", "hello")["hello_season"][0] == 0.4
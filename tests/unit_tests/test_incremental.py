@@ -0,0 +1,49 @@
+import pandas as pd
+
+import dst_scoring_model.incremental as incremental
+import dst_scoring_model.pipeline as pipeline
+
+
+def test_update_matches_build_projections(inputs):
+    spreads, tr_items, qb_interceptions = inputs.values()
+    projections = incremental.IncrementalProjections()
+    pd.testing.assert_frame_equal(
+        projections.update(spreads, tr_items, qb_interceptions),
+        pipeline.build_projections(spreads, tr_items, qb_interceptions),
+    )
+    assert projections.recomputed == 4
+
+
+def test_update_only_rescores_moved_lines(inputs):
+    spreads, tr_items, qb_interceptions = inputs.values()
+    projections = incremental.IncrementalProjections()
+    projections.update(spreads, tr_items, qb_interceptions)
+    projections.update(spreads, tr_items, qb_interceptions)
+    assert projections.recomputed == 0
+
+    moved = spreads.copy()
+    moved.loc[[2, 3], "points_allowed"] = [3.0, 40.0]
+    pd.testing.assert_frame_equal(
+        projections.update(moved, tr_items, qb_interceptions),
+        pipeline.build_projections(moved, tr_items, qb_interceptions),
+    )
+    assert projections.recomputed == 2
+
+    changed = dict(tr_items)
+    changed["sacks_defense_list"] = tr_items["sacks_defense_list"].assign(
+        sacks_created=3.0
+    )
+    projections.update(moved, changed, qb_interceptions)
+    assert projections.recomputed == 4
+
+
+def test_update_without_lines(inputs):
+    spreads, tr_items, qb_interceptions = inputs.values()
+    projections = incremental.IncrementalProjections()
+    empty = projections.update(spreads.iloc[:0], tr_items, qb_interceptions)
+    assert empty.empty
+    assert "final" in empty.columns
+    pd.testing.assert_frame_equal(
+        projections.update(spreads, tr_items, qb_interceptions),
+        pipeline.build_projections(spreads, tr_items, qb_interceptions),
+    )
@@ -0,0 +1,80 @@
+import multiprocessing
+import shutil
+import unittest.mock as mock
+
+import pytest
+
+import dst_scoring_model.backtest as backtest
+import dst_scoring_model.ingest as ingest
+import dst_scoring_model.maps as maps
+import dst_scoring_model.snapshots as snapshots
+
+
+@pytest.fixture
+def load_inputs(inputs):
+    with mock.patch(
+        "dst_scoring_model.pipeline.load_inputs", return_value=inputs
+    ) as load_inputs:
+        yield load_inputs
+
+
+def test_run_ingest_resumes(load_inputs, tmp_path):
+    pages_dir, store = str(tmp_path / "pages"), str(tmp_path / "store")
+    for week in (1, 2):
+        pages = {url: "" for url in backtest.page_files(2019, week)}
+        backtest.save_week_pages(pages, pages_dir, 2019, week)
+    weeks = [(2019, 1), (2019, 2), (2019, 3)]
+
+    results = ingest.run_ingest(weeks, pages_dir, store, workers=1)
+    assert results["status"].tolist() == ["ingested", "ingested", "failed"]
+    assert ingest.ingested_weeks(store) == {(2019, 1), (2019, 2)}
+    assert snapshots.load_inputs(2019, 2, root=store)["spreads"].shape == (4, 3)
+
+    # a week cut off before its last source was written is ingested again
+    shutil.rmtree(snapshots.partition_dir(ingest.LAST_SOURCE, 2019, 2, store))
+    load_inputs.reset_mock()
+    results = ingest.run_ingest(weeks, pages_dir, store, workers=1)
+    assert results["status"].tolist() == ["skipped", "ingested", "failed"]
+    assert load_inputs.call_count == 1
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="the workers only see the mocked parser when forked",
+)
+def test_run_ingest_across_processes(load_inputs, tmp_path):
+    pages_dir, store = str(tmp_path / "pages"), str(tmp_path / "store")
+    for week in (1, 2):
+        pages = {url: "" for url in backtest.page_files(2019, week)}
+        backtest.save_week_pages(pages, pages_dir, 2019, week)
+    results = ingest.run_ingest([(2019, 1), (2019, 2), (2019, 3)], pages_dir, store, 2)
+    assert results["status"].tolist() == ["ingested", "ingested", "failed"]
+    assert ingest.ingested_weeks(store) == {(2019, 1), (2019, 2)}
+
+
+@mock.patch("dst_scoring_model.pipeline.current_week", return_value=2)
+def test_run_ingest_fetch_failures_fail_the_week(current_week, tmp_path):
+    season = maps.current_season
+
+    def fetch_week_pages(season, week):
+        raise OSError("connection reset")
+
+    with mock.patch.object(ingest, "fetch_week_pages", fetch_week_pages):
+        results = ingest.run_ingest([(season, 2)], root=str(tmp_path), workers=1)
+    assert results["status"].tolist() == ["failed"]
+    assert results["error"][0] == "connection reset"
+    for weeks in ([(season, 1)], [(season, 2), (season, 3)], [(season - 1, 2)]):
+        with pytest.raises(ValueError, match=f"{season} week 2"):
+            ingest.run_ingest(weeks, root=str(tmp_path), workers=1)
+
+
+def test_run_ingest_fails_weeks_without_lines(load_inputs, inputs, tmp_path):
+    pages_dir, store = str(tmp_path / "pages"), str(tmp_path / "store")
+    pages = {url: "" for url in backtest.page_files(2019, 1)}
+    backtest.save_week_pages(pages, pages_dir, 2019, 1)
+    load_inputs.return_value = {**inputs, "spreads": inputs["spreads"].iloc[:0]}
+    results = ingest.run_ingest([(2019, 1)], pages_dir, store, workers=1)
+    assert results["status"].tolist() == ["failed"]
+    assert results["error"][0] == "no lines for 2019 week 1"
+    assert ingest.ingested_weeks(store) == set()
+    assert snapshots.list_snapshots("lines", root=store).empty
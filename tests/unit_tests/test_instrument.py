@@ -0,0 +1,59 @@
+import json
+import pstats
+
+import pytest
+
+import dst_scoring_model.instrument as instrument
+import dst_scoring_model.pipeline as pipeline
+
+
+@pytest.fixture
+def tracing():
+    instrument.reset()
+    instrument.enable()
+    yield
+    instrument.disable()
+    instrument.reset()
+
+
+def test_disabled_spans_record_nothing():
+    instrument.reset()
+    with instrument.span("fetch", url="x") as timer:
+        timer.add(bytes=10)
+    assert timer is instrument.NULL_SPAN
+    assert instrument.records() == []
+
+
+def test_spans_nest_and_count(tracing):
+    with instrument.span("outer"):
+        with instrument.span("inner") as timer:
+            timer.add(rows=2)
+            timer.add(rows=3, bytes=7)
+    inner, outer = instrument.records()
+    assert inner["name"] == "inner" and inner["parent"] == "outer"
+    assert outer["parent"] is None
+    assert inner["attrs"] == {"rows": 5, "bytes": 7}
+    assert 0 <= inner["wall"] <= outer["wall"]
+
+
+def test_projections_trace(tracing, tmp_path, inputs):
+    pipeline.build_projections(**inputs)
+    path = tmp_path / "trace.json"
+    instrument.write_trace(str(path))
+    with open(path) as trace_file:
+        trace = json.load(trace_file)
+    names = {event["name"] for event in trace["traceEvents"]}
+    assert {"projections", "merge.team_tables", "poisson", "score"} <= names
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+    assert trace["summary"]["poisson"]["rows"] == 4
+
+
+def test_session_writes_trace_and_profile(tmp_path):
+    trace_path, profile_path = tmp_path / "trace.json", tmp_path / "run.prof"
+    with instrument.session(str(trace_path), str(profile_path)):
+        with instrument.span("stage"):
+            sum(range(1000))
+    assert not instrument.enabled
+    with open(trace_path) as trace_file:
+        assert json.load(trace_file)["summary"]["stage"]["count"] == 1
+    assert pstats.Stats(str(profile_path)).total_calls > 0
@@ -1,7 +1,9 @@
 import unittest.mock as mock
 
+import numpy as np
 import pytest
 
+import dst_scoring_model.maps as maps
 import dst_scoring_model.model as model
 
 
@@ -15,3 +17,47 @@ def test_points_allowed_score(test_input: int, expect: int) -> bool:
 
 def test_poisson_create():
     assert model.poisson_create(1, 2) == 0.36787944117144233
+
+
+def test_poisson_expectation_matches_poisson_create():
+    rates = np.array([0, 0.5, 1, 2.7, 24.5])
+    expected = [model.poisson_create(rate, 7) for rate in rates]
+    assert model.poisson_expectation(rates, 7).tolist() == expected
+
+
+def test_poisson_expectation_matches_scipy():
+    stats = pytest.importorskip("scipy.stats")
+    rates = np.array([0, 0.5, 1, 2.7, 24.5])
+    n = np.arange(0, 50)
+    expected = [(n * stats.poisson.pmf(n, rate)).sum() for rate in rates]
+    np.testing.assert_allclose(
+        model.poisson_expectation(rates, 50), expected, rtol=1e-13
+    )
+
+
+def test_poisson_expectation_matrix():
+    rates = np.array([[21.5, 2.1, 0.3], [17.0, 3.4, 0.1]])
+    caps = [50, 7, 4]
+    result = model.poisson_expectation_matrix(rates, caps)
+    for row in range(2):
+        for column, cap in enumerate(caps):
+            assert result[row, column] == model.poisson_create(rates[row, column], cap)
+
+
+def test_points_allowed_scores_matches_ladder():
+    points = np.array([0, 0.5, 6, 7, 13, 14, 17, 18, 27, 28, 34, 35, 36, np.nan])
+    expected = [model.points_allowed_score(point) for point in points]
+    table = maps.scoring_tables["standard"]["points_allowed"]
+    assert model.points_allowed_scores(points, table).tolist() == expected
+
+
+def test_fantasy_points():
+    events = {
+        "interceptions": [1.0, 0.5],
+        "sacks": [2.0, 3.0],
+        "fumbles": [0.5, 1.0],
+        "defensive_touchdowns": [0.0, 0.25],
+    }
+    scores = model.fantasy_points([0, 20], events, maps.scoring_tables)
+    assert scores["standard"].tolist() == [15.0, 7.5]
+    assert scores["yahoo"].tolist() == [15.0, 8.5]
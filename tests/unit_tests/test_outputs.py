@@ -0,0 +1,115 @@
+import os
+
+import pandas as pd
+import pytest
+
+import dst_scoring_model.outputs as outputs
+
+
+def construct_df():
+    return pd.DataFrame(
+        data={"team_name": ["hello", "goodbye"], "expected_score": [7.25, 5.5]}
+    )
+
+
+@pytest.mark.parametrize("output_format", ["csv", "parquet", "json"])
+def test_write_and_read_output(tmp_path, output_format):
+    df = construct_df()
+    path = outputs.write_output(
+        df, "projections", 2020, 3, output_format, "20200901T000000", str(tmp_path)
+    )
+    assert path == os.path.join(
+        str(tmp_path),
+        "output=projections",
+        "season=2020",
+        "week=3",
+        f"run=20200901T000000.{output_format}",
+    )
+    assert os.listdir(os.path.dirname(path)) == [os.path.basename(path)]
+    read = outputs.read_outputs("projections", root=str(tmp_path))
+    pd.testing.assert_frame_equal(read, df.assign(season=2020, week=3)[read.columns])
+    assert list(read.columns[:2]) == ["season", "week"]
+
+
+def test_reruns_keep_every_run_and_read_the_latest(tmp_path):
+    df = construct_df()
+    root = str(tmp_path)
+    outputs.write_output(df, "projections", 2020, 1, run="20200901T000000", root=root)
+    outputs.write_output(
+        df.assign(expected_score=1.0),
+        "projections",
+        2020,
+        1,
+        "parquet",
+        "20200902T000000",
+        root,
+    )
+    listed = outputs.list_outputs("projections", root=root)
+    assert list(listed["run"]) == ["20200901T000000", "20200902T000000"]
+    assert list(listed["format"]) == ["csv", "parquet"]
+    latest = outputs.read_outputs("projections", root=root)
+    assert list(latest["expected_score"]) == [1.0, 1.0]
+    first = outputs.read_outputs("projections", run="20200901T000000", root=root)
+    assert list(first["expected_score"]) == [7.25, 5.5]
+
+
+def test_read_outputs_only_reads_asked_for_weeks(tmp_path, monkeypatch):
+    results = pd.concat(
+        [construct_df().assign(season=2019, week=week) for week in (1, 2, 3)],
+        ignore_index=True,
+    )
+    paths = outputs.write_weeks(results, "backtest", "csv", root=str(tmp_path))
+    assert len(paths) == 3
+    read_paths = []
+    write, read = outputs.formats["csv"]
+
+    def tracked_read(path, columns=None):
+        read_paths.append(path)
+        return read(path, columns)
+
+    monkeypatch.setitem(outputs.formats, "csv", (write, tracked_read))
+    read = outputs.read_outputs(
+        "backtest",
+        weeks=[(2019, 2)],
+        columns=["team_name", "season", "week"],
+        root=str(tmp_path),
+    )
+    assert read_paths == [paths[1]]
+    assert list(read.columns) == ["team_name", "season", "week"]
+    assert set(read["week"]) == {2}
+    with pytest.raises(LookupError):
+        outputs.read_outputs("backtest", weeks=[(2019, 4)], root=str(tmp_path))
+
+
+def test_register_format(tmp_path, monkeypatch):
+    monkeypatch.setitem(outputs.formats, "tsv", None)
+    outputs.register_format(
+        "tsv",
+        lambda df, path: df.to_csv(path, sep="\t", index=False),
+        lambda path, columns=None: pd.read_csv(path, sep="\t", usecols=columns),
+    )
+    path = outputs.write_output(
+        construct_df(), "projections", 2020, 1, "tsv", root=str(tmp_path)
+    )
+    assert path.endswith(".tsv")
+    read = outputs.read_outputs("projections", root=str(tmp_path))
+    assert list(read["team_name"]) == ["hello", "goodbye"]
+
+
+def test_list_outputs_skips_stray_entries(tmp_path):
+    root = str(tmp_path)
+    path = outputs.write_output(construct_df(), "projections", 2020, 2, root=root)
+    output_dir = tmp_path / "output=projections"
+    (output_dir / ".DS_Store").write_text("")
+    (output_dir / "season=2020" / "notes").mkdir()
+    (output_dir / "season=latest").mkdir()
+    (output_dir / "season=2020" / "week=2" / "README.txt").write_text("")
+    assert outputs.list_outputs("projections", root=root)["path"].tolist() == [path]
+
+
+def test_read_outputs_keeps_the_column_order(tmp_path):
+    outputs.write_output(construct_df(), "projections", 2020, 2, root=str(tmp_path))
+    columns = ["expected_score", "week", "team_name"]
+    read = outputs.read_outputs("projections", columns=columns, root=str(tmp_path))
+    assert list(read.columns) == columns
+    assert read["week"].tolist() == [2, 2]
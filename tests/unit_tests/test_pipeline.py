@@ -0,0 +1,33 @@
+import subprocess
+import sys
+from datetime import date
+
+import dst_scoring_model.pipeline as pipeline
+
+
+def test_week_dates():
+    assert pipeline.week_dates(2020, 1) == ("2020-09-05", "2020-09-05")
+    assert pipeline.week_dates(2020, 3) == ("2020-09-19", "2020-09-05")
+
+
+def test_current_week():
+    assert pipeline.current_week(date(2020, 9, 4)) == 1
+    assert pipeline.current_week(date(2020, 9, 11)) == 1
+    assert pipeline.current_week(date(2020, 9, 12)) == 2
+
+
+def test_week_urls():
+    urls = pipeline.week_urls()
+    assert len(urls) == 17
+    assert "https://www.teamrankings.com/nfl/stat/sacks-per-game" in urls
+
+
+def test_scoring_path_skips_scrapers():
+    code = (
+        "import sys, dst_scoring_model.pipeline, dst_scoring_model.snapshots; "
+        "print([m for m in ('scipy', 'requests', 'bs4') if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,68 @@
+import math
+
+import numpy as np
+
+import dst_scoring_model.maps as maps
+import dst_scoring_model.model as model
+import dst_scoring_model.points_allowed as points_allowed
+
+table = maps.scoring_tables["standard"]["points_allowed"]
+
+
+def summed_score(rate, counts=200):
+    """The expected points allowed score summed count by count."""
+    total = 0.0
+    for count in range(counts):
+        probability = math.exp(count * math.log(rate) - math.lgamma(count + 1) - rate)
+        score = table["shutout"] if count == 0 else model.points_allowed_score(count)
+        total += probability * score
+    return total
+
+
+def test_bracket_probabilities():
+    probabilities = points_allowed.bracket_probabilities([0.0, 3.0, 24.0], [7, 35])
+    assert probabilities.shape == (3, 4)
+    np.testing.assert_allclose(probabilities.sum(axis=-1), 1.0)
+    assert probabilities[0].tolist() == [1.0, 0.0, 0.0, 0.0]
+    assert probabilities[1, 0] == math.exp(-3.0)
+
+
+def test_exact_scores():
+    rates = [0.5, 6.9, 17.9, 24.0, 34.5, 60.0]
+    np.testing.assert_allclose(
+        points_allowed.exact_scores(rates, table),
+        [summed_score(rate) for rate in rates],
+        rtol=1e-12,
+    )
+    assert points_allowed.exact_scores(0.0, table) == table["shutout"]
+
+
+def test_expected_scores():
+    rates = np.random.default_rng(0).uniform(0, 100, 1000)
+    scores = points_allowed.expected_scores(rates, table)
+    exact = points_allowed.exact_scores(rates, table)
+    assert np.abs(scores - exact).max() < 5e-5
+    assert np.isnan(points_allowed.expected_scores([np.nan], table)[0])
+
+
+def test_expected_scores_against_score_of_mean():
+    # a rate just under an edge scores the bracket of the mean, while most of
+    # the points allowed land in the brackets above it
+    score_of_mean = model.points_allowed_scores(17.9, table)
+    assert score_of_mean == 1
+    assert points_allowed.expected_scores(17.9, table) < 0.9
+
+
+def test_capped_scores_drop_the_counts_above_the_cap():
+    probabilities = points_allowed.bracket_probabilities([24.0], table["edges"], 20)
+    assert probabilities[0, -2:].tolist() == [0.0, 0.0]
+    below_cap = sum(
+        math.exp(count * math.log(24.0) - math.lgamma(count + 1) - 24.0)
+        for count in range(20)
+    )
+    np.testing.assert_allclose(probabilities.sum(), below_cap, rtol=1e-12)
+    np.testing.assert_allclose(
+        points_allowed.expected_scores([5.0, 24.0], table, 20),
+        points_allowed.exact_scores([5.0, 24.0], table, 20),
+        atol=5e-5,
+    )
@@ -0,0 +1,98 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+import dst_scoring_model.fetch as fetch
+import dst_scoring_model.maps as maps
+import dst_scoring_model.pipeline as pipeline
+import dst_scoring_model.service as service
+
+
+@pytest.fixture
+def projection_server():
+    projection_service = service.ProjectionService()
+    server = service.make_server(projection_service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield projection_service, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def get_json(url):
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def test_service_answers_from_memory(projection_server):
+    projection_service, url = projection_server
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get_json(url + "/projections")
+    assert error.value.code == 503
+
+    projection_service.publish(
+        pd.DataFrame(
+            data={
+                "team_name": ["New York Jets", "Dallas Cowboys"],
+                "final": [9.5, float("nan")],
+            }
+        )
+    )
+    projections = get_json(url + "/projections")["projections"]
+    assert [row["team_name"] for row in projections] == [
+        "New York Jets",
+        "Dallas Cowboys",
+    ]
+    assert projections[1]["final"] is None
+    assert get_json(url + "/team/New%20York%20Jets")["projection"]["final"] == 9.5
+    for alias, team_name in [
+        ("NYJ", "New York Jets"),
+        ("ny%20jets", "New York Jets"),
+        ("Dallas/", "Dallas Cowboys"),
+    ]:
+        projection = get_json(url + "/team/" + alias)["projection"]
+        assert projection["team_name"] == team_name
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get_json(url + "/team/nobody")
+    assert error.value.code == 404
+
+
+def test_refresh_keeps_last_projections(monkeypatch):
+    projection_service = service.ProjectionService()
+    projection_service.publish(pd.DataFrame(data={"team_name": ["a"], "final": [1.0]}))
+
+    def fail():
+        raise OSError("offline")
+
+    monkeypatch.setattr(projection_service, "load", fail)
+    assert not projection_service.refresh()
+    assert projection_service.response("/team/a") is not None
+
+
+def test_load_revalidates_the_lines_for_the_current_week(monkeypatch):
+    requested = []
+
+    def get_text(url, max_age=None):
+        requested.append((url, max_age))
+        return ""
+
+    def load_inputs(pages, week, season, as_of, season_as_of):
+        assert pages[maps.rundown_events_url] == ""
+        assert (as_of, season_as_of) == pipeline.week_dates(season, week)
+        return {"season": season, "week": week}
+
+    monkeypatch.setattr(fetch, "get_text", get_text)
+    monkeypatch.setattr(pipeline, "load_inputs", load_inputs)
+    monkeypatch.setattr(pipeline, "current_week", lambda: 3)
+    projection_service = service.ProjectionService()
+    monkeypatch.setattr(
+        projection_service.projections, "update", lambda **inputs: inputs
+    )
+    assert projection_service.load() == {"season": maps.current_season, "week": 3}
+    assert (maps.rundown_events_url, 0) in requested
+    assert [max_age for _, max_age in requested].count(0) == 1
+    assert len(requested) == len(pipeline.week_urls(*pipeline.week_dates(2020, 3)))
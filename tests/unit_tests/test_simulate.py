@@ -0,0 +1,93 @@
+import unittest.mock as mock
+
+import numpy as np
+import pandas as pd
+
+import dst_scoring_model.maps as maps
+import dst_scoring_model.model as model
+import dst_scoring_model.points_allowed as points_allowed
+import dst_scoring_model.simulate as simulate
+
+
+def construct_rates_df():
+    return pd.DataFrame(
+        data={
+            "team_name": ["hello", "goodbye", "missing"],
+            "points_allowed": [17.5, 27.0, 20.0],
+            "interceptions": [1.1, 0.6, 1.0],
+            "sacks": [3.0, 1.8, np.nan],
+            "fumbles": [0.7, 0.5, 0.6],
+            "defensive_touchdowns": [0.2, 0.1, 0.1],
+        }
+    )
+
+
+def test_poisson_draws():
+    rng = np.random.default_rng(0)
+    draws = simulate.poisson_draws(np.array([0.0, 0.5, 22.0]), 50_000, rng)
+    assert draws[:, 0].max() == 0
+    np.testing.assert_allclose(draws.mean(axis=0), [0, 0.5, 22], atol=0.05)
+    np.testing.assert_allclose(draws.var(axis=0), [0, 0.5, 22], rtol=0.03)
+
+
+def test_poisson_draws_stop_for_extreme_draws_and_rates():
+    rng = np.random.default_rng(0)
+    draws = simulate.poisson_draws(np.array([3.0, 900.0]), 1_000, rng)
+    assert abs(draws[:, 1].mean() - 900) < 5
+    uniforms = np.full((1, 1), 1 - 1e-16)
+    rng = mock.MagicMock()
+    rng.random.return_value = uniforms
+    draws = simulate.poisson_draws(np.array([2.0]), 1, rng)
+    assert 0 < draws[0, 0] < simulate.MAX_COUNT
+
+
+def test_simulate_is_reproducible():
+    first = simulate.simulate(construct_rates_df(), n_sims=5_000, chunk_size=2_000)
+    second = simulate.simulate(construct_rates_df(), n_sims=5_000, chunk_size=2_000)
+    pd.testing.assert_frame_equal(first, second)
+    assert first["team_name"].tolist() == ["hello", "goodbye", "missing"]
+    hello = first.iloc[0]
+    assert hello["p10"] <= hello["median"] <= hello["p90"]
+    assert 0 < hello["boom"] < 1
+    assert first.iloc[2].drop("team_name").isna().all()
+
+
+def test_poisson_draws_stop_at_the_cap():
+    rng = np.random.default_rng(0)
+    draws = simulate.poisson_draws(np.array([0.5, 3.0, 22.0]), 50_000, rng, cap=4)
+    assert draws.max() == 4
+    # counts at or above the cap are all reported as the cap
+    np.testing.assert_allclose((draws == 4).mean(axis=0), [0.0018, 0.353, 1], atol=0.01)
+
+
+def test_simulated_means_match_the_truncated_expectations():
+    table = maps.scoring_tables["standard"]
+    rates = construct_rates_df().iloc[:2]
+    caps = {
+        **maps.poisson_events,
+        "points_allowed": 20,
+        "sacks_created": 3,
+        "sacks_thrown": 3,
+    }
+    simulated_caps = simulate.event_caps(caps)
+    assert simulated_caps == [20, 7, 3, 5, 4]
+    scores = simulate.simulate_scores(
+        rates[simulate.simulated_events].to_numpy(),
+        200_000,
+        np.random.default_rng(0),
+        table,
+        simulated_caps,
+    )
+    expected = points_allowed.exact_scores(
+        rates["points_allowed"], table["points_allowed"], caps["points_allowed"]
+    )
+    for event, cap in zip(simulate.simulated_events[1:], simulated_caps[1:]):
+        weight = table["weights"][event]
+        expected += weight * model.poisson_expectation(rates[event], cap)
+    standard_error = scores.std(axis=0) / np.sqrt(len(scores))
+    assert (np.abs(scores.mean(axis=0) - expected) < 4 * standard_error).all()
+    # the caps are low enough for the truncation to show
+    uncapped = simulate.simulate_scores(
+        rates[simulate.simulated_events].to_numpy(), 200_000, np.random.default_rng(0)
+    )
+    assert (np.abs(uncapped.mean(axis=0) - expected) > 20 * standard_error).all()
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+import dst_scoring_model.snapshots as snapshots
+
+
+def test_write_and_read_snapshot(tmp_path):
+    df = pd.DataFrame(data={"team_name": ["hello"], "stat": [1.5]}, index=[7])
+    snapshots.write_snapshot(df, "stat", 2020, 2, "20200901T000000", str(tmp_path))
+    snapshots.write_snapshot(
+        df.assign(stat=2.5), "stat", 2020, 2, "20200902T000000", str(tmp_path)
+    )
+    latest = snapshots.read_snapshot("stat", 2020, 2, root=str(tmp_path))
+    assert latest["stat"].tolist() == [2.5]
+    first = snapshots.read_snapshot(
+        "stat", 2020, 2, "20200901T000000", columns=["stat"], root=str(tmp_path)
+    )
+    assert first.columns.tolist() == ["stat"]
+    assert first["stat"].tolist() == [1.5]
+    assert len(snapshots.list_snapshots("stat", root=str(tmp_path))) == 2
+
+
+def test_read_snapshot_missing(tmp_path):
+    with pytest.raises(LookupError):
+        snapshots.read_snapshot("stat", 2020, 2, root=str(tmp_path))
+
+
+def test_save_and_load_inputs(tmp_path, inputs):
+    inputs["qb_interceptions"].insert(0, "name", "QB")
+    snapshots.save_inputs(inputs, 2020, 1, root=str(tmp_path))
+    loaded = snapshots.load_inputs(2020, 1, root=str(tmp_path))
+    pd.testing.assert_frame_equal(loaded["spreads"], inputs["spreads"])
+    pd.testing.assert_frame_equal(
+        loaded["tr_items"]["fumbles_thrown"], inputs["tr_items"]["fumbles_thrown"]
+    )
+    assert loaded["qb_interceptions"].columns.tolist() == [
+        "team_name",
+        "interceptions_per_game_qb",
+    ]
+
+
+def test_saves_in_the_same_second_are_kept_apart(tmp_path, inputs):
+    first = snapshots.save_inputs(inputs, 2020, 1, root=str(tmp_path))
+    second = snapshots.save_inputs(inputs, 2020, 1, root=str(tmp_path))
+    assert first != second
+    assert len(snapshots.list_snapshots("lines", root=str(tmp_path))) == 2
@@ -0,0 +1,120 @@
+import json
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dst_scoring_model.maps as maps
+import dst_scoring_model.pipeline as pipeline
+import dst_scoring_model.spec as spec
+
+
+def test_compile_spec():
+    plan = spec.compile_spec()
+    events = list(maps.poisson_events)
+    assert plan["caps"].tolist() == [list(maps.poisson_events.values())]
+    sacks = maps.scored_events.index("sacks")
+    assert plan["fusion"][0, events.index("sacks_created"), sacks] == 0.45
+    assert plan["fusion"][0, events.index("sacks_thrown"), sacks] == 0.55
+    assert plan["fusion"][0].sum(axis=0).tolist() == [1.0] * 5
+    assert plan["weights"][0, :, 0].tolist() == [2, 1, 2, 6]
+    with pytest.raises(ValueError):
+        spec.compile_spec({"unknown": {}})
+
+
+def test_evaluate_specs_matches_build_projections(inputs):
+    rates_df = pipeline.build_rates(**inputs)
+    projections = pipeline.build_projections(**inputs).sort_index()
+    evaluated = spec.evaluate_specs(rates_df, [maps.model_spec])
+    np.testing.assert_allclose(evaluated["final"], projections["final"], rtol=1e-12)
+    np.testing.assert_allclose(
+        evaluated["final_yahoo"], projections["final_yahoo"], rtol=1e-12
+    )
+
+
+def test_evaluate_specs_batches(tmp_path, inputs):
+    rates_df = pipeline.build_rates(**inputs)
+    spec_path = tmp_path / "spec.json"
+    spec_path.write_text(
+        json.dumps(
+            {"recency": {"season": 0.5, "last_3": 0.5}, "caps": {"sacks_thrown": 4}}
+        )
+    )
+    candidate = spec.load_spec(str(spec_path))
+    assert candidate["fusion"] == maps.model_spec["fusion"]
+    batched = spec.evaluate_specs(rates_df, [maps.model_spec, candidate], ["a", "b"])
+    single = spec.evaluate_specs(rates_df, [candidate], ["b"])
+    assert batched["spec"].tolist() == ["a"] * 4 + ["b"] * 4
+    np.testing.assert_array_equal(batched["final"][4:], single["final"])
+    assert not np.allclose(batched["final"][:4], single["final"])
+
+
+def test_points_allowed_cap_changes_the_score(inputs):
+    rates_df = pipeline.build_rates(**inputs)
+    capped = {"caps": {"points_allowed": 20}}
+    scores = spec.evaluate_specs(rates_df, [maps.model_spec, capped])
+    # the dropped counts above the cap all score at or below 0
+    assert (scores["final"][4:].to_numpy() > scores["final"][:4].to_numpy()).all()
+
+
+TOML_SPEC = """
+[recency]
+season = 0.5
+last_3 = 0.5
+
+[caps]
+sacks_thrown = 4
+"""
+
+
+def assert_loaded_spec(candidate):
+    assert candidate["recency"] == {"season": 0.5, "last_3": 0.5}
+    assert candidate["caps"]["sacks_thrown"] == 4
+    assert (
+        candidate["caps"]["sacks_created"] == maps.model_spec["caps"]["sacks_created"]
+    )
+    assert candidate["fusion"] == maps.model_spec["fusion"]
+
+
+@pytest.mark.parametrize("fallback", [None, "tomli", "toml"])
+def test_load_toml_spec(tmp_path, monkeypatch, fallback):
+    tomllib = pytest.importorskip("tomllib")
+    spec_path = tmp_path / "spec.toml"
+    spec_path.write_text(TOML_SPEC)
+    if fallback is not None:
+        # stand in for the python < 3.11 packages with the same api
+        monkeypatch.setitem(sys.modules, "tomllib", None)
+        monkeypatch.setitem(sys.modules, "tomli", None)
+        monkeypatch.setitem(
+            sys.modules,
+            fallback,
+            (
+                tomllib
+                if fallback == "tomli"
+                else types.SimpleNamespace(load=lambda f: tomllib.loads(f.read()))
+            ),
+        )
+    assert_loaded_spec(spec.load_spec(str(spec_path)))
+
+
+def test_load_toml_spec_without_a_parser(tmp_path, monkeypatch):
+    spec_path = tmp_path / "spec.toml"
+    spec_path.write_text(TOML_SPEC)
+    for name in ("tomllib", "tomli", "toml"):
+        monkeypatch.setitem(sys.modules, name, None)
+    with pytest.raises(ImportError, match="tomli or toml"):
+        spec.load_spec(str(spec_path))
+
+
+@pytest.mark.parametrize("extension", [".yaml", ".yml"])
+def test_load_yaml_spec(tmp_path, extension):
+    pytest.importorskip("yaml")
+    spec_path = tmp_path / ("spec" + extension)
+    spec_path.write_text(
+        "recency:\n  season: 0.5\n  last_3: 0.5\ncaps:\n  sacks_thrown: 4\n"
+    )
+    assert_loaded_spec(spec.load_spec(str(spec_path)))
+    (tmp_path / "empty.yaml").write_text("")
+    assert spec.load_spec(str(tmp_path / "empty.yaml")) == spec.merge_spec({})
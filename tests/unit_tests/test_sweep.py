@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dst_scoring_model.pipeline as pipeline
+import dst_scoring_model.spec as spec
+import dst_scoring_model.sweep as sweep
+
+
+def construct_history(inputs):
+    rates_df = pipeline.build_rates(**inputs)
+    arrays = spec.rate_arrays(rates_df)
+    arrays["actual"] = np.array([12.0, 3.0, 8.0, 5.0])
+    return arrays
+
+
+def test_grid_specs():
+    specs, params = sweep.grid_specs(
+        {"recency.season": [0.6, 0.8], "caps.points_allowed": [40, 50, 60]}
+    )
+    assert len(specs) == 6
+    assert specs[0] == {
+        "recency": {"season": 0.6, "last_3": pytest.approx(0.4)},
+        "caps": {"points_allowed": 40},
+    }
+    assert params.columns.tolist() == ["recency.season", "caps.points_allowed"]
+    with pytest.raises(ValueError):
+        sweep.grid_specs({"scoring.standard": [1]})
+
+
+def test_score_specs_matches_projections(inputs):
+    arrays = construct_history(inputs)
+    projections = pipeline.build_projections(**inputs).sort_index()
+    metrics = sweep.score_specs(arrays, [{}])
+    error = projections["final"].to_numpy() - arrays["actual"]
+    assert metrics[0, 0] == 4
+    assert metrics[0, 1] == pytest.approx(np.abs(error).mean())
+    assert metrics[0, 2] == pytest.approx(np.sqrt((error**2).mean()))
+    assert metrics[0, 3] == pytest.approx(
+        np.corrcoef(projections["final"], arrays["actual"])[0, 1]
+    )
+
+
+def test_sweep_across_processes(inputs):
+    arrays = construct_history(inputs)
+    grid = {"fusion.created": [0.3, 0.45, 0.6], "recency.season": [0.5, 0.7]}
+    inline = sweep.sweep(grid, arrays, workers=1, chunk_size=2)
+    pooled = sweep.sweep(grid, arrays, workers=2, chunk_size=2)
+    pd.testing.assert_frame_equal(inline, pooled)
+    assert len(inline) == 6
+    assert inline["mae"].is_monotonic_increasing
@@ -0,0 +1,47 @@
+import pytest
+from bs4 import BeautifulSoup
+
+import dst_scoring_model.tables as tables
+from tests.unit_tests.test_get_tr_data import construct_request_content_tr
+
+PFR_PAGE = """<html><head><style>.sortable stats_table {}</style></head><body>
+<table class="other"><tr><td>skip</td></tr><tr><td>me</td></tr></table>
+<table class="sortable stats_table" id="leaders">
+<tr><th>Rk</th><th>Player</th><th>Int%</th></tr>
+<tr><td>1.</td><td><a href="#">Tom &amp; Brady</a>*</td><td>2.1%</td></tr>
+<!-- <tr><td>hidden</td></tr> -->
+<tr><td>2.</td><td><b>Drew</b> Brees</td><td>1.9%</td></tr>
+</table>
+<table class="sortable stats_table"><tr><td>second</td></tr></table>
+</body></html>"""
+
+
+def soup_rows(text, table_class):
+    table = BeautifulSoup(text, "html.parser").find("table", class_=table_class)
+    return [[td.text for td in tr.find_all("td")] for tr in table.find_all("tr")[1:]]
+
+
+def test_table_rows_matches_soup_tr():
+    text = construct_request_content_tr()
+    rows = tables.table_rows(text, "tr-table datatable scrollable")
+    assert rows == soup_rows(text, "tr-table datatable scrollable")
+    assert rows[0][2] == "0.4"
+
+
+def test_table_rows_matches_soup_pfr():
+    rows = tables.table_rows(PFR_PAGE, "sortable stats_table")
+    assert rows == soup_rows(PFR_PAGE, "sortable stats_table")
+    assert rows[0][1] == "Tom & Brady*"
+    assert len(rows) == 2
+
+
+def test_table_rows_missing_table():
+    with pytest.raises(LookupError):
+        tables.table_rows("<html></html>", "sortable stats_table")
+    with pytest.raises(LookupError):
+        tables.table_rows(
+            '<table class="other"><tr><td>1</td></tr></table>', "tr-table"
+        )
+    assert (
+        tables.table_rows('<table class="tr-table"><tr></tr></table>', "tr-table") == []
+    )
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+import dst_scoring_model.team_registry as team_registry
+
+
+def test_team_ids_resolve_aliases():
+    ids = team_registry.team_ids(
+        ["Arizona Cardinals", "Tampa Bay", "nyj", "Oakland Raiders", "hello", None]
+    )
+    assert ids.dtype == np.int8
+    assert [team_registry.names[i] for i in ids[:4]] == [
+        "Arizona Cardinals",
+        "Tampa Bay Buccaneers",
+        "New York Jets",
+        "Las Vegas Raiders",
+    ]
+    assert ids[4:].tolist() == [-1, -1]
+
+
+def test_teams_categorical():
+    teams = team_registry.teams_categorical(["Washington Football Team", "DAL", "x"])
+    assert teams.dtype == team_registry.team_dtype
+    assert teams.codes.dtype == np.int8
+    assert teams[:2].tolist() == ["Washington Redskins", "Dallas Cowboys"]
+    assert pd.isna(teams[2])
+    assert team_registry.team_ids(pd.Series(teams)).tolist() == [31, 8, -1]
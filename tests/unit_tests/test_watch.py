@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import dst_scoring_model.clean_data as clean_data
+import dst_scoring_model.watch as watch
+
+teams = clean_data.teams[:4]
+
+
+def construct_payload(spread_home):
+    return json.dumps(
+        {
+            "events": [
+                {
+                    "event_id": f"game{i}",
+                    "schedule": {"week": 1, "season_year": 2020},
+                    "teams": [{"name": teams[2 * i]}, {"name": teams[2 * i + 1]}],
+                    "lines": {
+                        "3": {
+                            "spread": {"point_spread_home": spread},
+                            "total": {"total_under": 45},
+                        }
+                    },
+                }
+                for i, spread in enumerate(spread_home)
+            ]
+        }
+    ).encode("utf-8")
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Replays recorded payloads, one per request, then repeats the last."""
+
+    payloads = []
+    requests = 0
+
+    def do_GET(self):
+        FeedHandler.requests += 1
+        body = self.payloads.pop(0) if len(self.payloads) > 1 else self.payloads[0]
+        etag = hashlib.sha1(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/events"
+    server.shutdown()
+    server.server_close()
+
+
+def test_watcher_yields_moved_games(feed_server):
+    FeedHandler.requests = 0
+    FeedHandler.payloads = [
+        construct_payload([3, -1]),
+        construct_payload([3, -1]),
+        construct_payload([3, 2.5]),
+    ]
+    watcher = watch.LineWatcher(feed_server, min_interval=0.01, max_interval=0.04)
+
+    async def collect():
+        deltas = []
+        async for delta in watcher.deltas():
+            deltas.append(delta)
+            if len(deltas) == 2:
+                return deltas
+
+    first, second = asyncio.run(asyncio.wait_for(collect(), 5))
+    assert len(first["changed"]) == 4
+    assert second["changed"]["team_name"].tolist() == teams[2:]
+    assert second["changed"]["points_allowed"].tolist() == [20.0, 25.0]
+    assert second["removed"] == []
+    assert FeedHandler.requests == 3
+    assert len(watcher.spreads()) == 4
+    assert watcher.interval == 0.01
+
+
+def test_watcher_backs_off(feed_server):
+    FeedHandler.payloads = [construct_payload([3])]
+    watcher = watch.LineWatcher(feed_server, min_interval=0.01, max_interval=0.04)
+
+    async def poll_quietly():
+        async for _ in watcher.deltas():
+            pass
+
+    async def run():
+        task = asyncio.ensure_future(poll_quietly())
+        await asyncio.sleep(0.3)
+        task.cancel()
+
+    asyncio.run(run())
+    assert watcher.interval == 0.04
+    assert watch.diff_lines({"a": [1], "b": [2]}, {"a": [3]}) == (["a"], ["b"])
+
+
+def test_main_watches_the_asked_for_week(tmp_path, monkeypatch):
+    fetched, watched = [], []
+
+    def fetch_inputs(season, week):
+        fetched.append((season, week))
+        return {"tr_items": {}, "qb_interceptions": None}
+
+    async def watch_projections(watcher, tr_items, qb_interceptions, on_update):
+        watched.append((watcher.season, watcher.week))
+
+    monkeypatch.setattr(watch.pipeline, "fetch_inputs", fetch_inputs)
+    monkeypatch.setattr(watch, "watch_projections", watch_projections)
+    watch.main(["--season", "2019", "--week", "3", "--output-dir", str(tmp_path)])
+    assert fetched == watched == [(2019, 3)]